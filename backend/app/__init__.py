@@ -4,9 +4,14 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from pymongo import MongoClient
+from app.utils.task_queue import TaskQueue
+from app.utils.pubsub import PubSub
+from app.utils.db_engine import RoutingSession, apply_profile, configure_engine
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
+task_queue = TaskQueue()
+pubsub = PubSub()
 mongo = None # Global mongo client placeholder
 
 def create_app(config_name='development'):
@@ -20,13 +25,22 @@ def create_app(config_name='development'):
     elif config_name == 'production':
         from app.config import ProductionConfig
         app.config.from_object(ProductionConfig)
+    elif config_name == 'testing':
+        from app.config import TestingConfig
+        app.config.from_object(TestingConfig)
     else:
         from app.config import Config
         app.config.from_object(Config)
     
-    # Initialize extensions
+    # Initialize extensions (pool sizing, SQLite pragmas and the optional read replica come from config)
+    apply_profile(app)
     db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            configure_engine(engine, app.config)
     jwt.init_app(app)
+    task_queue.init_app(app)
+    pubsub.init_app(app)
     
     # MongoDB Initialization
     try:
@@ -40,7 +54,7 @@ def create_app(config_name='development'):
         app.logger.error(f"Failed to connect to MongoDB: {e}")
         app.mongo = None
     # Enable CORS for all routes (simplify for dev)
-    CORS(app, resources={r"/api/*": {"origins": "*"}})
+    CORS(app, resources={r"/api/*": {"origins": "*"}}, expose_headers=['X-Next-Cursor'])
     
     # Register Blueprints 
     from app.routes.auth_routes import auth_bp
@@ -56,6 +70,9 @@ def create_app(config_name='development'):
     from app.routes.teacher_routes import teacher_bp
     from app.routes.student_routes import student_bp
     from app.routes.debug_routes import debug_bp
+    from app.routes.job_routes import job_bp
+    from app.routes.analytics_routes import analytics_bp
+    from app.routes.upload_routes import upload_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(classroom_bp, url_prefix='/api/classrooms')
@@ -69,19 +86,50 @@ def create_app(config_name='development'):
     app.register_blueprint(teacher_bp, url_prefix='/api/teacher')
     app.register_blueprint(student_bp, url_prefix='/api/student')
     app.register_blueprint(debug_bp, url_prefix='/api/debug')
+    app.register_blueprint(job_bp, url_prefix='/api/jobs')
+    app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
+    app.register_blueprint(upload_bp, url_prefix='/api/uploads')
     
+    from flask import jsonify
+    from app.utils.pagination import CursorError
+
+    @app.errorhandler(CursorError)
+    def invalid_cursor(e):
+        return jsonify({'error': str(e)}), 400
+
+    from app.services.upload_service import UploadError
+
+    @app.errorhandler(UploadError)
+    def upload_error(e):
+        # Any endpoint given an uploadId can raise this; include the session so clients can resume
+        body = {'error': str(e)}
+        if e.upload is not None:
+            body.update(e.upload.to_dict())
+        return jsonify(body), e.status
+
     # Import models for DB creation
-    from app.models import user, classroom, content, assignment, doubt, quiz, dm, progress 
+    from app.models import user, classroom, content, assignment, doubt, quiz, dm, progress, term_index, analytics, search, upload
+
+    # Static route to serve uploads and audio (Range, ETag and offload aware)
+    from flask import request
+    from app.utils.media import send_media
+    from app.services.transcode_service import transcode_service
+
+    def send_negotiated(filename):
+        # Low-bitrate Opus/MP3 variants for audio when client hints ask for it
+        upload_dir = app.config['UPLOAD_FOLDER']
+        if not transcode_service.is_audio(filename):
+            return send_media(upload_dir, filename)
+        response = send_media(upload_dir, transcode_service.negotiate(upload_dir, filename, request))
+        return transcode_service.add_vary_headers(response)
 
-    # Static route to serve uploads and audio
-    from flask import send_from_directory
     @app.route('/uploads/<path:filename>')
     def serve_uploads(filename):
-        return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+        return send_negotiated(filename)
 
     @app.route('/media/audio/<path:filename>')
     def serve_audio(filename):
         # Aligned with the Issue 1 requirement
-        return send_from_directory(app.config['UPLOAD_FOLDER'], filename)
+        return send_negotiated(filename)
 
     return app
@@ -15,6 +15,17 @@ class Config:
         'DATABASE_URL',
         'sqlite:///mlassistant.db'
     )
+    # Optional read replica: SELECTs made while serving GET requests go here
+    DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+    
+    # Engine profile (see app/utils/db_engine.py)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', 1800))
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 15000))
     
     # MongoDB
     MONGO_URI = os.getenv(
@@ -32,6 +43,77 @@ class Config:
     UPLOAD_FOLDER = os.path.join(os.getcwd(), 'uploads')
     ALLOWED_EXTENSIONS = {'txt', 'pdf', 'mp3', 'wav', 'mp4', 'jpg', 'jpeg', 'png', 'doc', 'docx'}
     
+    # Resumable chunked uploads (/api/uploads) for files over MAX_CONTENT_LENGTH;
+    # each PUT carries at most UPLOAD_CHUNK_SIZE bytes, so it must stay below MAX_CONTENT_LENGTH
+    UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+    UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', 2 * 1024 ** 3))
+    UPLOAD_SESSION_TTL = 7 * 24 * 3600  # unfinished sessions idle this long are expired by storage GC
+    
+    # Upload storage GC (storage_gc.py, /api/admin/storage_gc): unreferenced files are only
+    # reclaimed once older than the grace period; unreferenced TTS narration is a cache kept for TTS_CACHE_MAX_AGE
+    STORAGE_GC_GRACE_SECONDS = int(os.getenv('STORAGE_GC_GRACE_SECONDS', 24 * 3600))
+    TTS_CACHE_MAX_AGE = int(os.getenv('TTS_CACHE_MAX_AGE', 30 * 24 * 3600))
+    STORAGE_GC_WORK_DIR = os.getenv('STORAGE_GC_WORK_DIR')  # temp mark database; default system temp dir
+    
+    # Media serving
+    # Set USE_X_SENDFILE=True (Apache/lighttpd) or MEDIA_X_ACCEL_PREFIX=/protected-uploads (nginx internal location)
+    # to hand file bodies to the front web server instead of streaming them from Python
+    USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'False') == 'True'
+    MEDIA_X_ACCEL_PREFIX = os.getenv('MEDIA_X_ACCEL_PREFIX')
+    MEDIA_MAX_AGE = int(os.getenv('MEDIA_MAX_AGE', 0))
+    MEDIA_ETAG_CACHE_SIZE = 10000
+    
+    # Audio transcoding (low-bitrate Opus + MP3 fallback for slow connections)
+    AUDIO_TRANSCODE = os.getenv('AUDIO_TRANSCODE', 'True') == 'True'
+    AUDIO_LOW_BITRATE_DEFAULT = os.getenv('AUDIO_LOW_BITRATE_DEFAULT', 'True') == 'True'
+    FFMPEG_BINARY = os.getenv('FFMPEG_BINARY')
+    
+    # WebP previews of shared images, documents and videos (uploads/previews/, content-addressed)
+    PREVIEWS_ENABLED = os.getenv('PREVIEWS_ENABLED', 'True') == 'True'
+    PREVIEW_PDF_DPI = 100
+    PREVIEW_TIMEOUT = 120
+    SOFFICE_BINARY = os.getenv('SOFFICE_BINARY')
+    
+    # Background pipeline
+    TASK_QUEUE_WORKERS = int(os.getenv('TASK_QUEUE_WORKERS', 2))
+    AUDIO_PREGENERATE = os.getenv('AUDIO_PREGENERATE', 'True') == 'True'
+    SIMPLIFY_BATCH_LIMIT = 1000
+    TERM_INDEX_CACHE_TTL = 300
+    GRADING_KEY_TTL = 600
+    GRADING_BATCH_LIMIT = 5000
+    
+    # Keyset pagination for list endpoints (?limit=, ?cursor=, ?fields=)
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 100))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 500))
+    
+    # Server push for DMs (/api/dm/stream). In-process unless PUBSUB_URL (redis://...) is set,
+    # which is required when running more than one worker process.
+    PUBSUB_URL = os.getenv('PUBSUB_URL')
+    PUBSUB_QUEUE_SIZE = 100
+    SSE_KEEPALIVE_SECONDS = 15
+    
+    # DM contact directory (/api/dm/users): cached per-user scopes, dropped on enrollment changes
+    CONTACT_CACHE_TTL = 300
+    CONTACT_CACHE_MAX_USERS = int(os.getenv('CONTACT_CACHE_MAX_USERS', 5000))
+    
+    # Bulk curriculum import (import_curriculum.py, /api/admin/import_curriculum)
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 500))
+    IMPORT_TRANSACTION_SIZE = int(os.getenv('IMPORT_TRANSACTION_SIZE', 2000))
+    IMPORT_PROCESS_BATCH = 50
+    
+    # Reprocessing of failed/pending lesson stages (reprocess.py)
+    REPROCESS_CHUNK_SIZE = int(os.getenv('REPROCESS_CHUNK_SIZE', 25))
+    REPROCESS_CHECKPOINT_DIR = os.getenv('REPROCESS_CHECKPOINT_DIR')
+    
+    # Cross-lingual semantic search (app/services/semantic_search_service.py)
+    SEMANTIC_SEARCH = os.getenv('SEMANTIC_SEARCH', 'True') == 'True'
+    SEMANTIC_WARM_LOAD = os.getenv('SEMANTIC_WARM_LOAD', 'True') == 'True'
+    SEMANTIC_MODEL = os.getenv('SEMANTIC_MODEL', 'paraphrase-multilingual-MiniLM-L12-v2')
+    SEMANTIC_INDEX_DIR = os.getenv('SEMANTIC_INDEX_DIR', os.path.join(os.getcwd(), 'semantic_index'))
+    SEMANTIC_HNSW_M = 32
+    SEMANTIC_EF_SEARCH = int(os.getenv('SEMANTIC_EF_SEARCH', 64))
+    SEMANTIC_INDEX_SAVE_INTERVAL = 60
+    
     # CORS
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',')
 
@@ -41,7 +123,11 @@ class DevelopmentConfig(Config):
 
 class ProductionConfig(Config):
     DEBUG = False
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 20))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 40))
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///test.db'
+    TASK_QUEUE_EAGER = True
+    SEMANTIC_WARM_LOAD = False
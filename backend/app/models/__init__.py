@@ -1,6 +1,6 @@
 
 from app.models.user import User
-from app.models.content import Content, Translation
+from app.models.content import Content, Translation, SimplificationVariant
 from app.models.progress import Progress
 from app.models.classroom import Classroom, classroom_students
 from app.models.assignment import Assignment, Submission
@@ -0,0 +1,37 @@
+from app import db
+
+HISTOGRAM_BUCKETS = 10  # 0-9%, 10-19%, ... 90-100%
+
+class ScoreRollup(db.Model):
+    __tablename__ = 'score_rollups'
+
+    # scope: quiz, classroom, student or content; metric: quiz_score, completion or progress_score
+    scope = db.Column(db.String(20), primary_key=True)
+    scope_id = db.Column(db.String(50), primary_key=True)
+    metric = db.Column(db.String(20), primary_key=True)
+
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0.0)
+    total_sq = db.Column(db.Float, nullable=False, default=0.0)
+    last_at = db.Column(db.DateTime)
+
+    def to_dict(self, histogram=None):
+        mean = self.total / self.count if self.count else 0.0
+        variance = max(self.total_sq / self.count - mean * mean, 0.0) if self.count else 0.0
+        return {
+            'metric': self.metric,
+            'count': self.count,
+            'mean': round(mean, 2),
+            'stddev': round(variance ** 0.5, 2),
+            'histogram': histogram or [0] * HISTOGRAM_BUCKETS,
+            'lastAt': self.last_at.isoformat() if self.last_at else None
+        }
+
+class ScoreRollupBucket(db.Model):
+    __tablename__ = 'score_rollup_buckets'
+
+    scope = db.Column(db.String(20), primary_key=True)
+    scope_id = db.Column(db.String(50), primary_key=True)
+    metric = db.Column(db.String(20), primary_key=True)
+    bucket = db.Column(db.Integer, primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
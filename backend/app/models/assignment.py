@@ -4,36 +4,50 @@ from datetime import datetime
 
 class Assignment(db.Model):
     __tablename__ = 'assignments'
+    __table_args__ = (
+        db.Index('ix_assignments_classroom_created', 'classroom_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.String(50), primary_key=True)
     classroom_id = db.Column(db.String(50), db.ForeignKey('classrooms.id'), nullable=False)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     file_url = db.Column(db.String(255))
+    previews = db.Column(db.JSON) # WebP thumb/display URLs of file_url, see PreviewService
     due_date = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     submissions = db.relationship('Submission', backref='assignment', lazy='dynamic')
     
-    def to_dict(self):
-        return {
+    HEAVY_FIELDS = {'description': 'description'}
+    
+    def to_dict(self, fields=None):
+        result = {
             'id': self.id,
             'classroomId': self.classroom_id,
             'title': self.title,
-            'description': self.description,
             'fileUrl': self.file_url,
+            'previews': self.previews,
             'dueDate': self.due_date.isoformat() if self.due_date else None,
             'createdAt': self.created_at.isoformat()
         }
+        if fields is None or 'description' in fields:
+            result['description'] = self.description
+        return result
 
 class Submission(db.Model):
     __tablename__ = 'submissions'
+    __table_args__ = (
+        db.Index('ix_submissions_assignment_student', 'assignment_id', 'student_id'),
+        db.Index('ix_submissions_student', 'student_id'),
+    )
     
     id = db.Column(db.String(50), primary_key=True)
     assignment_id = db.Column(db.String(50), db.ForeignKey('assignments.id'), nullable=False)
     student_id = db.Column(db.String(50), db.ForeignKey('users.id'), nullable=False)
     
     file_url = db.Column(db.String(255), nullable=False)
+    previews = db.Column(db.JSON)
     status = db.Column(db.String(20), default='submitted')
     grade = db.Column(db.String(10))
     feedback = db.Column(db.Text)
@@ -46,6 +60,7 @@ class Submission(db.Model):
             'assignmentId': self.assignment_id,
             'studentId': self.student_id,
             'fileUrl': self.file_url,
+            'previews': self.previews,
             'status': self.status,
             'grade': self.grade,
             'feedback': self.feedback,
@@ -5,17 +5,23 @@ from datetime import datetime
 # Association table for Student-Classroom Many-to-Many
 classroom_students = db.Table('classroom_students',
     db.Column('classroom_id', db.String(50), db.ForeignKey('classrooms.id'), primary_key=True),
-    db.Column('student_id', db.String(50), db.ForeignKey('users.id'), primary_key=True)
+    db.Column('student_id', db.String(50), db.ForeignKey('users.id'), primary_key=True),
+    db.Index('ix_classroom_students_student', 'student_id')
 )
 
 # New: Association table for Teacher-Classroom Many-to-Many
 classroom_teachers = db.Table('classroom_teachers',
     db.Column('classroom_id', db.String(50), db.ForeignKey('classrooms.id'), primary_key=True),
-    db.Column('teacher_id', db.String(50), db.ForeignKey('users.id'), primary_key=True)
+    db.Column('teacher_id', db.String(50), db.ForeignKey('users.id'), primary_key=True),
+    db.Index('ix_classroom_teachers_teacher', 'teacher_id')
 )
 
 class Classroom(db.Model):
     __tablename__ = 'classrooms'
+    __table_args__ = (
+        db.Index('ix_classrooms_teacher_created', 'teacher_id', 'created_at', 'id'),
+        db.Index('ix_classrooms_created', 'created_at', 'id'),
+    )
     
     id = db.Column(db.String(50), primary_key=True)
     name = db.Column(db.String(100), nullable=False)
@@ -54,7 +60,30 @@ class Classroom(db.Model):
     assignments = db.relationship('Assignment', backref='classroom', lazy='dynamic')
     doubt_threads = db.relationship('DoubtThread', backref='classroom', lazy='dynamic')
     
-    def to_dict(self):
+    @staticmethod
+    def student_counts(classroom_ids):
+        """{classroom_id: enrolled students} from one grouped COUNT, without loading rosters."""
+        if not classroom_ids:
+            return {}
+        rows = db.session.query(
+            classroom_students.c.classroom_id, db.func.count(classroom_students.c.student_id)
+        ).filter(classroom_students.c.classroom_id.in_(list(classroom_ids))).group_by(classroom_students.c.classroom_id)
+        return dict(rows)
+
+    @staticmethod
+    def to_dict_many(classrooms):
+        """Serialize a listing with one COUNT query for all student counts."""
+        counts = Classroom.student_counts([c.id for c in classrooms])
+        return [c.to_dict(student_count=counts.get(c.id, 0)) for c in classrooms]
+
+    def has_student(self, student_id):
+        return db.session.query(
+            db.exists().where(classroom_students.c.classroom_id == self.id, classroom_students.c.student_id == student_id)
+        ).scalar()
+
+    def to_dict(self, student_count=None):
+        if student_count is None:
+            student_count = Classroom.student_counts([self.id]).get(self.id, 0)
         return {
             'id': self.id,
             'name': self.name,
@@ -62,6 +91,6 @@ class Classroom(db.Model):
             'description': self.description,
             'teacherId': self.teacher_id,
             'allowedLanguages': self.allowed_languages.split(',') if self.allowed_languages else [],
-            'studentCount': len(self.students) if self.students else 0,
+            'studentCount': student_count,
             'createdAt': self.created_at.isoformat()
         }
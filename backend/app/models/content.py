@@ -1,8 +1,19 @@
+import hashlib
 from app import db
+from app.models.types import CompressedText
 from datetime import datetime
 
 class Content(db.Model):
     __tablename__ = 'content'
+    __table_args__ = (
+        db.Index('ix_content_classroom_created', 'classroom_id', 'created_at', 'content_id'),
+        db.Index('ix_content_created', 'created_at', 'content_id'),
+        db.Index('ix_content_hash', 'content_hash'),
+        db.Index('ix_content_ocr_status', 'ocr_status'),
+        db.Index('ix_content_translation_status', 'translation_status'),
+        db.Index('ix_content_simplification_status', 'simplification_status'),
+        db.Index('ix_content_audio_status', 'audio_status'),
+    )
     
     content_id = db.Column(db.String(50), primary_key=True)
     subject = db.Column(db.String(100), nullable=False)
@@ -10,13 +21,24 @@ class Content(db.Model):
     level = db.Column(db.String(20), nullable=False)
     language = db.Column(db.String(10), nullable=False)
     
-    text = db.Column(db.Text, nullable=False) 
-    simplified_text = db.Column(db.Text)
-    explanation_text = db.Column(db.Text) # New
+    # Lesson bodies: compressed at rest and only loaded when accessed (undefer_group('body') for bulk reads)
+    text = db.deferred(db.Column(CompressedText, nullable=False), group='body')
+    simplified_text = db.deferred(db.Column(CompressedText), group='body')
+    explanation_text = db.deferred(db.Column(CompressedText), group='body') # New
     allowed_languages = db.Column(db.String(255)) # New: comma-separated list of allowed languages
+    audio_url = db.Column(db.String(255)) # Pre-generated narration of the original text
+    content_hash = db.Column(db.String(64)) # Dedupe key for bulk imports, see compute_hash
+    
+    # Processing state per stage, so reprocessing selects rows by index instead of scanning text.
+    # NULL on rows saved before the flags existed (reprocess.py classifies them on its first pass).
+    ocr_status = db.Column(db.String(10))
+    translation_status = db.Column(db.String(10))
+    simplification_status = db.Column(db.String(10))
+    audio_status = db.Column(db.String(10))
     
     original_file_url = db.Column(db.String(255))
     file_type = db.Column(db.String(10)) 
+    previews = db.Column(db.JSON) # WebP thumb/display URLs of the original file, see PreviewService
     
     classroom_id = db.Column(db.String(50), db.ForeignKey('classrooms.id'), nullable=True)
     uploaded_by = db.Column(db.String(50), db.ForeignKey('users.id'))
@@ -26,33 +48,61 @@ class Content(db.Model):
     # One-way relationships
     translations = db.relationship('Translation', backref='content', lazy='dynamic')
     quizzes = db.relationship('Quiz', backref='content', lazy='dynamic')
+    variants = db.relationship('SimplificationVariant', backref='content', lazy='dynamic')
+    
+    # Stage status values; 'fallback' means OCR failed and the lesson template was used
+    STATUS_PENDING = 'pending'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_FALLBACK = 'fallback'
+    
+    @staticmethod
+    def compute_hash(subject, topic, language, text, classroom_id=None):
+        """Stable identity of a lesson's content: same text in the same place is the same lesson."""
+        normalized = '\x1f'.join(
+            ' '.join(str(part or '').split()).casefold() for part in (classroom_id, subject, topic, language, text)
+        )
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
     
-    def to_dict(self, include_translations=False):
+    # Response key -> column that list views may skip via ?fields= (see app/utils/pagination.py)
+    HEAVY_FIELDS = {'text': 'text', 'simplifiedText': 'simplified_text', 'explanationText': 'explanation_text'}
+    
+    def to_dict(self, include_translations=False, translations=None, variants=None, classroom_languages=None, fields=None):
+        """
+        translations / variants / classroom_languages can be passed in
+        preloaded (see ContentFeedService) to avoid per-row lazy loads.
+        With fields, heavy columns that were not asked for are not touched.
+        """
         result = {
             'contentId': self.content_id,
             'subject': self.subject,
             'topic': self.topic,
             'level': self.level,
             'language': self.language,
-            'text': self.text,
-            'simplifiedText': self.simplified_text,
-            'explanationText': self.explanation_text,
             'allowedLanguages': self.allowed_languages.split(',') if self.allowed_languages else [],
             'originalFileUrl': self.original_file_url,
             'fileType': self.file_type,
             'mediaUrl': self.original_file_url,
             'mediaType': self.file_type,
+            'previews': self.previews,
+            'audioUrl': self.audio_url,
             'classroomId': self.classroom_id,
             'uploadedBy': self.uploaded_by,
             'teacherId': self.uploaded_by,
             'createdAt': self.created_at.isoformat()
         }
+        for key, attr in self.HEAVY_FIELDS.items():
+            if fields is None or key in fields:
+                result[key] = getattr(self, attr)
         
         if include_translations:
             # Hierarchy: Content languages > Classroom languages > All
             allowed = self.allowed_languages.split(',') if self.allowed_languages else []
-            if not allowed and self.classroom and self.classroom.allowed_languages:
-                allowed = self.classroom.allowed_languages.split(',')
+            if not allowed:
+                if classroom_languages is None and self.classroom:
+                    classroom_languages = self.classroom.allowed_languages
+                if classroom_languages:
+                    allowed = classroom_languages.split(',')
                 
             result['translations'] = {
                 t.language: {
@@ -61,19 +111,43 @@ class Content(db.Model):
                     'explanation': t.explanation_text,
                     'audioUrl': t.audio_url
                 }
-                for t in self.translations
+                for t in (self.translations.options(db.undefer_group('body')) if translations is None else translations)
                 if not allowed or t.language in allowed or t.language == self.language
             }
+            
+            # Precomputed easy/medium/detailed/explanation text per language
+            by_language = {}
+            for v in (self.variants if variants is None else variants):
+                by_language.setdefault(v.language, {})[v.level] = v.text
+            result['variants'] = by_language
         
         return result
 
 class Translation(db.Model):
     __tablename__ = 'translations'
+    __table_args__ = (
+        db.Index('ix_translations_content_language', 'content_id', 'language'),
+        db.Index('ix_translations_language', 'language'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     content_id = db.Column(db.String(50), db.ForeignKey('content.content_id'))
     language = db.Column(db.String(10), nullable=False)
-    translated_text = db.Column(db.Text, nullable=False)
-    simplified_text = db.Column(db.Text)
-    explanation_text = db.Column(db.Text) # New
+    translated_text = db.deferred(db.Column(CompressedText, nullable=False), group='body')
+    simplified_text = db.deferred(db.Column(CompressedText), group='body')
+    explanation_text = db.deferred(db.Column(CompressedText), group='body') # New
     audio_url = db.Column(db.String(255)) # New
+
+class SimplificationVariant(db.Model):
+    __tablename__ = 'simplification_variants'
+    
+    # One row per (content, language, level); level is easy, medium, detailed or explanation
+    id = db.Column(db.Integer, primary_key=True)
+    content_id = db.Column(db.String(50), db.ForeignKey('content.content_id'), nullable=False)
+    language = db.Column(db.String(10), nullable=False)
+    level = db.Column(db.String(20), nullable=False)
+    text = db.Column(db.Text, nullable=False)
+    
+    __table_args__ = (
+        db.UniqueConstraint('content_id', 'language', 'level', name='uq_variant_content_language_level'),
+    )
@@ -2,19 +2,36 @@ from app import db
 from datetime import datetime
 import uuid
 
+def conversation_key(user_a, user_b):
+    """Same key for both directions of a conversation."""
+    return '|'.join(sorted((str(user_a), str(user_b))))
+
+def _conversation_key_default(context):
+    params = context.get_current_parameters()
+    return conversation_key(params['sender_id'], params['receiver_id'])
+
 class DirectMessage(db.Model):
     __tablename__ = 'direct_messages'
+    __table_args__ = (
+        db.Index('ix_direct_messages_conversation_key', 'conversation_key', 'timestamp', 'id'),
+        db.Index('ix_direct_messages_conversation_read', 'conversation_key', 'read_at'),
+        db.Index('ix_direct_messages_receiver', 'receiver_id', 'timestamp'),
+    )
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     sender_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
     receiver_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    # Both participants, sorted; filled in on insert (ORM or Core) from sender/receiver
+    conversation_key = db.Column(db.String(80), default=_conversation_key_default)
     content = db.Column(db.Text, nullable=True) # Can be empty if just a file
     
     # media support
     media_url = db.Column(db.String(255), nullable=True)
     media_type = db.Column(db.String(50), nullable=True) # image, video, document
+    previews = db.Column(db.JSON, nullable=True) # WebP thumb/display URLs, filled in by PreviewService
     
     read = db.Column(db.Boolean, default=False)
+    read_at = db.Column(db.DateTime, nullable=True) # Drives read receipts in /api/dm/sync
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     
     sender = db.relationship('User', 
@@ -35,6 +52,50 @@ class DirectMessage(db.Model):
             'content': self.content,
             'mediaUrl': self.media_url,
             'mediaType': self.media_type,
+            'previews': self.previews,
             'read': self.read,
+            'readAt': self.read_at.isoformat() if self.read_at else None,
             'timestamp': self.timestamp.isoformat()
         }
+
+class ConversationSummary(db.Model):
+    """
+    One row per participant per conversation, kept current on every send and
+    read (see InboxService), so the inbox is a read of O(conversations) rows.
+    """
+    __tablename__ = 'dm_conversation_summaries'
+    __table_args__ = (
+        db.Index('ix_dm_conversation_summaries_user_last', 'user_id', 'last_timestamp', 'peer_id'),
+    )
+    
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    peer_id = db.Column(db.String(36), db.ForeignKey('users.id'), primary_key=True)
+    last_message_id = db.Column(db.String(36), db.ForeignKey('direct_messages.id'))
+    last_timestamp = db.Column(db.DateTime)
+    unread_count = db.Column(db.Integer, nullable=False, default=0)
+    
+    peer = db.relationship('User', foreign_keys=[peer_id])
+    last_message = db.relationship('DirectMessage', foreign_keys=[last_message_id])
+    
+    def to_dict(self):
+        return {
+            'peerId': self.peer_id,
+            'peerName': self.peer.name if self.peer else None,
+            'peerRole': self.peer.role if self.peer else None,
+            'lastMessage': self.last_message.to_dict() if self.last_message else None,
+            'lastTimestamp': self.last_timestamp.isoformat() if self.last_timestamp else None,
+            'unreadCount': self.unread_count
+        }
+
+def backfill_conversation_keys():
+    """Set conversation_key on messages saved before the column existed (one UPDATE). Returns the row count."""
+    sender, receiver = DirectMessage.sender_id, DirectMessage.receiver_id
+    key = db.case(
+        (sender < receiver, sender + '|' + receiver),
+        else_=receiver + '|' + sender
+    )
+    result = DirectMessage.query.filter(DirectMessage.conversation_key.is_(None)).update(
+        {DirectMessage.conversation_key: key}, synchronize_session=False
+    )
+    db.session.commit()
+    return result
@@ -3,6 +3,9 @@ from datetime import datetime
 
 class DoubtMessage(db.Model):
     __tablename__ = 'doubt_messages'
+    __table_args__ = (
+        db.Index('ix_doubt_messages_thread', 'thread_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     thread_id = db.Column(db.String(50), db.ForeignKey('doubt_threads.id'))
@@ -14,6 +17,10 @@ class DoubtMessage(db.Model):
 
 class DoubtThread(db.Model):
     __tablename__ = 'doubt_threads'
+    __table_args__ = (
+        db.Index('ix_doubt_threads_classroom', 'classroom_id', 'created_at'),
+        db.Index('ix_doubt_threads_student', 'student_id'),
+    )
     
     id = db.Column(db.String(50), primary_key=True)
     student_id = db.Column(db.String(50), db.ForeignKey('users.id'))
@@ -4,6 +4,10 @@ from datetime import datetime
 
 class Progress(db.Model):
     __tablename__ = 'progress'
+    __table_args__ = (
+        db.Index('ix_progress_student_content', 'student_id', 'content_id'),
+        db.Index('ix_progress_content', 'content_id'),
+    )
     
     id = db.Column(db.String(50), primary_key=True)
     student_id = db.Column(db.String(50), db.ForeignKey('users.id'))
@@ -5,6 +5,10 @@ import json
 
 class Quiz(db.Model):
     __tablename__ = 'quizzes'
+    __table_args__ = (
+        db.Index('ix_quizzes_classroom_created', 'classroom_id', 'created_at', 'id'),
+        db.Index('ix_quizzes_content', 'content_id'),
+    )
     
     id = db.Column(db.String(50), primary_key=True)
     classroom_id = db.Column(db.String(50), db.ForeignKey('classrooms.id'), nullable=True) 
@@ -15,7 +19,16 @@ class Quiz(db.Model):
     
     questions = db.relationship('Question', backref='quiz', lazy='dynamic', cascade="all, delete-orphan")
     
-    def to_dict(self):
+    @staticmethod
+    def to_dict_many(quizzes):
+        """Serialize a listing with one grouped COUNT for all question counts."""
+        ids = [q.id for q in quizzes]
+        counts = dict(
+            db.session.query(Question.quiz_id, db.func.count(Question.id)).filter(Question.quiz_id.in_(ids)).group_by(Question.quiz_id)
+        ) if ids else {}
+        return [q.to_dict(question_count=counts.get(q.id, 0)) for q in quizzes]
+
+    def to_dict(self, question_count=None):
         return {
             'id': self.id,
             'classroomId': self.classroom_id,
@@ -23,12 +36,15 @@ class Quiz(db.Model):
             'topic': self.topic,
             'createdBy': self.created_at.isoformat() if hasattr(self, 'created_at') else None,
             'teacherId': self.created_by,
-            'questionCount': self.questions.count(),
+            'questionCount': self.questions.count() if question_count is None else question_count,
             'createdAt': self.created_at.isoformat()
         }
 
 class Question(db.Model):
     __tablename__ = 'questions'
+    __table_args__ = (
+        db.Index('ix_questions_quiz', 'quiz_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     quiz_id = db.Column(db.String(50), db.ForeignKey('quizzes.id'), nullable=False)
@@ -52,6 +68,10 @@ class Question(db.Model):
 
 class StudentQuizAttempt(db.Model):
     __tablename__ = 'quiz_attempts'
+    __table_args__ = (
+        db.Index('ix_quiz_attempts_quiz_student', 'quiz_id', 'student_id'),
+        db.Index('ix_quiz_attempts_student', 'student_id', 'completed_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     quiz_id = db.Column(db.String(50), db.ForeignKey('quizzes.id'), nullable=False)
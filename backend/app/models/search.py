@@ -0,0 +1,48 @@
+from app import db
+from sqlalchemy import DDL, event
+
+class SearchDocument(db.Model):
+    __tablename__ = 'search_documents'
+    __table_args__ = (
+        db.Index('ix_search_documents_content', 'content_id'),
+        db.Index('ix_search_documents_classroom', 'classroom_id'),
+    )
+
+    # One row per lesson per language (the original text and each translation).
+    # title/body hold search terms already tokenized by app.utils.text_utils.search_terms.
+    id = db.Column(db.Integer, primary_key=True)
+    content_id = db.Column(db.String(50), db.ForeignKey('content.content_id'), nullable=False)
+    language = db.Column(db.String(10), nullable=False)
+    classroom_id = db.Column(db.String(50), nullable=True)
+    subject = db.Column(db.String(100))
+    title = db.Column(db.Text)
+    body = db.Column(db.Text)
+
+# Weighted document vector for Postgres; queries must use the same expression to hit the GIN index
+PG_TSVECTOR = (
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(body, '')), 'B')"
+)
+
+def fts5_tokenchars():
+    """Indic and Arabic-script combining marks, which unicode61 would otherwise split words on."""
+    import unicodedata
+    ranges = [(0x0900, 0x0DFF), (0x064B, 0x065F), (0x0670, 0x0670)]
+    return ''.join(
+        chr(cp) for start, end in ranges for cp in range(start, end + 1)
+        if unicodedata.category(chr(cp)) in ('Mn', 'Mc')
+    )
+
+event.listen(SearchDocument.__table__, 'after_create', DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5("
+    "title, body, content='search_documents', content_rowid='id', "
+    f"tokenize=\"unicode61 remove_diacritics 2 tokenchars '{fts5_tokenchars()}'\")"
+).execute_if(dialect='sqlite'))
+
+event.listen(SearchDocument.__table__, 'after_create', DDL(
+    f"CREATE INDEX IF NOT EXISTS ix_search_documents_tsv ON search_documents USING gin (({PG_TSVECTOR}))"
+).execute_if(dialect='postgresql'))
+
+event.listen(SearchDocument.__table__, 'before_drop', DDL(
+    "DROP TABLE IF EXISTS search_fts"
+).execute_if(dialect='sqlite'))
@@ -0,0 +1,21 @@
+from app import db
+
+class ClassroomTerm(db.Model):
+    __tablename__ = 'classroom_terms'
+
+    # Document frequency of a term across the classroom's lessons
+    classroom_id = db.Column(db.String(50), db.ForeignKey('classrooms.id'), primary_key=True)
+    term = db.Column(db.String(100), primary_key=True)
+    doc_freq = db.Column(db.Integer, nullable=False, default=0)
+
+class ContentTerm(db.Model):
+    __tablename__ = 'content_terms'
+    __table_args__ = (
+        db.Index('ix_content_terms_classroom', 'classroom_id', 'content_id'),
+    )
+
+    # Term frequency of a term inside one lesson
+    content_id = db.Column(db.String(50), db.ForeignKey('content.content_id'), primary_key=True)
+    term = db.Column(db.String(100), primary_key=True)
+    classroom_id = db.Column(db.String(50), db.ForeignKey('classrooms.id'), nullable=False)
+    term_freq = db.Column(db.Integer, nullable=False, default=1)
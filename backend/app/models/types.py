@@ -0,0 +1,47 @@
+import zlib
+from app import db
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Stored values start with a NUL marker that plain text never does
+ZLIB_MAGIC = b'\x00Z'
+ZSTD_MAGIC = b'\x00S'
+MIN_COMPRESS_BYTES = 256
+
+class CompressedText(db.TypeDecorator):
+    """
+    Text column stored compressed as binary: zstd when the zstandard package
+    is installed, zlib otherwise. Short values, and values that do not get
+    smaller, are stored as plain UTF-8. Rows written before a column became
+    compressed come back as str and are returned unchanged, so existing
+    databases keep working without a rewrite.
+    """
+    impl = db.LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        raw = value.encode('utf-8')
+        if len(raw) < MIN_COMPRESS_BYTES:
+            return raw
+        if zstandard is not None:
+            packed = ZSTD_MAGIC + zstandard.ZstdCompressor(level=6).compress(raw)
+        else:
+            packed = ZLIB_MAGIC + zlib.compress(raw, 6)
+        return packed if len(packed) < len(raw) else raw
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        value = bytes(value)
+        if value.startswith(ZSTD_MAGIC):
+            if zstandard is None:
+                raise RuntimeError("Column was written with zstd; install zstandard to read it")
+            return zstandard.ZstdDecompressor().decompress(value[len(ZSTD_MAGIC):]).decode('utf-8')
+        if value.startswith(ZLIB_MAGIC):
+            return zlib.decompress(value[len(ZLIB_MAGIC):]).decode('utf-8')
+        return value.decode('utf-8')
@@ -0,0 +1,37 @@
+from app import db
+from datetime import datetime
+
+class UploadSession(db.Model):
+    __tablename__ = 'upload_sessions'
+    __table_args__ = (
+        db.Index('ix_upload_sessions_status_updated', 'status', 'updated_at'),
+    )
+
+    STATUS_UPLOADING = 'uploading'
+    STATUS_COMPLETE = 'complete'
+    STATUS_CONSUMED = 'consumed'
+
+    id = db.Column(db.String(50), primary_key=True)
+    user_id = db.Column(db.String(50), db.ForeignKey('users.id'), nullable=True)
+    filename = db.Column(db.String(255), nullable=False)
+    size = db.Column(db.BigInteger, nullable=False)
+    # Bytes on disk from offset 0; the next PUT must start here
+    received = db.Column(db.BigInteger, nullable=False, default=0)
+    # Client-declared SHA-256, checked at finalize when given
+    expected_sha256 = db.Column(db.String(64))
+    sha256 = db.Column(db.String(64))
+    status = db.Column(db.String(10), nullable=False, default=STATUS_UPLOADING)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'uploadId': self.id,
+            'filename': self.filename,
+            'size': self.size,
+            'received': self.received,
+            'sha256': self.sha256,
+            'status': self.status,
+            'createdAt': self.created_at.isoformat() if self.created_at else None,
+            'updatedAt': self.updated_at.isoformat() if self.updated_at else None
+        }
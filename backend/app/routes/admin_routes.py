@@ -1,10 +1,15 @@
 
-from flask import Blueprint, request, jsonify
+import os
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import get_jwt_identity
-from app import db
+from werkzeug.utils import secure_filename
+from app import db, task_queue
 from app.utils.auth_utils import get_user_id_from_header
 from app.models.classroom import Classroom
 from app.models.user import User
+from app.services.curriculum_import_service import curriculum_import_service
+from app.services.upload_service import incoming_file
+from app.services.storage_service import storage_service
 import uuid
 import logging
 
@@ -35,7 +40,7 @@ def create_classroom():
     db.session.add(classroom)
     db.session.commit()
     
-    return jsonify({'success': True, 'classroom': classroom.to_dict()}), 201
+    return jsonify({'success': True, 'classroom': classroom.to_dict(student_count=0)}), 201
 
 @admin_bp.route('/assign_teacher_to_classroom', methods=['POST'])
 def assign_teacher():
@@ -88,8 +93,65 @@ def add_student():
     if student.role != 'student':
         return jsonify({'error': 'User is not a student'}), 400
         
-    if student not in classroom.students:
+    if not classroom.has_student(student.id):
         classroom.students.append(student)
         db.session.commit()
     
     return jsonify({'success': True, 'message': f'Student {student.name} added to {classroom.name}'})
+
+@admin_bp.route('/import_curriculum', methods=['POST'])
+def import_curriculum():
+    """Upload a JSON/JSONL curriculum file and import it in the background; poll /api/jobs/<jobId>"""
+    admin_id = get_user_id_from_header()
+    admin = User.query.get(admin_id)
+    
+    if not admin or admin.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+        
+    file = incoming_file(admin_id)
+    if not file or not file.filename:
+        return jsonify({'error': 'file required'}), 400
+    filename = secure_filename(file.filename)
+    if not filename.endswith(('.json', '.jsonl', '.ndjson')):
+        return jsonify({'error': 'Expected a .json or .jsonl file'}), 400
+        
+    # The same file uploaded again resumes from its checkpoint; a changed file under the same name starts over
+    import_dir = os.path.join(current_app.config['UPLOAD_FOLDER'], 'imports')
+    os.makedirs(import_dir, exist_ok=True)
+    path = os.path.join(import_dir, filename)
+    file.save(path)
+    
+    data = request.form
+    options = {
+        'subject': data.get('subject'),
+        'language': data.get('language', 'en'),
+        'level': data.get('level', 'medium'),
+        'classroom_id': data.get('classroomId'),
+        'uploaded_by': admin_id,
+        'target_languages': [lang for lang in data.get('targetLanguages', '').split(',') if lang],
+        'enrich': data.get('simplify') in ('true', 'True', '1')
+    }
+    job_id = task_queue.submit(
+        lambda job: curriculum_import_service.import_file(path, job=job, **options),
+        name=f"import:{filename}"
+    )
+    logger.info(f"Curriculum import of {filename} queued by admin {admin_id} (job {job_id})")
+    return jsonify({'success': True, 'jobId': job_id}), 202
+
+@admin_bp.route('/storage_gc', methods=['POST'])
+def storage_gc():
+    """Upload storage usage per category, reclaiming orphans when {"dryRun": false}; poll /api/jobs/<jobId> for the report"""
+    admin_id = get_user_id_from_header()
+    admin = User.query.get(admin_id)
+    
+    if not admin or admin.role != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+        
+    dry_run = (request.get_json(silent=True) or {}).get('dryRun', True) is not False
+    job_id = task_queue.submit(
+        lambda job: storage_service.run(dry_run=dry_run, job=job),
+        priority=-1,
+        name='storage-gc'
+    )
+    logger.info(f"Storage GC ({'dry run' if dry_run else 'reclaim'}) queued by admin {admin_id} (job {job_id})")
+    return jsonify({'success': True, 'jobId': job_id, 'dryRun': dry_run}), 202
@@ -11,6 +11,10 @@ from app.services.quiz_service import QuizService
 from app.services.translation_service import TranslationService
 from app.services.simplification_service import SimplificationService
 from app.services.tts_service import TTSService
+from app.services.variant_service import VariantService
+from app.services.term_index_service import term_index_service
+from app.services.upload_service import incoming_file
+from app.utils.auth_utils import get_user_id_from_header
 import logging
 
 logger = logging.getLogger("AI_Routes")
@@ -24,6 +28,7 @@ quiz_service = QuizService()
 translation_service = TranslationService()
 simplification_service = SimplificationService()
 tts_service = TTSService()
+variant_service = VariantService(simplification_service)
 
 @ai_bp.route('/chatbot_query', methods=['POST'])
 def chatbot_query():
@@ -73,10 +78,10 @@ def chatbot_query():
 @ai_bp.route('/extract_text', methods=['POST'])
 def extract_text():
     logger.info("DEMO LOG: OCR Text Extraction request received")
-    if 'file' not in request.files:
+    file = incoming_file(get_user_id_from_header())
+    if file is None:
         return jsonify({'error': 'No file provided'}), 400
         
-    file = request.files['file']
     filename = secure_filename(file.filename)
     file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
     file.save(file_path)
@@ -136,12 +141,50 @@ def simplify_text():
     
     logger.info(f"DEMO API: /simplify_text | Level: {level}")
     
+    # Lessons have every level precomputed; serve the stored variant when we can
+    content_id = data.get('contentId')
+    if content_id:
+        content = Content.query.get(content_id)
+        language = data.get('language') or (content.language if content else None)
+        variants = variant_service.get_variants(content_id, language) if content else None
+        stored = (variants or {}).get(language, {}).get(simplification_service.normalize_level(level))
+        if stored:
+            return jsonify({'success': True, 'simplifiedText': stored, 'cached': True})
+    
     if not text:
         return jsonify({'error': 'No text provided'}), 400
         
     simplified = simplification_service.simplify_text(text, level)
     return jsonify({'success': True, 'simplifiedText': simplified})
 
+@ai_bp.route('/simplify_many', methods=['POST'])
+def simplify_many():
+    """Bulk simplification: [{text, level, style}] -> results in the same order"""
+    data = request.get_json() or {}
+    items = data.get('items', [])
+    all_levels = bool(data.get('allLevels', False))
+    
+    if not isinstance(items, list):
+        return jsonify({'error': 'items must be a list'}), 400
+    logger.info(f"DEMO API: /simplify_many | Items: {len(items)} | All levels: {all_levels}")
+    
+    if not items:
+        return jsonify({'error': 'No items provided'}), 400
+    if len(items) > current_app.config.get('SIMPLIFY_BATCH_LIMIT', 1000):
+        return jsonify({'error': 'Too many items in one batch'}), 413
+    for index, item in enumerate(items):
+        if isinstance(item, dict):
+            fields = [item.get('text'), item.get('level'), item.get('style')]
+        elif isinstance(item, (list, tuple)) and 1 <= len(item) <= 3:
+            fields = list(item) + [None] * (3 - len(item))
+        else:
+            fields = [None]
+        if not isinstance(fields[0], str) or not all(f is None or isinstance(f, str) for f in fields[1:]):
+            return jsonify({'error': f'items[{index}] must be {{text, level, style}} or [text, level, style] of strings'}), 400
+    
+    results = simplification_service.simplify_many(items, all_levels=all_levels)
+    return jsonify({'success': True, 'results': results})
+
 @ai_bp.route('/translate_text', methods=['POST'])
 def translate():
     data = request.get_json()
@@ -212,8 +255,17 @@ def generate_quiz():
     
     logger.info(f"DEMO API: /generate_quiz | Level: {level}")
     
+    # Lessons in a classroom get keywords and distractors from the term index
+    keywords = distractors = None
+    content = Content.query.get(data['contentId']) if data.get('contentId') else None
+    if content:
+        text = text or content.text
+        if content.classroom_id:
+            keywords = term_index_service.keywords_for([content]).get(content.content_id)
+            distractors = term_index_service.distractor_picker(content.classroom_id)
+    
     if not text:
         return jsonify({'error': 'No text provided'}), 400
         
-    questions = quiz_service.generate_quiz(text, level)
+    questions = quiz_service.generate_quiz(text, level, keywords=keywords, distractors=distractors)
     return jsonify({'success': True, 'questions': questions})
@@ -0,0 +1,22 @@
+from flask import Blueprint, jsonify
+from app.services.analytics_service import analytics_service
+
+analytics_bp = Blueprint('analytics', __name__)
+
+# Every endpoint reads precomputed rollups; nothing here scans attempt or progress rows
+
+@analytics_bp.route('/quiz/<quiz_id>', methods=['GET'])
+def quiz_analytics(quiz_id):
+    return jsonify({'success': True, 'quizId': quiz_id, 'stats': analytics_service.summary('quiz', quiz_id)})
+
+@analytics_bp.route('/classroom/<classroom_id>', methods=['GET'])
+def classroom_analytics(classroom_id):
+    return jsonify({'success': True, 'classroomId': classroom_id, 'stats': analytics_service.summary('classroom', classroom_id)})
+
+@analytics_bp.route('/student/<student_id>', methods=['GET'])
+def student_analytics(student_id):
+    return jsonify({'success': True, 'studentId': student_id, 'stats': analytics_service.summary('student', student_id)})
+
+@analytics_bp.route('/content/<content_id>', methods=['GET'])
+def content_analytics(content_id):
+    return jsonify({'success': True, 'contentId': content_id, 'stats': analytics_service.summary('content', content_id)})
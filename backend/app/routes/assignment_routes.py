@@ -6,6 +6,9 @@ from werkzeug.utils import secure_filename
 from app import db
 from app.models.assignment import Assignment, Submission
 from app.models.user import User
+from app.services.upload_service import incoming_file
+from app.services.preview_service import preview_service
+from app.utils.pagination import paginate, requested_fields, load_fields, project
 import uuid
 import datetime
 
@@ -19,8 +22,8 @@ def create_assignment():
     user_id = get_jwt_identity()
     
     file_url = None
-    if 'file' in request.files:
-        file = request.files['file']
+    file = incoming_file(user_id)
+    if file is not None:
         filename = secure_filename(file.filename)
         path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
         file.save(path)
@@ -36,16 +39,18 @@ def create_assignment():
     )
     db.session.add(assignment)
     db.session.commit()
+    if file_url:
+        preview_service.enqueue(Assignment, assignment.id, path)
     return jsonify({'success': True, 'assignment': assignment.to_dict()}), 201
 
 @assignment_bp.route('/<assignment_id>/submit', methods=['POST'])
 @jwt_required()
 def submit_assignment(assignment_id):
     user_id = get_jwt_identity()
-    if 'file' not in request.files:
+    file = incoming_file(user_id)
+    if file is None:
         return jsonify({'error': 'File required'}), 400
         
-    file = request.files['file']
     filename = secure_filename(f"sub_{user_id}_{assignment_id}_{file.filename}")
     path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
     file.save(path)
@@ -59,10 +64,17 @@ def submit_assignment(assignment_id):
     )
     db.session.add(submission)
     db.session.commit()
+    preview_service.enqueue(Submission, submission.id, path)
     return jsonify({'success': True, 'submission': submission.to_dict()})
 
 @assignment_bp.route('/classroom/<classroom_id>', methods=['GET'])
 @jwt_required()
 def get_classroom_assignments(classroom_id):
-    assignments = Assignment.query.filter_by(classroom_id=classroom_id).all()
-    return jsonify({'success': True, 'assignments': [a.to_dict() for a in assignments]})
+    fields = requested_fields()
+    query = load_fields(Assignment.query.filter_by(classroom_id=classroom_id), Assignment, fields)
+    assignments, next_cursor = paginate(query, Assignment.created_at, Assignment.id)
+    return jsonify({
+        'success': True,
+        'assignments': [project(a.to_dict(fields=fields), fields) for a in assignments],
+        'nextCursor': next_cursor
+    })
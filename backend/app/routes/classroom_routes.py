@@ -4,6 +4,7 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import get_jwt_identity
 from app import db
 from app.utils.auth_utils import get_user_id_from_header
+from app.utils.pagination import paginate, CursorError
 from app.models.classroom import Classroom
 from app.models.user import User
 
@@ -44,7 +45,7 @@ def create_classroom():
         db.session.commit()
         
         logger.info(f"Classroom created: {classroom.name} (ID: {classroom.id}) by {user.role} {user_id}")
-        return jsonify({'success': True, 'classroom': classroom.to_dict()}), 201
+        return jsonify({'success': True, 'classroom': classroom.to_dict(student_count=0)}), 201
     except Exception as e:
         logger.exception(f"Error creating classroom: {e}")
         db.session.rollback()
@@ -60,24 +61,18 @@ def list_classrooms():
         if not user:
             return jsonify({'success': True, 'classrooms': []})
 
-        classes = []
         if user.role == 'teacher':
-            classes = Classroom.query.filter_by(teacher_id=user_id).all() or []
+            query = Classroom.query.filter_by(teacher_id=user_id)
         elif user.role == 'student':
-            # Safe fetch for enrolled classrooms
-            try:
-                enrolled = user.enrolled_classrooms
-                if hasattr(enrolled, 'all'):
-                    classes = enrolled.all() or []
-                else:
-                    classes = enrolled or []
-            except Exception as e:
-                logger.error(f"Error fetching enrolled classrooms for student {user_id}: {e}")
-                classes = []
+            # Enrolled classrooms (dynamic backref, so this stays a query)
+            query = user.enrolled_classrooms
         else: # Admin
-            classes = Classroom.query.all() or []
+            query = Classroom.query
             
-        return jsonify({'success': True, 'classrooms': [c.to_dict() for c in (classes or [])]})
+        classes, next_cursor = paginate(query, Classroom.created_at, Classroom.id)
+        return jsonify({'success': True, 'classrooms': Classroom.to_dict_many(classes), 'nextCursor': next_cursor})
+    except CursorError:
+        raise
     except Exception as e:
         logger.exception(f"Error listing classrooms: {e}")
         return jsonify({'success': True, 'classrooms': []}) # Safe fallback
@@ -98,7 +93,7 @@ def join_classroom():
         if not classroom:
             return jsonify({'error': 'Classroom not found'}), 404
             
-        if user in classroom.students:
+        if classroom.has_student(user.id):
              return jsonify({'success': True, 'message': 'Already joined'}), 200
              
         classroom.students.append(user)
@@ -122,10 +117,11 @@ def get_classroom_details(classroom_id):
         user_id = get_user_id_from_header()
         # Simplified check for now
         
+        students = classroom.students or []
         return jsonify({
             'success': True, 
-            'classroom': classroom.to_dict(),
-            'students': [s.to_dict() for s in (classroom.students or [])]
+            'classroom': classroom.to_dict(student_count=len(students)),
+            'students': [s.to_dict() for s in students]
         })
     except Exception as e:
         logger.exception(f"Error getting classroom details: {e}")
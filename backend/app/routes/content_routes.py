@@ -3,16 +3,29 @@ import os
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import get_jwt_identity
 from werkzeug.utils import secure_filename
-from app import db
+from app import db, task_queue
 from app.utils.auth_utils import get_user_id_from_header
+from app.utils.db_engine import use_primary
+from app.utils.pagination import paginate, requested_fields, load_fields, page_size, encode_cursor, decode_cursor, CursorError
 from app.models.content import Content, Translation
 from app.models.user import User
 from app.services.ocr_service import OCRService
 from app.services.stt_service import STTService
 from app.services.translation_service import TranslationService
-from app.services.simplification_service import SimplificationService
+from app.services.simplification_service import SimplificationService, EXPLANATION
 from app.services.tts_service import TTSService
 from app.services.chatbot_service import ChatbotService
+from app.services.lesson_template import is_extraction_failure
+from app.services.translation_service import FALLBACK_PREFIX
+from app.services.audio_pipeline_service import AudioPipelineService
+from app.services.transcode_service import transcode_service
+from app.services.variant_service import VariantService
+from app.services.term_index_service import term_index_service
+from app.services.content_feed_service import ContentFeedService
+from app.services.search_service import search_service
+from app.services.semantic_search_service import semantic_search_service
+from app.services.upload_service import incoming_file
+from app.services.preview_service import preview_service
 import uuid
 
 content_bp = Blueprint('content', __name__)
@@ -22,21 +35,26 @@ translation_service = TranslationService()
 simplification_service = SimplificationService()
 tts_service = TTSService()
 chatbot_service = ChatbotService()
+audio_pipeline_service = AudioPipelineService(tts_service)
+variant_service = VariantService(simplification_service)
+content_feed_service = ContentFeedService()
 
 @content_bp.route('/', methods=['POST'])
 def upload_content():
     user_id = get_user_id_from_header()
-    if 'file' not in request.files and 'text' not in request.form:
+    # A multipart file, or uploadId of a finalized chunked upload (/api/uploads)
+    file = incoming_file(user_id)
+    if file is None and 'text' not in request.form:
         return jsonify({'error': 'No content provided'}), 400
 
     data = request.form
     text_content = data.get('text', '')
     original_file_url = None
     file_type = None
+    ocr_status = Content.STATUS_DONE
 
     # Handle File Upload & OCR / STT
-    if 'file' in request.files:
-        file = request.files['file']
+    if file is not None:
         if file.filename != '':
             filename = secure_filename(file.filename)
             file_path = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
@@ -45,6 +63,9 @@ def upload_content():
             original_file_url = filename
             file_type = filename.rsplit('.', 1)[1].lower()
             
+            # Low-bitrate copies of uploaded lesson audio for slow connections
+            transcode_service.enqueue(file_path)
+            
             # Extract Text
             if file_type in ['mp4', 'mov', 'avi', 'mkv']:
                 extracted_text = stt_service.extract_text_from_video(file_path, language=data.get('language', 'en'))
@@ -53,13 +74,8 @@ def upload_content():
                 
             if extracted_text:
                 # AI Fallback trigger for various failure patterns
-                is_failed = (
-                    extracted_text == "__OCR_FAILED__" or 
-                    "OCR failed" in extracted_text or 
-                    "Error extracting text" in extracted_text
-                )
-                
-                if is_failed:
+                if is_extraction_failure(extracted_text):
+                    ocr_status = Content.STATUS_FALLBACK
                     text_content = chatbot_service.generate_lesson_content(
                         topic=data.get('topic', 'Education'),
                         subject=data.get('subject', 'General'),
@@ -80,53 +96,172 @@ def upload_content():
         uploaded_by=user_id,
         original_file_url=original_file_url,
         file_type=file_type,
-        allowed_languages=data.get('allowedLanguages', '') # New
+        allowed_languages=data.get('allowedLanguages', ''), # New
+        content_hash=Content.compute_hash(data['subject'], data['topic'], data.get('language', 'en'), text_content, data.get('classroomId')),
+        ocr_status=ocr_status,
+        simplification_status=Content.STATUS_DONE,
+        audio_status=Content.STATUS_PENDING
     )
     
-    # Base Simplification (for original language)
-    content.simplified_text = simplification_service.simplify_text(text_content, data.get('level', 'beginner'))
-    
-    db.session.add(content)
-    db.session.commit()
-    
     # Multilingual Processing
+    level = data.get('level', 'beginner')
+    translations = {}
     target_langs = data.get('targetLanguages', '').split(',')
     if target_langs and target_langs[0]:
         translations = translation_service.translate_to_multiple(text_content, target_langs)
-        for lang, t_text in translations.items():
-            # Generate simplification for each translated language
-            s_text = simplification_service.simplify_text(t_text, data.get('level', 'beginner'))
-            trans = Translation(
-                content_id=content.content_id, 
-                language=lang, 
-                translated_text=t_text,
-                simplified_text=s_text
-            )
-            db.session.add(trans)
-        db.session.commit()
+    failed = any(t_text.startswith(FALLBACK_PREFIX) for t_text in translations.values())
+    content.translation_status = Content.STATUS_FAILED if failed else Content.STATUS_DONE
+    
+    # Simplify the original and every translation in one batch. All levels and
+    # the explanation are stored so switching level in the UI never recomputes.
+    simplified = simplification_service.simplify_many(
+        [(text_content, level)] + [(t_text, level) for t_text in translations.values()],
+        all_levels=True,
+        include_explanation=True
+    )
+    content.simplified_text = simplified[0]['simplifiedText']
+    content.explanation_text = simplified[0]['levels'][EXPLANATION]
+    db.session.add(content)
+    variant_service.store(content.content_id, content.language, simplified[0]['levels'], replace=False)
+    
+    for (lang, t_text), s_result in zip(translations.items(), simplified[1:]):
+        trans = Translation(
+            content_id=content.content_id, 
+            language=lang, 
+            translated_text=t_text,
+            simplified_text=s_result['simplifiedText'],
+            explanation_text=s_result['levels'][EXPLANATION]
+        )
+        db.session.add(trans)
+        variant_service.store(content.content_id, lang, s_result['levels'], replace=False)
+    
+    # Keep the classroom TF-IDF index and the full-text search index current
+    term_index_service.index_content(content)
+    search_service.index_content(content, translations)
+    db.session.commit()
     
-    return jsonify({'success': True, 'content': content.to_dict()}), 201
+    # Embeddings for semantic search are computed off the request path too
+    semantic_search_service.enqueue_content(content.content_id)
+    if original_file_url:
+        preview_service.enqueue(Content, content.content_id, file_path)
+    
+    # Narration for every language is generated off the request path
+    audio_job_id = None
+    if current_app.config.get('AUDIO_PREGENERATE', True):
+        audio_job_id = audio_pipeline_service.enqueue_content(content)
+    
+    return jsonify({'success': True, 'content': content.to_dict(), 'audioJobId': audio_job_id}), 201
 
 @content_bp.route('/', methods=['GET'])
 def get_contents():
     classroom_id = request.args.get('classroomId')
     if classroom_id:
-        contents = Content.query.filter_by(classroom_id=classroom_id).all()
+        query = Content.query.filter_by(classroom_id=classroom_id)
     else:
         # Public or teacher specific logic
         user_id = get_user_id_from_header()
         user = User.query.get(user_id)
         if user.role == 'student':
-            # Students see content from their classes (handled by UI filtering usually or complex join)
-             contents = Content.query.filter(Content.classroom_id.in_([c.id for c in user.enrolled_classrooms])).all()
+            # Students see content from their classes (ids only, no classroom rows loaded)
+             query = content_feed_service.contents_query(content_feed_service.student_classroom_ids(user_id))
         else:
-             contents = Content.query.all()
+             query = Content.query
 
-    return jsonify({'success': True, 'contents': [c.to_dict(include_translations=True) for c in contents]})
+    # Newest first, one page per request (?limit=, ?cursor=, ?fields=)
+    fields = requested_fields()
+    contents, next_cursor = paginate(load_fields(query, Content, fields), Content.created_at, Content.content_id)
+    return jsonify({
+        'success': True,
+        'contents': content_feed_service.serialize(contents, fields=fields),
+        'nextCursor': next_cursor
+    })
 
+def searchable_classroom_ids():
+    """Classroom filter for search: ?classroomId=, else a student's own classrooms, else everything (None)"""
+    classroom_id = request.args.get('classroomId')
+    if classroom_id:
+        return [classroom_id]
+    user_id = get_user_id_from_header()
+    user = User.query.get(user_id)
+    return content_feed_service.student_classroom_ids(user_id) if user and user.role == 'student' else None
+
+def search_results(hits, fields):
+    """Serialize ranked hits ({'contentId', 'language', 'score'}) in rank order"""
+    by_id = {
+        c.content_id: c for c in
+        load_fields(Content.query.filter(Content.content_id.in_([h['contentId'] for h in hits])), Content, fields)
+    }
+    contents = [by_id[h['contentId']] for h in hits if h['contentId'] in by_id]
+    results = content_feed_service.serialize(contents, fields=fields)
+    scores = {h['contentId']: h for h in hits}
+    for item, content in zip(results, contents):
+        item['score'] = scores[content.content_id]['score']
+        item['matchedLanguage'] = scores[content.content_id]['language']
+    return results
+
+@content_bp.route('/search', methods=['GET'])
+def search_contents():
+    """Ranked full-text search over lessons and all their translations (?q=, ?classroomId=, ?subject=, ?language=)"""
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'error': 'q required'}), 400
+    classroom_ids = searchable_classroom_ids()
+
+    # Ranked results page by offset; the cursor carries it opaquely like the other list endpoints
+    offset = 0
+    if request.args.get('cursor'):
+        offset, _ = decode_cursor(request.args['cursor'])
+        if not isinstance(offset, int) or offset < 0:
+            raise CursorError('Invalid cursor')
+    limit = page_size()
+    hits = search_service.search(
+        q, classroom_ids=classroom_ids, subject=request.args.get('subject'),
+        language=request.args.get('language'), limit=limit, offset=offset
+    )
+    next_cursor = encode_cursor(offset + limit, None) if len(hits) > limit else None
+    hits = hits[:limit]
+
+    return jsonify({'success': True, 'results': search_results(hits, requested_fields()), 'nextCursor': next_cursor})
+
+@content_bp.route('/semantic_search', methods=['GET'])
+def semantic_search_contents():
+    """Meaning-based search that works across languages, e.g. a Tamil query for an English lesson (?q=, ?classroomId=, ?subject=)"""
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({'error': 'q required'}), 400
+    if not current_app.config.get('SEMANTIC_SEARCH', True):
+        return jsonify({'error': 'Semantic search is disabled'}), 404
+
+    hits = semantic_search_service.search(
+        q, classroom_ids=searchable_classroom_ids(), subject=request.args.get('subject'), limit=page_size()
+    )
+    return jsonify({'success': True, 'results': search_results(hits, requested_fields())})
+
+@content_bp.route('/<content_id>', methods=['GET'])
+def get_content(content_id):
     content = Content.query.get_or_404(content_id)
     return jsonify({'success': True, 'content': content.to_dict(include_translations=True)})
 
+@content_bp.route('/<content_id>/variants', methods=['GET'])
+@use_primary
+def get_variants(content_id):
+    """
+    Stored easy/medium/detailed/explanation text, computed once if missing.
+    On the primary: a lazy write-back would otherwise be read from a replica
+    that has not seen it yet.
+    """
+    language = request.args.get('language')
+    level = request.args.get('level')
+    
+    variants = variant_service.get_variants(content_id, language)
+    if variants is None:
+        return jsonify({'error': 'Content not found'}), 404
+    
+    if language and level:
+        kind = level if level == EXPLANATION else simplification_service.normalize_level(level)
+        return jsonify({'success': True, 'language': language, 'level': kind, 'text': variants.get(language, {}).get(kind)})
+    return jsonify({'success': True, 'variants': variants})
+
 @content_bp.route('/tts', methods=['GET'])
 def get_tts():
     text = request.args.get('text')
@@ -140,3 +275,16 @@ def get_tts():
         return jsonify({'success': True, 'audioUrl': audio_url})
     else:
         return jsonify({'error': 'Failed to generate audio'}), 500
+
+@content_bp.route('/<content_id>/audio_status', methods=['GET'])
+def get_audio_status(content_id):
+    """Progress of the background narration job for a lesson"""
+    content = Content.query.get_or_404(content_id)
+    job = task_queue.find(audio_pipeline_service.job_name(content_id))
+    audio = {t.language: t.audio_url for t in content.translations}
+    audio[content.language] = content.audio_url
+    return jsonify({
+        'success': True,
+        'job': job.to_dict() if job else None,
+        'audio': audio
+    })
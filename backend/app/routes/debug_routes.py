@@ -1,4 +1,5 @@
 from flask import Blueprint, jsonify, current_app
+from app.services.transcode_service import transcode_service
 
 debug_bp = Blueprint('debug', __name__)
 
@@ -28,3 +29,8 @@ def mongo_status():
             "status": "error",
             "message": str(e)
         }), 500
+
+@debug_bp.route('/transcode_stats', methods=['GET'])
+def transcode_stats():
+    """Bytes saved by low-bitrate audio variants since startup"""
+    return jsonify({"status": "success", "stats": dict(transcode_service.stats)}), 200
@@ -1,8 +1,16 @@
-from flask import Blueprint, request, jsonify, current_app
+import json
+from datetime import datetime
+from flask import Blueprint, Response, request, jsonify, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app import db
-from app.models.dm import DirectMessage
+from app import db, pubsub
+from app.models.dm import DirectMessage, conversation_key
+from app.services.inbox_service import inbox_service
+from app.services.contact_service import contact_service
+from app.services.upload_service import incoming_file
+from app.services.preview_service import preview_service
 from app.models.user import User
+from app.utils.auth_utils import get_user_id_from_header
+from app.utils.pagination import paginate, with_cursor, page_size, encode_cursor, decode_cursor, CursorError
 # from app.utils.file_handler import save_file
 from werkzeug.utils import secure_filename
 import os
@@ -11,29 +19,49 @@ dm_bp = Blueprint('dm', __name__)
 
 @dm_bp.route('/users', methods=['GET'])
 def get_contact_users():
-    """Get list of users to chat with (excluding self)"""
-    # In a real app, we might limit this to users in the same class
-    # For demo, the frontend passes current user id or we just return all
-    users = User.query.all()
-    return jsonify([{
-        'id': u.id,
-        'name': u.name,
-        'role': u.role,
-        'email': u.email
-    } for u in users]), 200
+    """
+    People ?sender_id= can message: classmates, their teachers and their
+    institution (everyone for admins), excluding self. ?q= matches the start
+    of the name or of any later word in it; alphabetical pages, the next
+    page's cursor is in the X-Next-Cursor header.
+    """
+    current_user_id = request.args.get('sender_id') or get_user_id_from_header()
+    if not current_user_id:
+        return jsonify({'error': 'sender_id required'}), 400
+    user = db.session.get(User, current_user_id)
+    if not user:
+        return jsonify({'error': 'User not found'}), 404
+
+    cursor = request.args.get('cursor')
+    after = decode_cursor(cursor) if cursor else None
+    contacts, last = contact_service.search(user, request.args.get('q', ''), page_size(), after)
+    return with_cursor(jsonify(contacts), encode_cursor(*last) if last else None), 200
+
+@dm_bp.route('/inbox', methods=['GET'])
+def get_inbox():
+    """Conversations of ?sender_id=, most recent first: peer, last message and unread count (X-Next-Cursor pages)"""
+    current_user_id = request.args.get('sender_id')
+    if not current_user_id:
+        return jsonify({'error': 'sender_id required'}), 400
+    summaries, next_cursor = inbox_service.inbox(current_user_id)
+    return with_cursor(jsonify([s.to_dict() for s in summaries]), next_cursor), 200
 
 @dm_bp.route('/messages/<user_id>', methods=['GET'])
 def get_messages(user_id):
     """Get conversation with specific user"""
     # For demo, we expect sender_id to be provided in query params or we just use a default
     current_user_id = request.args.get('sender_id')
+    if not current_user_id:
+        return jsonify({'error': 'sender_id required'}), 400
     
-    messages = DirectMessage.query.filter(
-        ((DirectMessage.sender_id == current_user_id) & (DirectMessage.receiver_id == user_id)) |
-        ((DirectMessage.sender_id == user_id) & (DirectMessage.receiver_id == current_user_id))
-    ).order_by(DirectMessage.timestamp.asc()).all()
+    query = DirectMessage.query.filter(
+        DirectMessage.conversation_key == conversation_key(current_user_id, user_id)
+    ).options(db.joinedload(DirectMessage.sender))
+    # Latest page first; X-Next-Cursor fetches older history. Each page is returned oldest-first.
+    messages, next_cursor = paginate(query, DirectMessage.timestamp, DirectMessage.id)
+    messages.reverse()
     
-    return jsonify([m.to_dict() for m in messages]), 200
+    return with_cursor(jsonify([m.to_dict() for m in messages]), next_cursor), 200
 
 @dm_bp.route('/send', methods=['POST'])
 def send_message():
@@ -49,9 +77,9 @@ def send_message():
     media_type = None
     
     # Handle File Upload
-    if 'file' in request.files:
-        file = request.files['file']
-        if file and file.filename:
+    file = incoming_file(current_user_id)
+    if file is not None:
+        if file.filename:
             filename = secure_filename(file.filename)
             # Determine type
             ext = filename.rsplit('.', 1)[1].lower()
@@ -82,7 +110,13 @@ def send_message():
     )
     
     db.session.add(new_msg)
+    db.session.flush()
+    inbox_service.record_messages([new_msg])
     db.session.commit()
+    push_message(new_msg)
+    if media_url:
+        # Pushed again with its previews so open chats swap in the thumbnail
+        preview_service.enqueue(DirectMessage, new_msg.id, file_path, on_ready=push_message)
     
     # Auto-reply logic for Demo
     try:
@@ -92,9 +126,146 @@ def send_message():
             content=f"Thanks for your message! This is an automated response for the demo."
         )
         db.session.add(auto_reply)
+        db.session.flush()
+        inbox_service.record_messages([auto_reply])
         db.session.commit()
+        push_message(auto_reply)
     except Exception as e:
         # Don't fail the original message if auto-reply fails
         print(f"Auto-reply failed: {e}")
     
     return jsonify(new_msg.to_dict()), 201
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+def push_message(message):
+    """Deliver a committed message to both participants' open streams"""
+    event = {'type': 'message', 'message': message.to_dict()}
+    for user_id in {message.sender_id, message.receiver_id}:
+        pubsub.publish(user_channel(user_id), event)
+
+def sync_cursor(timestamp, message_id, read_mark):
+    # Position after the last message seen, plus the newest read receipt seen
+    return encode_cursor(timestamp, [message_id, read_mark.isoformat() if read_mark else None])
+
+@dm_bp.route('/sync/<user_id>', methods=['GET'])
+def sync_messages(user_id):
+    """
+    Incremental conversation sync. Without ?since= returns the latest page
+    and a cursor; with it, only messages after the cursor plus read receipts
+    for the caller's messages read since. Pass the returned cursor next time.
+    """
+    current_user_id = request.args.get('sender_id')
+    if not current_user_id:
+        return jsonify({'error': 'sender_id required'}), 400
+    key = conversation_key(current_user_id, user_id)
+    conversation = DirectMessage.query.filter(DirectMessage.conversation_key == key).options(db.joinedload(DirectMessage.sender))
+    limit = page_size()
+    since = request.args.get('since')
+    
+    if since:
+        try:
+            last_timestamp, (last_id, read_mark) = decode_cursor(since)
+            read_mark = datetime.fromisoformat(read_mark) if read_mark else None
+        except (TypeError, ValueError) as e:
+            raise CursorError('Invalid sync cursor') from e
+        if not (last_timestamp is None or isinstance(last_timestamp, datetime)) or isinstance(last_id, (list, dict)):
+            raise CursorError('Invalid sync cursor')
+        query = conversation
+        if last_timestamp is not None:
+            query = query.filter(db.or_(
+                DirectMessage.timestamp > last_timestamp,
+                db.and_(DirectMessage.timestamp == last_timestamp, DirectMessage.id > last_id)
+            ))
+        rows = query.order_by(DirectMessage.timestamp, DirectMessage.id).limit(limit + 1).all()
+        messages, has_more = rows[:limit], len(rows) > limit
+        
+        receipt_query = db.session.query(DirectMessage.id, DirectMessage.read_at).filter(
+            DirectMessage.conversation_key == key,
+            DirectMessage.sender_id == current_user_id,
+            DirectMessage.read_at.isnot(None)
+        )
+        if read_mark:
+            receipt_query = receipt_query.filter(DirectMessage.read_at > read_mark)
+        receipts = receipt_query.order_by(DirectMessage.read_at).all()
+        if receipts:
+            read_mark = receipts[-1].read_at
+    else:
+        messages = conversation.order_by(DirectMessage.timestamp.desc(), DirectMessage.id.desc()).limit(limit).all()
+        messages.reverse()
+        # Older history is paged through /messages/<user_id>
+        has_more = False
+        last_timestamp = last_id = None
+        receipts = []
+        read_mark = db.session.query(db.func.max(DirectMessage.read_at)).filter(
+            DirectMessage.conversation_key == key
+        ).scalar()
+    
+    if messages:
+        last_timestamp, last_id = messages[-1].timestamp, messages[-1].id
+    return jsonify({
+        'messages': [m.to_dict() for m in messages],
+        'receipts': [{'id': message_id, 'readAt': read_at.isoformat()} for message_id, read_at in receipts],
+        'cursor': sync_cursor(last_timestamp, last_id, read_mark),
+        'hasMore': has_more
+    }), 200
+
+@dm_bp.route('/read/<user_id>', methods=['POST'])
+def mark_read(user_id):
+    """Mark everything user_id sent to the caller as read and push a read receipt to user_id"""
+    data = request.get_json(silent=True) or request.form
+    current_user_id = data.get('sender_id')
+    unread = [
+        message_id for (message_id,) in db.session.query(DirectMessage.id).filter(
+            DirectMessage.conversation_key == conversation_key(current_user_id, user_id),
+            DirectMessage.receiver_id == current_user_id,
+            DirectMessage.read.is_(False)
+        )
+    ]
+    if not unread:
+        return jsonify({'success': True, 'read': 0}), 200
+    
+    read_at = datetime.utcnow()
+    DirectMessage.query.filter(DirectMessage.id.in_(unread)).update(
+        {DirectMessage.read: True, DirectMessage.read_at: read_at}, synchronize_session=False
+    )
+    inbox_service.mark_read(current_user_id, user_id, len(unread))
+    db.session.commit()
+    
+    event = {'type': 'read', 'readerId': current_user_id, 'ids': unread, 'readAt': read_at.isoformat()}
+    for channel_user in {user_id, current_user_id}:
+        pubsub.publish(user_channel(channel_user), event)
+    return jsonify({'success': True, 'read': len(unread)}), 200
+
+@dm_bp.route('/stream', methods=['GET'])
+def stream_events():
+    """
+    Server-sent events for ?user_id=: new messages and read receipts as they
+    are committed. On reconnect, catch up with /sync/<user_id>?since=<cursor>.
+    """
+    user_id = request.args.get('user_id')
+    if not user_id:
+        return jsonify({'error': 'user_id required'}), 400
+    keepalive = current_app.config.get('SSE_KEEPALIVE_SECONDS', 15)
+    subscription = pubsub.subscribe(user_channel(user_id))
+    # The stream holds no database work; release the connection before it starts
+    db.session.remove()
+    
+    def events():
+        try:
+            yield ": connected\n\n"
+            while True:
+                event = subscription.get(timeout=keepalive)
+                if event is None:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            subscription.close()
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
@@ -0,0 +1,20 @@
+from flask import Blueprint, jsonify
+from app import task_queue
+
+job_bp = Blueprint('jobs', __name__)
+
+@job_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Progress of a background pipeline job"""
+    job = task_queue.get(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+@job_bp.route('/', methods=['GET'])
+def queue_status():
+    return jsonify({
+        'success': True,
+        'pending': task_queue.pending(),
+        'workers': task_queue.workers
+    })
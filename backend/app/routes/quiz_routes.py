@@ -1,12 +1,21 @@
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.quiz import Quiz, Question, StudentQuizAttempt
+from app.models.content import Content
+from app.models.classroom import Classroom, classroom_teachers
+from app.models.user import User
+from app.services.quiz_service import QuizService
+from app.services.term_index_service import term_index_service
+from app.services.grading_service import grading_service
+from app.services.analytics_service import analytics_service
+from app.utils.pagination import paginate, requested_fields, project
 import uuid
 import json
 
 quiz_bp = Blueprint('quiz', __name__)
+quiz_service = QuizService()
 
 @quiz_bp.route('/', methods=['POST'])
 @jwt_required()
@@ -44,23 +53,21 @@ def attempt_quiz(quiz_id):
     user_id = get_jwt_identity()
     answers = data.get('answers', {}) # {question_id: answer}
     
-    quiz = Quiz.query.get_or_404(quiz_id)
-    score = 0
-    total = 0
-    
-    for question in quiz.questions:
-        total += 1
-        user_ans = answers.get(str(question.id))
-        if user_ans and user_ans.lower() == question.correct_answer.lower():
-            score += 1
+    # Compiled answer key: no per-question ORM loading on the submission path
+    graded = grading_service.grade(quiz_id, answers)
+    if graded is None:
+        return jsonify({'error': 'Quiz not found'}), 404
+    score, total = graded
             
     attempt = StudentQuizAttempt(
-        quiz_id=quiz.id,
+        quiz_id=quiz_id,
         student_id=user_id,
         score=score,
         total_questions=total
     )
     db.session.add(attempt)
+    db.session.flush()
+    analytics_service.record_attempts([attempt])
     db.session.commit()
     
     return jsonify({
@@ -70,8 +77,134 @@ def attempt_quiz(quiz_id):
         'total': total
     })
 
+def gradable_quiz_ids(user_id, quiz_ids):
+    """Those of quiz_ids that user_id may record attempts on for any student: admin, quiz author or classroom teacher."""
+    user = db.session.get(User, user_id)
+    if user is None:
+        return set()
+    if user.role == 'admin':
+        return set(quiz_ids)
+    co_teaching = db.select(classroom_teachers.c.classroom_id).where(classroom_teachers.c.teacher_id == user_id)
+    rows = db.session.query(Quiz.id).outerjoin(Classroom, Classroom.id == Quiz.classroom_id).filter(
+        Quiz.id.in_([quiz_id for quiz_id in quiz_ids if quiz_id]),
+        db.or_(Quiz.created_by == user_id, Classroom.teacher_id == user_id, Quiz.classroom_id.in_(co_teaching))
+    )
+    return {row[0] for row in rows}
+
+def teaches_classroom(user_id, classroom):
+    """Admin, lead teacher or co-teacher of classroom: the classroom rule of gradable_quiz_ids."""
+    user = db.session.get(User, user_id)
+    if user is None:
+        return False
+    if user.role == 'admin' or classroom.teacher_id == user_id:
+        return True
+    return db.session.query(classroom_teachers.c.classroom_id).filter(
+        classroom_teachers.c.classroom_id == classroom.id, classroom_teachers.c.teacher_id == user_id
+    ).first() is not None
+
+@quiz_bp.route('/attempts/bulk', methods=['POST'])
+@jwt_required()
+def grade_attempts_bulk():
+    """Grade many submissions at once: one key lookup, one bulk insert, one commit"""
+    data = request.get_json() or {}
+    attempts = data.get('attempts', [])
+    if not attempts:
+        return jsonify({'error': 'No attempts provided'}), 400
+    if len(attempts) > current_app.config.get('GRADING_BATCH_LIMIT', 5000):
+        return jsonify({'error': 'Too many attempts in one batch'}), 413
+    
+    if not isinstance(attempts, list) or not all(
+        isinstance(a, dict) and isinstance(a.get('answers') or {}, dict) for a in attempts
+    ):
+        return jsonify({'error': 'attempts must be a list of {quizId, studentId, answers} objects'}), 400
+    
+    # A batch for a single quiz can give quizId once at the top level
+    default_quiz_id = data.get('quizId')
+    for attempt in attempts:
+        attempt.setdefault('quizId', default_quiz_id)
+    
+    # Students may only submit their own attempts; grading for others needs a teacher of the quiz's classroom
+    user_id = get_jwt_identity()
+    for_others = {a['quizId'] for a in attempts if a.get('studentId') != user_id and a.get('quizId')}
+    if for_others and not for_others <= gradable_quiz_ids(user_id, for_others):
+        return jsonify({'error': 'Only teachers of the quiz classroom can submit attempts for other students'}), 403
+    
+    results, rows = grading_service.grade_many(attempts)
+    return jsonify({'success': True, 'graded': len(rows), 'results': results})
+
 @quiz_bp.route('/classroom/<classroom_id>', methods=['GET'])
 @jwt_required()
 def get_classroom_quizzes(classroom_id):
-    quizzes = Quiz.query.filter_by(classroom_id=classroom_id).all()
-    return jsonify({'success': True, 'quizzes': [q.to_dict() for q in quizzes]})
+    fields = requested_fields()
+    quizzes, next_cursor = paginate(Quiz.query.filter_by(classroom_id=classroom_id), Quiz.created_at, Quiz.id)
+    return jsonify({
+        'success': True,
+        'quizzes': [project(q, fields) for q in Quiz.to_dict_many(quizzes)],
+        'nextCursor': next_cursor
+    })
+
+@quiz_bp.route('/classroom/<classroom_id>/generate', methods=['POST'])
+@jwt_required()
+def generate_classroom_quizzes(classroom_id):
+    """Generate (and by default save) one quiz per lesson in the classroom in a single call"""
+    data = request.get_json() or {}
+    user_id = get_jwt_identity()
+    classroom = db.session.get(Classroom, classroom_id)
+    if classroom is None:
+        return jsonify({'error': 'Classroom not found'}), 404
+    if not teaches_classroom(user_id, classroom):
+        return jsonify({'error': 'Only teachers of this classroom can generate its quizzes'}), 403
+    try:
+        num_questions = int(data.get('numQuestions', 5))
+    except (TypeError, ValueError):
+        num_questions = 0
+    if num_questions < 1:
+        return jsonify({'error': 'numQuestions must be a positive integer'}), 400
+    num_questions = min(num_questions, 20)
+    level = data.get('level', 'medium')
+    persist = data.get('persist', True)
+    
+    query = Content.query.options(db.undefer(Content.text)).filter_by(classroom_id=classroom_id)
+    if data.get('contentIds'):
+        query = query.filter(Content.content_id.in_(data['contentIds']))
+    contents = query.all()
+    
+    # Backfill lessons uploaded before the index existed, then one keyword lookup for all
+    if term_index_service.index_classroom(classroom_id):
+        db.session.commit()
+    keywords = term_index_service.keywords_for(contents, k=num_questions * 3)
+    distractors = term_index_service.distractor_picker(classroom_id)
+    
+    results = []
+    for content in contents:
+        questions = quiz_service.generate_quiz(
+            content.text, level, num_questions,
+            keywords=keywords.get(content.content_id),
+            distractors=distractors
+        )
+        entry = {'contentId': content.content_id, 'topic': content.topic, 'questions': questions}
+        
+        if persist and questions:
+            quiz = Quiz(
+                id=str(uuid.uuid4()),
+                classroom_id=classroom_id,
+                content_id=content.content_id,
+                topic=content.topic,
+                created_by=user_id
+            )
+            db.session.add(quiz)
+            for q_data in questions:
+                db.session.add(Question(
+                    quiz=quiz,
+                    question_text=q_data['question'],
+                    question_type='mcq',
+                    options=json.dumps(q_data['options']),
+                    correct_answer=q_data['correctAnswer'],
+                    explanation=q_data.get('explanation')
+                ))
+            entry['quizId'] = quiz.id
+        results.append(entry)
+    
+    if persist:
+        db.session.commit()
+    return jsonify({'success': True, 'quizzes': results}), 201 if persist else 200
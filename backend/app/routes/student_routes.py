@@ -6,10 +6,17 @@ from app.utils.auth_utils import get_user_id_from_header
 from app.models.classroom import Classroom
 from app.models.content import Content
 from app.models.user import User
+from app.models.progress import Progress
+from app.services.analytics_service import analytics_service
+from app.services.content_feed_service import ContentFeedService
+from app.utils.pagination import paginate, requested_fields, load_fields
+from datetime import datetime
 import logging
+import uuid
 
 logger = logging.getLogger("StudentRoutes")
 student_bp = Blueprint('student', __name__)
+content_feed_service = ContentFeedService()
 
 @student_bp.route('/get_my_classrooms', methods=['GET'])
 def get_my_classrooms():
@@ -22,7 +29,7 @@ def get_my_classrooms():
     # Using the backref 'enrolled_classrooms' defined in models/classroom.py
     classes = user.enrolled_classrooms.all()
     
-    return jsonify({'success': True, 'classrooms': [c.to_dict() for c in classes]})
+    return jsonify({'success': True, 'classrooms': Classroom.to_dict_many(classes)})
 
 @student_bp.route('/get_classroom_content', methods=['GET'])
 def get_classroom_content():
@@ -40,10 +47,55 @@ def get_classroom_content():
     if not classroom:
         return jsonify({'error': 'Classroom not found'}), 404
         
-    # Security check: Is student enrolled?
-    if user not in classroom.students:
+    # Security check: Is student enrolled? (enrolment ids only, not the whole roster)
+    if classroom_id not in content_feed_service.student_classroom_ids(user_id):
         return jsonify({'error': 'You are not enrolled in this classroom'}), 403
         
-    contents = Content.query.filter_by(classroom_id=classroom_id).all()
+    fields = requested_fields()
+    query = load_fields(Content.query.filter_by(classroom_id=classroom_id), Content, fields)
+    contents, next_cursor = paginate(query, Content.created_at, Content.content_id)
     
-    return jsonify({'success': True, 'contents': [c.to_dict(include_translations=True) for c in contents]})
+    return jsonify({
+        'success': True,
+        'contents': content_feed_service.serialize(contents, fields=fields),
+        'nextCursor': next_cursor
+    })
+
+@student_bp.route('/progress', methods=['POST'])
+def record_progress():
+    """Create or update the caller's progress on a lesson and fold it into the analytics rollups"""
+    user_id = get_user_id_from_header()
+    # Row lock on the student serializes their progress writes, so two concurrent
+    # updates (or first inserts) of a lesson never fold the same old values into the rollups
+    user = User.query.filter_by(id=user_id).with_for_update().first() if user_id else None
+    
+    if not user or user.role != 'student':
+        return jsonify({'error': 'Unauthorized'}), 403
+        
+    data = request.get_json() or {}
+    content_id = data.get('contentId')
+    if not content_id:
+        return jsonify({'error': 'contentId required'}), 400
+    try:
+        completion = int(data['completion']) if data.get('completion') is not None else None
+        score = int(data['score']) if data.get('score') is not None else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'completion and score must be integers'}), 400
+    
+    progress = Progress.query.filter_by(student_id=user_id, content_id=content_id).first()
+    old_completion = old_score = None
+    if progress:
+        old_completion, old_score = progress.completion or 0, progress.score or 0
+    else:
+        progress = Progress(id=str(uuid.uuid4()), student_id=user_id, content_id=content_id)
+        db.session.add(progress)
+    
+    progress.topic = data.get('topic', progress.topic)
+    progress.completion = max(0, min((progress.completion or 0) if completion is None else completion, 100))
+    progress.score = max(0, min((progress.score or 0) if score is None else score, 100))
+    progress.last_accessed = datetime.utcnow()
+    
+    analytics_service.record_progress(progress, old_completion, old_score)
+    db.session.commit()
+    
+    return jsonify({'success': True, 'progress': progress.to_dict()})
@@ -27,7 +27,7 @@ def get_assigned_classrooms():
     # Merge and remove duplicates
     all_classes = {c.id: c for c in classes + lead_classes}.values()
     
-    return jsonify({'success': True, 'classrooms': [c.to_dict() for c in all_classes]})
+    return jsonify({'success': True, 'classrooms': Classroom.to_dict_many(list(all_classes))})
 
 @teacher_bp.route('/add_student_to_classroom', methods=['POST'])
 def add_student():
@@ -54,7 +54,7 @@ def add_student():
     if student.role != 'student':
         return jsonify({'error': 'User is not a student'}), 400
         
-    if student not in classroom.students:
+    if not classroom.has_student(student.id):
         classroom.students.append(student)
         db.session.commit()
     
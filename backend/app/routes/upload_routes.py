@@ -0,0 +1,35 @@
+from flask import Blueprint, request, jsonify, current_app
+from app.services.upload_service import upload_service
+from app.utils.auth_utils import get_user_id_from_header
+
+upload_bp = Blueprint('uploads', __name__)
+
+@upload_bp.route('/', methods=['POST'])
+def create_upload():
+    """Start a chunked upload: {filename, size, sha256?}. PUT ranges of at most chunkSize bytes to /<uploadId>."""
+    data = request.get_json() or {}
+    upload = upload_service.create(get_user_id_from_header(), data.get('filename'), data.get('size'), data.get('sha256'))
+    return jsonify({**upload.to_dict(), 'chunkSize': current_app.config['UPLOAD_CHUNK_SIZE']}), 201
+
+@upload_bp.route('/<upload_id>', methods=['GET'])
+def upload_status(upload_id):
+    """Where to resume: the next PUT starts at 'received'"""
+    upload = upload_service.get(upload_id, get_user_id_from_header())
+    return jsonify(upload.to_dict())
+
+@upload_bp.route('/<upload_id>', methods=['PUT'])
+def put_range(upload_id):
+    """Raw bytes for Content-Range: bytes <start>-<end>/<size>"""
+    upload = upload_service.write_request(upload_service.get(upload_id, get_user_id_from_header()))
+    return jsonify(upload.to_dict())
+
+@upload_bp.route('/<upload_id>/finalize', methods=['POST'])
+def finalize_upload(upload_id):
+    """Verify size (and sha256 when declared); afterwards pass uploadId to any upload endpoint instead of a file"""
+    upload = upload_service.finalize(upload_service.get(upload_id, get_user_id_from_header()))
+    return jsonify(upload.to_dict())
+
+@upload_bp.route('/<upload_id>', methods=['DELETE'])
+def abort_upload(upload_id):
+    upload_service.abort(upload_service.get(upload_id, get_user_id_from_header()))
+    return jsonify({'success': True})
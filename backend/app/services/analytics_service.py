@@ -0,0 +1,181 @@
+import logging
+from collections import defaultdict
+from app import db
+from app.models.analytics import ScoreRollup, ScoreRollupBucket, HISTOGRAM_BUCKETS
+from app.models.content import Content
+from app.models.progress import Progress
+from app.models.quiz import Quiz, StudentQuizAttempt
+from app.utils.db_utils import upsert_add
+
+logger = logging.getLogger("AnalyticsService")
+
+QUIZ_SCORE = 'quiz_score'
+COMPLETION = 'completion'
+PROGRESS_SCORE = 'progress_score'
+
+def percent(score, total):
+    return score * 100.0 / total if total else 0.0
+
+def bucket_of(value):
+    return min(max(int(value // (100 / HISTOGRAM_BUCKETS)), 0), HISTOGRAM_BUCKETS - 1)
+
+class AnalyticsService:
+    """
+    Incrementally maintained score statistics (count, sum, sum of squares,
+    histogram, last activity) per quiz, classroom, student and lesson, so
+    dashboards read a handful of rows instead of aggregating raw attempts.
+    Callers commit; rollups ride in the same transaction as the raw write.
+    """
+    def _apply(self, deltas, bucket_deltas):
+        if deltas:
+            upsert_add(
+                ScoreRollup.__table__,
+                [
+                    {'scope': scope, 'scope_id': scope_id, 'metric': metric,
+                     'count': d['count'], 'total': d['total'], 'total_sq': d['total_sq'], 'last_at': d['last_at']}
+                    for (scope, scope_id, metric), d in deltas.items()
+                ],
+                index_elements=['scope', 'scope_id', 'metric'],
+                increments=['count', 'total', 'total_sq'],
+                replace=['last_at']
+            )
+        rows = [
+            {'scope': scope, 'scope_id': scope_id, 'metric': metric, 'bucket': bucket, 'count': count}
+            for (scope, scope_id, metric, bucket), count in bucket_deltas.items() if count
+        ]
+        if rows:
+            upsert_add(
+                ScoreRollupBucket.__table__,
+                rows,
+                index_elements=['scope', 'scope_id', 'metric', 'bucket'],
+                increments=['count']
+            )
+
+    def _delta_maps(self):
+        return (
+            defaultdict(lambda: {'count': 0, 'total': 0.0, 'total_sq': 0.0, 'last_at': None}),
+            defaultdict(int)
+        )
+
+    def _add(self, deltas, bucket_deltas, key, value, when, count=1, old_value=None):
+        d = deltas[key]
+        d['count'] += count
+        d['total'] += value - (old_value or 0.0)
+        d['total_sq'] += value * value - (old_value or 0.0) ** 2
+        if when and (d['last_at'] is None or when > d['last_at']):
+            d['last_at'] = when
+        bucket_deltas[key + (bucket_of(value),)] += 1
+        if old_value is not None:
+            bucket_deltas[key + (bucket_of(old_value),)] -= 1
+
+    def record_attempts(self, attempts):
+        """attempts: StudentQuizAttempt rows or dicts with quiz_id/student_id/score/total_questions/completed_at."""
+        attempts = [a if isinstance(a, dict) else {
+            'quiz_id': a.quiz_id, 'student_id': a.student_id, 'score': a.score,
+            'total_questions': a.total_questions, 'completed_at': a.completed_at
+        } for a in attempts]
+        if not attempts:
+            return
+
+        quiz_ids = {a['quiz_id'] for a in attempts}
+        classroom_of = dict(db.session.query(Quiz.id, Quiz.classroom_id).filter(Quiz.id.in_(quiz_ids)))
+
+        deltas, bucket_deltas = self._delta_maps()
+        for a in attempts:
+            value = percent(a['score'] or 0, a['total_questions'] or 0)
+            scopes = [('quiz', a['quiz_id']), ('student', a['student_id'])]
+            if classroom_of.get(a['quiz_id']):
+                scopes.append(('classroom', classroom_of[a['quiz_id']]))
+            for scope, scope_id in scopes:
+                self._add(deltas, bucket_deltas, (scope, scope_id, QUIZ_SCORE), value, a.get('completed_at'))
+        self._apply(deltas, bucket_deltas)
+
+    def record_progress(self, progress, old_completion=None, old_score=None):
+        """Fold a new or updated Progress row into the rollups."""
+        classroom_id = db.session.query(Content.classroom_id).filter_by(content_id=progress.content_id).scalar()
+        scopes = [('student', progress.student_id), ('content', progress.content_id)]
+        if classroom_id:
+            scopes.append(('classroom', classroom_id))
+
+        is_new = old_completion is None
+        deltas, bucket_deltas = self._delta_maps()
+        for scope, scope_id in scopes:
+            for metric, value, old in ((COMPLETION, progress.completion, old_completion), (PROGRESS_SCORE, progress.score, old_score)):
+                self._add(
+                    deltas, bucket_deltas, (scope, scope_id, metric), float(value or 0), progress.last_accessed,
+                    count=1 if is_new else 0,
+                    old_value=None if is_new else float(old or 0)
+                )
+        self._apply(deltas, bucket_deltas)
+
+    def summary(self, scope, scope_id):
+        """{metric: stats} for one scope, from two indexed reads."""
+        histograms = defaultdict(lambda: [0] * HISTOGRAM_BUCKETS)
+        for metric, bucket, count in db.session.query(
+            ScoreRollupBucket.metric, ScoreRollupBucket.bucket, ScoreRollupBucket.count
+        ).filter_by(scope=scope, scope_id=scope_id):
+            histograms[metric][bucket] = count
+        return {
+            rollup.metric: rollup.to_dict(histograms[rollup.metric])
+            for rollup in ScoreRollup.query.filter_by(scope=scope, scope_id=scope_id)
+        }
+
+    def rebuild(self):
+        """Recompute every rollup from the raw tables with GROUP BY queries. Caller commits."""
+        ScoreRollupBucket.query.delete()
+        ScoreRollup.query.delete()
+
+        attempts = StudentQuizAttempt
+        pct = db.case((attempts.total_questions > 0, attempts.score * 100.0 / attempts.total_questions), else_=0.0)
+        quiz_bucket = db.case(
+            (attempts.total_questions <= 0, 0),
+            (attempts.score >= attempts.total_questions, HISTOGRAM_BUCKETS - 1),
+            else_=(attempts.score * HISTOGRAM_BUCKETS) // attempts.total_questions
+        )
+        quiz_groups = [
+            ('quiz', attempts.quiz_id, None),
+            ('student', attempts.student_id, None),
+            ('classroom', Quiz.classroom_id, Quiz)
+        ]
+        for scope, key, join in quiz_groups:
+            self._rebuild_group(attempts, scope, key, join, QUIZ_SCORE, pct, quiz_bucket, attempts.completed_at)
+
+        progress_groups = [
+            ('student', Progress.student_id, None),
+            ('content', Progress.content_id, None),
+            ('classroom', Content.classroom_id, Content)
+        ]
+        for scope, key, join in progress_groups:
+            for metric, column in ((COMPLETION, Progress.completion), (PROGRESS_SCORE, Progress.score)):
+                value = db.func.coalesce(column, 0) * 1.0
+                bucket = db.case((value >= 100, HISTOGRAM_BUCKETS - 1), (value < 0, 0), else_=db.cast(db.func.coalesce(column, 0), db.Integer) // (100 // HISTOGRAM_BUCKETS))
+                self._rebuild_group(Progress, scope, key, join, metric, value, bucket, Progress.last_accessed)
+        logger.info("Analytics rollups rebuilt from raw tables")
+
+    def _rebuild_group(self, model, scope, key, join, metric, value, bucket, when):
+        def base(*columns):
+            query = db.session.query(*columns).select_from(model)
+            if join is Quiz:
+                query = query.join(Quiz, Quiz.id == model.quiz_id)
+            elif join is Content:
+                query = query.join(Content, Content.content_id == model.content_id)
+            return query.filter(key.isnot(None))
+
+        rows = [
+            {'scope': scope, 'scope_id': scope_id, 'metric': metric, 'count': count,
+             'total': total or 0.0, 'total_sq': total_sq or 0.0, 'last_at': last_at}
+            for scope_id, count, total, total_sq, last_at in base(
+                key, db.func.count(), db.func.sum(value), db.func.sum(value * value), db.func.max(when)
+            ).group_by(key)
+        ]
+        if rows:
+            db.session.execute(db.insert(ScoreRollup), rows)
+
+        buckets = [
+            {'scope': scope, 'scope_id': scope_id, 'metric': metric, 'bucket': b, 'count': count}
+            for scope_id, b, count in base(key, bucket, db.func.count()).group_by(key, bucket)
+        ]
+        if buckets:
+            db.session.execute(db.insert(ScoreRollupBucket), buckets)
+
+analytics_service = AnalyticsService()
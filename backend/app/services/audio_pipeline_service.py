@@ -0,0 +1,71 @@
+import logging
+from app import db, task_queue
+from app.models.classroom import Classroom
+from app.models.content import Content, Translation
+from app.services.tts_service import TTSService
+
+logger = logging.getLogger("AudioPipelineService")
+
+class AudioPipelineService:
+    """
+    Pre-generates lesson audio in the background after upload so that the
+    first play of a lesson is a cache hit instead of a live gTTS call.
+    """
+    def __init__(self, tts_service=None):
+        self.tts_service = tts_service or TTSService()
+
+    def job_name(self, content_id):
+        return f"audio:{content_id}"
+
+    def enqueue_content(self, content):
+        """Queue audio for the original text and every translation of content."""
+        priority = self._classroom_priority(content.classroom_id)
+        logger.info(f"DEMO LOG: Queueing audio pre-generation for {content.content_id} (priority {priority})")
+        return task_queue.submit(
+            self._generate_for_content,
+            content.content_id,
+            priority=priority,
+            name=self.job_name(content.content_id)
+        )
+
+    def _classroom_priority(self, classroom_id):
+        # Bigger classrooms first: more students are waiting on the same lesson
+        if not classroom_id:
+            return 0
+        return Classroom.student_counts([classroom_id]).get(classroom_id, 0)
+
+    def _generate_for_content(self, job, content_id):
+        content = Content.query.get(content_id)
+        if not content:
+            job.update(message='Content no longer exists')
+            return {'generated': 0, 'failed': 0}
+
+        translations = Translation.query.options(db.undefer(Translation.translated_text)).filter_by(content_id=content_id).all()
+        job.update(done=0, total=1 + len(translations), message=f"Generating audio for {content.topic}")
+        return self.generate_for_content(content, translations, job=job)
+
+    def generate_for_content(self, content, translations, job=None, commit=True):
+        """
+        Narrate the original text and every translation and set
+        content.audio_status. commit=False leaves committing to the caller
+        (batch reprocessing); otherwise each clip is committed as it is ready.
+        """
+        generated = failed = 0
+        items = [(content, content.text, content.language)] + [(t, t.translated_text, t.language) for t in translations]
+        for row, text, lang in items:
+            audio_url = self.tts_service.generate_audio(text, lang)
+            if audio_url:
+                row.audio_url = audio_url
+                if commit:
+                    db.session.commit()
+                generated += 1
+            else:
+                failed += 1
+            if job:
+                job.advance(message=f"Audio ready for {lang}")
+
+        content.audio_status = Content.STATUS_FAILED if failed else Content.STATUS_DONE
+        if commit:
+            db.session.commit()
+        logger.info(f"DEMO LOG: Audio pre-generation for {content.content_id} done ({generated} ok, {failed} failed)")
+        return {'generated': generated, 'failed': failed}
@@ -4,6 +4,7 @@ import numpy as np
 from sentence_transformers import SentenceTransformer
 from transformers import pipeline
 from app.services.translation_service import TranslationService
+from app.services.lesson_template import generate_lesson_content
 
 logger = logging.getLogger("ChatbotService")
 
@@ -65,28 +66,4 @@ class ChatbotService:
         """
         AI Fallback: Generates educational content if OCR fails.
         """
-        logger.info(f"DEMO LOG: AI Generating lesson for {topic} in {subject} at {level} level")
-        
-        # Professional educational template
-        content = f"""
-# {topic} ({subject})
-
-Welcome to this lesson on **{topic}**. 
-
-In this session, we will explore the fundamental concepts of {topic} within the context of {subject}. 
-
-### Key Learning Objectives:
-1. Understand the core principles of {topic}.
-2. Explore practical applications in everyday life.
-3. Review key terminology and definitions.
-
-### Concepts Overview:
-Learning about {topic} helps us understand how the world works. Whether it's the motion of objects, the chemical reactions in our bodies, or the history of our nations, {subject} provides the foundation for our knowledge.
-
-### Quick Fact:
-Did you know that {topic} is one of the most studied areas in {subject}? It connects many different ideas together!
-
----
-*Note: This content was automatically generated by the EquiLearn AI Assistant to ensure your learning is never interrupted.*
-"""
-        return content.strip()
+        return generate_lesson_content(topic, subject, level)
@@ -0,0 +1,219 @@
+import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict, defaultdict
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from app import db
+from app.models.classroom import Classroom, classroom_students, classroom_teachers
+from app.models.user import User
+from app.utils.db_engine import RoutingSession
+
+logger = logging.getLogger("ContactService")
+
+PENDING_KEY = 'contact_invalidations'
+
+def name_key(text):
+    return unicodedata.normalize('NFC', text or '').casefold().strip()
+
+class Directory:
+    """
+    Users searchable by name prefix: keys are (name_key, user_id) sorted, one
+    for the full name and one per later word ("rao" finds "Asha Rao"), so a
+    prefix lookup is a bisect plus a scan over the matches only. Listing
+    without a prefix walks the full-name keys alone, so every user appears
+    once, in name order.
+    """
+    def __init__(self, rows):
+        self.built_at = time.time()
+        self.users = {}
+        names, keys = [], []
+        for user_id, name, role in rows:
+            self.users[user_id] = {'id': user_id, 'name': name, 'role': role}
+            full = name_key(name)
+            names.append((full, user_id))
+            keys.extend((word, user_id) for word in full.split()[1:])
+        names.sort()
+        self.names = names
+        self.keys = sorted(names + keys)
+
+    def search(self, prefix, after=None, exclude=None):
+        """Yield (key, user) matching prefix in key order, strictly after the (key, user_id) cursor."""
+        prefix = name_key(prefix)
+        keys = self.keys if prefix else self.names
+        start = bisect_left(keys, (prefix,))
+        if after:
+            start = max(start, bisect_right(keys, tuple(after)))
+        for key, user_id in keys[start:]:
+            if not key.startswith(prefix):
+                return
+            if user_id != exclude:
+                yield (key, user_id), self.users[user_id]
+
+class ContactService:
+    """
+    DM contact directory scoped to the caller: people sharing a classroom
+    (as student, co-teacher or lead teacher) plus, when the caller has one,
+    everyone in the same institution. Admins see everyone.
+
+    Per-user classroom scopes and shared institution/admin directories are
+    cached in memory. Enrollment changes invalidate the affected users after
+    commit; other changes (renames, new users outside an institution) show up
+    within CONTACT_CACHE_TTL.
+    """
+    def __init__(self):
+        self._users = OrderedDict()              # user_id -> Directory of classroom contacts (LRU)
+        self._classrooms = {}                    # user_id -> classroom ids that directory covers
+        self._by_classroom = defaultdict(set)    # classroom_id -> user ids with a cached directory
+        self._shared = {}                        # ('institution', id) / ('all',) -> Directory
+        self._lock = threading.Lock()
+
+    def _ttl(self):
+        return current_app.config.get('CONTACT_CACHE_TTL', 300)
+
+    def _fresh(self, directory):
+        return directory is not None and time.time() - directory.built_at < self._ttl()
+
+    # Scopes
+
+    def _classroom_ids(self, user_id):
+        enrolled = db.select(classroom_students.c.classroom_id).where(classroom_students.c.student_id == user_id)
+        teaching = db.select(classroom_teachers.c.classroom_id).where(classroom_teachers.c.teacher_id == user_id)
+        leading = db.select(Classroom.id).where(Classroom.teacher_id == user_id)
+        return {row[0] for row in db.session.execute(db.union(enrolled, teaching, leading))}
+
+    def _classroom_directory(self, user_id):
+        with self._lock:
+            directory = self._users.get(user_id)
+            if self._fresh(directory):
+                self._users.move_to_end(user_id)
+                return directory
+
+        classroom_ids = self._classroom_ids(user_id)
+        rows = []
+        if classroom_ids:
+            members = db.union(
+                db.select(classroom_students.c.student_id).where(classroom_students.c.classroom_id.in_(classroom_ids)),
+                db.select(classroom_teachers.c.teacher_id).where(classroom_teachers.c.classroom_id.in_(classroom_ids)),
+                db.select(Classroom.teacher_id).where(Classroom.id.in_(classroom_ids), Classroom.teacher_id.isnot(None))
+            )
+            rows = db.session.query(User.id, User.name, User.role).filter(User.id.in_(members)).all()
+        directory = Directory(rows)
+        logger.debug(f"DEMO LOG: Cached {len(directory.users)} classroom contacts for {user_id}")
+
+        with self._lock:
+            self._forget(user_id)
+            self._users[user_id] = directory
+            self._classrooms[user_id] = classroom_ids
+            for classroom_id in classroom_ids:
+                self._by_classroom[classroom_id].add(user_id)
+            while len(self._users) > current_app.config.get('CONTACT_CACHE_MAX_USERS', 5000):
+                self._forget(next(iter(self._users)))
+        return directory
+
+    def _shared_directory(self, scope):
+        with self._lock:
+            directory = self._shared.get(scope)
+        if self._fresh(directory):
+            return directory
+        query = db.session.query(User.id, User.name, User.role)
+        if scope[0] == 'institution':
+            query = query.filter(User.institution_id == scope[1])
+        directory = Directory(query.all())
+        with self._lock:
+            self._shared[scope] = directory
+        return directory
+
+    def directories(self, user):
+        if user.role == 'admin':
+            return [self._shared_directory(('all',))]
+        directories = [self._classroom_directory(user.id)]
+        if user.institution_id:
+            directories.append(self._shared_directory(('institution', user.institution_id)))
+        return directories
+
+    def search(self, user, prefix='', limit=50, after=None):
+        """
+        One page of contacts whose name (or a later word of it) starts with
+        prefix, in name order. after is the cursor returned with the previous
+        page. Returns (users, next_cursor).
+        """
+        streams = [directory.search(prefix, after, exclude=user.id) for directory in self.directories(user)]
+        # Merge the sorted per-scope matches; the same user may be in several scopes
+        heads = {}
+        for i, matches in enumerate(streams):
+            heads[i] = next(matches, None)
+        page, seen, last = [], set(), None
+        while len(page) < limit:
+            live = [(head[0], i) for i, head in heads.items() if head is not None]
+            if not live:
+                return page, None
+            key, i = min(live)
+            _, contact = heads[i]
+            heads[i] = next(streams[i], None)
+            last = key
+            if contact['id'] not in seen:
+                seen.add(contact['id'])
+                page.append(contact)
+        more = any(head is not None for head in heads.values())
+        return page, (list(last) if more else None)
+
+    # Invalidation
+
+    def _forget(self, user_id):
+        self._users.pop(user_id, None)
+        for classroom_id in self._classrooms.pop(user_id, ()):
+            cached = self._by_classroom.get(classroom_id)
+            if cached:
+                cached.discard(user_id)
+                if not cached:
+                    del self._by_classroom[classroom_id]
+
+    def invalidate_classroom(self, classroom_id, user_ids=()):
+        """Membership of classroom_id changed: drop the scopes of everyone cached with it and of user_ids."""
+        with self._lock:
+            for user_id in set(self._by_classroom.get(classroom_id, ())) | {u for u in user_ids if u}:
+                self._forget(user_id)
+
+    def invalidate_institution(self, institution_id):
+        with self._lock:
+            self._shared.pop(('institution', institution_id), None)
+            self._shared.pop(('all',), None)
+
+contact_service = ContactService()
+
+def _pending(session):
+    return session.info.setdefault(PENDING_KEY, [])
+
+def _membership_changed(classroom, user, initiator):
+    session = object_session(classroom) or object_session(user)
+    if session is not None:
+        _pending(session).append(('classroom', classroom.id, (user.id, classroom.teacher_id)))
+
+for _relationship in (Classroom.students, Classroom.teachers):
+    event.listen(_relationship, 'append', _membership_changed)
+    event.listen(_relationship, 'remove', _membership_changed)
+
+@event.listens_for(Classroom, 'after_insert')
+def _classroom_created(mapper, connection, classroom):
+    _pending(object_session(classroom)).append(('classroom', classroom.id, (classroom.teacher_id,)))
+
+@event.listens_for(User, 'after_insert')
+def _user_created(mapper, connection, user):
+    _pending(object_session(user)).append(('institution', user.institution_id, ()))
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _apply_invalidations(session):
+    # After commit, so a concurrent request cannot re-cache the pre-commit membership
+    for kind, key, user_ids in session.info.pop(PENDING_KEY, []):
+        if kind == 'classroom':
+            contact_service.invalidate_classroom(key, user_ids)
+        else:
+            contact_service.invalidate_institution(key)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_invalidations(session):
+    session.info.pop(PENDING_KEY, None)
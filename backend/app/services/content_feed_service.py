@@ -0,0 +1,60 @@
+import logging
+from collections import defaultdict
+from app import db
+from app.models.classroom import Classroom, classroom_students
+from app.models.content import Content, Translation, SimplificationVariant
+from app.utils.pagination import project
+
+logger = logging.getLogger("ContentFeedService")
+
+class ContentFeedService:
+    """
+    Lesson listings in a fixed number of queries: one for the contents, then
+    one each for their translations, variants and classroom language
+    settings, regardless of how many lessons the page holds.
+    """
+    def student_classroom_ids(self, student_id):
+        return [
+            row[0] for row in db.session.query(classroom_students.c.classroom_id).filter(
+                classroom_students.c.student_id == student_id
+            )
+        ]
+
+    def contents_query(self, classroom_ids):
+        return Content.query.filter(Content.classroom_id.in_(classroom_ids or []))
+
+    def contents_for_classrooms(self, classroom_ids):
+        if not classroom_ids:
+            return []
+        return self.contents_query(classroom_ids).options(db.undefer_group('body')).all()
+
+    def serialize(self, contents, include_translations=True, fields=None):
+        if fields is not None and not fields & {'translations', 'variants'}:
+            include_translations = False
+        if not include_translations or not contents:
+            return [project(c.to_dict(fields=fields), fields) for c in contents]
+
+        content_ids = [c.content_id for c in contents]
+        translations = defaultdict(list)
+        for t in Translation.query.options(db.undefer_group('body')).filter(Translation.content_id.in_(content_ids)):
+            translations[t.content_id].append(t)
+
+        variants = defaultdict(list)
+        for v in SimplificationVariant.query.filter(SimplificationVariant.content_id.in_(content_ids)):
+            variants[v.content_id].append(v)
+
+        classroom_ids = {c.classroom_id for c in contents if c.classroom_id and not c.allowed_languages}
+        classroom_languages = dict(
+            db.session.query(Classroom.id, Classroom.allowed_languages).filter(Classroom.id.in_(classroom_ids))
+        ) if classroom_ids else {}
+
+        return [
+            project(c.to_dict(
+                include_translations=True,
+                translations=translations[c.content_id],
+                variants=variants[c.content_id],
+                classroom_languages=classroom_languages.get(c.classroom_id) or '',
+                fields=fields
+            ), fields)
+            for c in contents
+        ]
@@ -0,0 +1,259 @@
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from flask import current_app
+from app import db, task_queue
+from app.models.content import Content, Translation
+from app.services.translation_service import FALLBACK_PREFIX
+
+logger = logging.getLogger("CurriculumImportService")
+
+READ_CHUNK = 1 << 16
+
+def iter_records(path):
+    """
+    Yield lesson records from a JSON array or a JSONL/NDJSON file without
+    loading the whole file: arrays are decoded one element at a time.
+    """
+    with open(path, encoding='utf-8') as f:
+        if path.endswith(('.jsonl', '.ndjson')):
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
+        yield from _iter_json_array(f)
+
+def _iter_json_array(f):
+    decoder = json.JSONDecoder()
+    buf = f.read(READ_CHUNK).lstrip()
+    if not buf.startswith('['):
+        raise ValueError("Expected a JSON array of lessons or a .jsonl file")
+    pos = 1
+    eof = False
+    while True:
+        # Skip separators, pulling more of the file in as needed
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf) or eof:
+                break
+            chunk = f.read(READ_CHUNK)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+        if pos >= len(buf):
+            raise ValueError("Unexpected end of file inside the lesson array")
+        if buf[pos] == ']':
+            return
+        try:
+            record, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(READ_CHUNK)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+            continue
+        yield record
+        pos = end
+        if pos > READ_CHUNK:
+            buf, pos = buf[pos:], 0
+
+class CurriculumImportService:
+    """
+    Bulk curriculum import: streams records, dedupes them by content hash,
+    inserts with multi-row INSERTs committed every transaction_size lessons
+    and writes a checkpoint after each commit so an interrupted import
+    resumes where it stopped. Translation and simplification are optional
+    and run as parallel task queue batches after the rows are in.
+    """
+    def __init__(self):
+        self._translation_service = None
+        self._variant_service = None
+
+    def checkpoint_path(self, path):
+        return f"{path}.import-checkpoint.json"
+
+    def fingerprint(self, path):
+        """Size and SHA-256 of the file; a checkpoint only applies to the exact file it was written for."""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(READ_CHUNK), b''):
+                digest.update(chunk)
+        return f"{os.path.getsize(path)}:{digest.hexdigest()}"
+
+    def _read_checkpoint(self, path, fingerprint):
+        checkpoint = self.checkpoint_path(path)
+        if not os.path.exists(checkpoint):
+            return 0
+        with open(checkpoint, encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('fingerprint') != fingerprint:
+            # Another file uploaded under the same name: its record offsets mean nothing here
+            logger.info(f"DEMO LOG: Ignoring stale checkpoint for {path}")
+            return 0
+        return state.get('records', 0)
+
+    def _write_checkpoint(self, path, fingerprint, stats):
+        checkpoint = self.checkpoint_path(path)
+        with open(checkpoint + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'source': os.path.abspath(path), 'fingerprint': fingerprint,
+                       'updatedAt': datetime.utcnow().isoformat(), **stats}, f)
+        os.replace(checkpoint + '.tmp', checkpoint)
+
+    def _row(self, record, defaults, now):
+        text = record.get('content') or record.get('text')
+        topic = record.get('topic') or record.get('title')
+        subject = record.get('subject') or defaults.get('subject')
+        if not text or not topic or not subject:
+            return None
+        language = record.get('language') or defaults.get('language', 'en')
+        classroom_id = record.get('classroomId') or defaults.get('classroom_id')
+        return {
+            'content_id': str(uuid.uuid4()),
+            'subject': subject,
+            'topic': topic,
+            'level': record.get('level') or defaults.get('level', 'medium'),
+            'language': language,
+            'text': text,
+            'classroom_id': classroom_id,
+            'uploaded_by': defaults.get('uploaded_by'),
+            'approved': True,
+            'created_at': now,
+            'content_hash': Content.compute_hash(subject, topic, language, text, classroom_id),
+            # Stages left pending here are finished by _process_batch, or later by reprocess.py
+            'ocr_status': Content.STATUS_DONE,
+            'translation_status': Content.STATUS_PENDING if defaults.get('target_languages') else Content.STATUS_DONE,
+            'simplification_status': Content.STATUS_PENDING,
+            'audio_status': Content.STATUS_PENDING
+        }
+
+    def import_file(self, path, subject=None, language='en', level='medium', classroom_id=None, uploaded_by=None,
+                    batch_size=None, transaction_size=None, target_languages=None, enrich=False,
+                    resume=True, job=None):
+        """
+        Import lessons from path. Records need topic (or title) and content
+        (or text); subject, language, level and classroomId fall back to the
+        arguments. Returns counts and throughput.
+        """
+        batch_size = batch_size or current_app.config.get('IMPORT_BATCH_SIZE', 500)
+        transaction_size = max(transaction_size or current_app.config.get('IMPORT_TRANSACTION_SIZE', 2000), batch_size)
+        defaults = {'subject': subject, 'language': language, 'level': level,
+                    'classroom_id': classroom_id, 'uploaded_by': uploaded_by, 'target_languages': target_languages}
+
+        fingerprint = self.fingerprint(path)
+        skip = self._read_checkpoint(path, fingerprint) if resume else 0
+        stats = {'records': 0, 'inserted': 0, 'duplicates': 0, 'invalid': 0, 'jobs': []}
+        started = time.time()
+        if skip:
+            logger.info(f"DEMO LOG: Resuming import of {path} after {skip} records")
+
+        pending, in_transaction, seen = [], 0, set()
+
+        def flush():
+            nonlocal pending
+            if not pending:
+                return []
+            existing = {
+                h for (h,) in db.session.query(Content.content_hash).filter(
+                    Content.content_hash.in_([row['content_hash'] for row in pending])
+                )
+            }
+            rows = [row for row in pending if row['content_hash'] not in existing]
+            stats['duplicates'] += len(pending) - len(rows)
+            if rows:
+                db.session.execute(db.insert(Content), rows)
+            stats['inserted'] += len(rows)
+            pending = []
+            return [row['content_id'] for row in rows]
+
+        new_ids = []
+        for record in iter_records(path):
+            stats['records'] += 1
+            if stats['records'] <= skip:
+                continue
+            row = self._row(record, defaults, datetime.utcnow()) if isinstance(record, dict) else None
+            if row is None:
+                stats['invalid'] += 1
+                continue
+            if row['content_hash'] in seen:
+                stats['duplicates'] += 1
+                continue
+            seen.add(row['content_hash'])
+            pending.append(row)
+            in_transaction += 1
+            if len(pending) >= batch_size:
+                new_ids += flush()
+            if in_transaction >= transaction_size:
+                new_ids += flush()
+                self._commit(path, fingerprint, stats, new_ids, target_languages, enrich, job)
+                new_ids, in_transaction, seen = [], 0, set()
+
+        new_ids += flush()
+        self._commit(path, fingerprint, stats, new_ids, target_languages, enrich, job)
+        # A finished import starts from the top next time; the content hashes skip what is already in
+        if os.path.exists(self.checkpoint_path(path)):
+            os.remove(self.checkpoint_path(path))
+
+        elapsed = time.time() - started
+        stats['seconds'] = round(elapsed, 2)
+        stats['lessonsPerSecond'] = round(stats['inserted'] / elapsed, 1) if elapsed else None
+        logger.info(f"DEMO LOG: Imported {stats['inserted']} lessons from {path} ({stats['duplicates']} duplicates) in {elapsed:.1f}s")
+        return stats
+
+    def _commit(self, path, fingerprint, stats, content_ids, target_languages, enrich, job):
+        db.session.commit()
+        self._write_checkpoint(path, fingerprint, {k: v for k, v in stats.items() if k != 'jobs'})
+        if job:
+            job.update(done=stats['records'], message=f"{stats['inserted']} lessons imported")
+        # Indexing always runs; translation/simplification only when asked. Batches run in parallel on the workers.
+        size = current_app.config.get('IMPORT_PROCESS_BATCH', 50)
+        for start in range(0, len(content_ids), size):
+            chunk = content_ids[start:start + size]
+            stats['jobs'].append(task_queue.submit(
+                self._process_batch, chunk, list(target_languages or []), enrich, name=f"import:{os.path.basename(path)}"
+            ))
+
+    def _services(self):
+        if self._translation_service is None:
+            from app.services.translation_service import TranslationService
+            from app.services.variant_service import VariantService
+            self._translation_service = TranslationService()
+            self._variant_service = VariantService()
+        return self._translation_service, self._variant_service
+
+    def _process_batch(self, job, content_ids, target_languages, enrich):
+        from app.services.search_service import search_service
+        from app.services.term_index_service import term_index_service
+
+        contents = Content.query.options(db.undefer_group('body')).filter(Content.content_id.in_(content_ids)).all()
+        job.update(done=0, total=len(contents), message='Processing imported lessons')
+        for content in contents:
+            translations = {}
+            if target_languages:
+                translation_service, _ = self._services()
+                translations = translation_service.translate_to_multiple(content.text, target_languages)
+                for lang, text in translations.items():
+                    db.session.add(Translation(content_id=content.content_id, language=lang, translated_text=text))
+                failed = any(text.startswith(FALLBACK_PREFIX) for text in translations.values())
+                content.translation_status = Content.STATUS_FAILED if failed else Content.STATUS_DONE
+            if enrich:
+                _, variant_service = self._services()
+                db.session.flush()
+                variant_service.precompute(content)
+                content.simplification_status = Content.STATUS_DONE
+            term_index_service.index_content(content)
+            search_service.index_content(content, translations)
+            job.advance()
+        db.session.commit()
+        if current_app.config.get('SEMANTIC_SEARCH', True):
+            from app.services.semantic_search_service import semantic_search_service
+            semantic_search_service.add_contents(contents)
+            semantic_search_service.save()
+        return {'processed': len(contents)}
+
+curriculum_import_service = CurriculumImportService()
@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+from app import db
+from app.models.quiz import Quiz, Question, StudentQuizAttempt
+from app.services.analytics_service import analytics_service
+from app.utils.db_engine import RoutingSession
+
+logger = logging.getLogger("GradingService")
+
+def normalize_answer(answer):
+    return str(answer).strip().casefold() if answer is not None else ''
+
+class GradingService:
+    """
+    Grades quiz attempts against compiled answer keys
+    ({question_id: normalized answer}) cached per quiz. Keys are dropped
+    when a change to a quiz or one of its questions commits in this process, and
+    expire after GRADING_KEY_TTL so other workers pick up edits too.
+    """
+    def __init__(self):
+        self._keys = {}
+        self._lock = threading.Lock()
+
+    def invalidate(self, quiz_id):
+        with self._lock:
+            self._keys.pop(quiz_id, None)
+
+    def answer_keys(self, quiz_ids):
+        """Compiled keys for many quizzes; cache misses are loaded in one query."""
+        ttl = current_app.config.get('GRADING_KEY_TTL', 600)
+        now = time.time()
+        keys = {}
+        missing = []
+        for quiz_id in set(quiz_ids):
+            cached = self._keys.get(quiz_id)
+            if cached and now - cached['compiledAt'] < ttl:
+                keys[quiz_id] = cached
+            else:
+                missing.append(quiz_id)
+
+        if missing:
+            compiled = {quiz_id: {'compiledAt': now, 'answers': {}} for quiz_id in missing}
+            for quiz_id, question_id, correct in db.session.query(
+                Question.quiz_id, Question.id, Question.correct_answer
+            ).filter(Question.quiz_id.in_(missing)):
+                compiled[quiz_id]['answers'][str(question_id)] = normalize_answer(correct)
+
+            # Quizzes without questions are still valid keys if the quiz exists
+            empty = [quiz_id for quiz_id, key in compiled.items() if not key['answers']]
+            existing = {row[0] for row in db.session.query(Quiz.id).filter(Quiz.id.in_(empty))} if empty else set()
+            with self._lock:
+                for quiz_id, key in compiled.items():
+                    if key['answers'] or quiz_id in existing:
+                        self._keys[quiz_id] = key
+                        keys[quiz_id] = key
+        return keys
+
+    def score(self, key, answers):
+        answers = answers or {}
+        score = sum(
+            1 for question_id, correct in key['answers'].items()
+            if normalize_answer(answers.get(question_id)) == correct and correct != ''
+        )
+        return score, len(key['answers'])
+
+    def grade(self, quiz_id, answers):
+        """(score, total) for one submission, or None if the quiz does not exist."""
+        key = self.answer_keys([quiz_id]).get(quiz_id)
+        return self.score(key, answers) if key else None
+
+    def grade_many(self, attempts):
+        """
+        Grade many submissions and store them with a single bulk INSERT and
+        one commit. attempts: [{'quizId', 'studentId', 'answers'}].
+        Returns one result per attempt, in order.
+        """
+        keys = self.answer_keys([a.get('quizId') for a in attempts if a.get('quizId')])
+        completed_at = datetime.utcnow()
+
+        rows = []
+        results = []
+        for attempt in attempts:
+            quiz_id, student_id = attempt.get('quizId'), attempt.get('studentId')
+            key = keys.get(quiz_id)
+            if not key or not student_id:
+                results.append({'quizId': quiz_id, 'studentId': student_id, 'error': 'Unknown quiz or missing student'})
+                continue
+            score, total = self.score(key, attempt.get('answers'))
+            rows.append({
+                'quiz_id': quiz_id,
+                'student_id': student_id,
+                'score': score,
+                'total_questions': total,
+                'completed_at': completed_at
+            })
+            results.append({'quizId': quiz_id, 'studentId': student_id, 'score': score, 'total': total})
+
+        if rows:
+            db.session.execute(db.insert(StudentQuizAttempt), rows)
+            analytics_service.record_attempts(rows)
+            db.session.commit()
+        logger.info(f"Graded {len(rows)} of {len(attempts)} submitted attempts in bulk")
+        return results, rows
+
+grading_service = GradingService()
+
+PENDING_KEY = 'grading_invalidations'
+
+def _defer_invalidation(target, quiz_id):
+    # Dropped only once the change is committed; dropping at flush would let a
+    # concurrent grader re-cache the old key from the still-committed rows
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(PENDING_KEY, set()).add(quiz_id)
+
+@event.listens_for(Question, 'after_insert')
+@event.listens_for(Question, 'after_update')
+@event.listens_for(Question, 'after_delete')
+def _question_changed(mapper, connection, target):
+    _defer_invalidation(target, target.quiz_id)
+
+@event.listens_for(Quiz, 'after_delete')
+def _quiz_deleted(mapper, connection, target):
+    _defer_invalidation(target, target.id)
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _apply_invalidations(session):
+    for quiz_id in session.info.pop(PENDING_KEY, ()):
+        grading_service.invalidate(quiz_id)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _discard_invalidations(session):
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,88 @@
+import logging
+from app import db
+from app.models.dm import DirectMessage, ConversationSummary
+from app.utils.db_utils import upsert_add
+from app.utils.pagination import paginate
+
+logger = logging.getLogger("InboxService")
+
+class InboxService:
+    """
+    Conversation list per user: latest message and unread count per peer,
+    maintained on every send and read in the same transaction as the
+    message, so listing an inbox never aggregates direct_messages.
+    Callers commit.
+    """
+    def record_messages(self, messages):
+        """Move both participants' summaries to each new message; the receiver gets one more unread."""
+        rows = []
+        for m in messages:
+            if m.sender_id == m.receiver_id:
+                continue
+            rows.append({'user_id': m.sender_id, 'peer_id': m.receiver_id, 'last_message_id': m.id,
+                         'last_timestamp': m.timestamp, 'unread_count': 0})
+            rows.append({'user_id': m.receiver_id, 'peer_id': m.sender_id, 'last_message_id': m.id,
+                         'last_timestamp': m.timestamp, 'unread_count': 1})
+        if rows:
+            upsert_add(
+                ConversationSummary.__table__,
+                rows,
+                index_elements=['user_id', 'peer_id'],
+                increments=['unread_count'],
+                replace=['last_message_id', 'last_timestamp']
+            )
+
+    def mark_read(self, user_id, peer_id, count):
+        ConversationSummary.query.filter_by(user_id=user_id, peer_id=peer_id).update(
+            {ConversationSummary.unread_count: db.case(
+                (ConversationSummary.unread_count > count, ConversationSummary.unread_count - count), else_=0
+            )},
+            synchronize_session=False
+        )
+
+    def inbox(self, user_id):
+        """
+        One page of user_id's conversations, most recent first, with peers,
+        last messages and their senders joined in: a single query per page.
+        Returns (summaries, next_cursor).
+        """
+        query = ConversationSummary.query.filter_by(user_id=user_id).options(
+            db.joinedload(ConversationSummary.peer),
+            db.joinedload(ConversationSummary.last_message).joinedload(DirectMessage.sender)
+        )
+        return paginate(query, ConversationSummary.last_timestamp, ConversationSummary.peer_id)
+
+    def is_empty(self):
+        return db.session.query(ConversationSummary.user_id).first() is None
+
+    def rebuild(self):
+        """Recompute every summary from direct_messages with one window query. Caller commits."""
+        ConversationSummary.query.delete()
+        m = DirectMessage
+        both_sides = db.union_all(
+            db.select(
+                m.sender_id.label('user_id'), m.receiver_id.label('peer_id'), m.id.label('message_id'),
+                m.timestamp.label('timestamp'), db.literal(0).label('unread')
+            ).where(m.sender_id != m.receiver_id),
+            db.select(
+                m.receiver_id, m.sender_id, m.id, m.timestamp,
+                db.case((m.read.is_(True), 0), else_=1)
+            ).where(m.sender_id != m.receiver_id)
+        ).subquery()
+        window = {'partition_by': (both_sides.c.user_id, both_sides.c.peer_id)}
+        ranked = db.select(
+            both_sides.c.user_id, both_sides.c.peer_id, both_sides.c.message_id, both_sides.c.timestamp,
+            db.func.row_number().over(
+                order_by=(both_sides.c.timestamp.desc(), both_sides.c.message_id.desc()), **window
+            ).label('position'),
+            db.func.sum(both_sides.c.unread).over(**window).label('unread_count')
+        ).subquery()
+        latest = db.select(
+            ranked.c.user_id, ranked.c.peer_id, ranked.c.message_id, ranked.c.timestamp, ranked.c.unread_count
+        ).where(ranked.c.position == 1)
+        db.session.execute(db.insert(ConversationSummary).from_select(
+            ['user_id', 'peer_id', 'last_message_id', 'last_timestamp', 'unread_count'], latest
+        ))
+        logger.info("DM conversation summaries rebuilt from direct_messages")
+
+inbox_service = InboxService()
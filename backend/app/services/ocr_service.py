@@ -49,6 +49,7 @@ class OCRService:
             return f"Error extracting text: {str(e)}"
 
     def _extract_from_image(self, image_path, language='en'):
+        processed_path = image_path + ".processed.jpg"
         try:
             # Load image
             img = cv2.imread(image_path)
@@ -60,14 +61,11 @@ class OCRService:
             denoised = cv2.fastNlMeansDenoising(gray, h=10)
             _, thresh = cv2.threshold(denoised, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
             
-            processed_path = image_path + ".processed.jpg"
             cv2.imwrite(processed_path, thresh)
             
             lang = self.lang_map.get(language, 'eng')
-            text = pytesseract.image_to_string(Image.open(processed_path), lang=lang)
-            
-            if os.path.exists(processed_path):
-                os.remove(processed_path)
+            with Image.open(processed_path) as processed:
+                text = pytesseract.image_to_string(processed, lang=lang)
                 
             return text.strip()
         except Exception as e:
@@ -77,6 +75,10 @@ class OCRService:
                 return pytesseract.image_to_string(Image.open(image_path), lang=lang).strip()
             except:
                 return "__OCR_FAILED__"
+        finally:
+            # Removed on every path; a failed OCR used to leave it in UPLOAD_FOLDER
+            if os.path.exists(processed_path):
+                os.remove(processed_path)
 
     def _extract_from_pdf(self, pdf_path):
         """Use pdfplumber for high-quality text extraction from PDFs"""
@@ -0,0 +1,178 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+from flask import current_app
+from PIL import Image, ImageOps
+from app import db, task_queue
+
+logger = logging.getLogger("PreviewService")
+
+IMAGE_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif', 'webp', 'bmp'}
+VIDEO_EXTENSIONS = {'mp4', 'webm', 'mov', 'avi', 'mkv'}
+PDF_EXTENSIONS = {'pdf'}
+OFFICE_EXTENSIONS = {'doc', 'docx'}
+
+# Derivative -> (longest side in px, WebP quality)
+SIZES = {
+    'thumb': (320, 70),    # chat bubbles and lesson cards
+    'display': (1280, 80)  # in-app viewer; the original stays the download
+}
+
+class PreviewService:
+    """
+    WebP thumbnails and downscales of shared media, built in the background:
+    images are downscaled, PDFs and Word files render their first page and
+    videos contribute a poster frame. Derivatives are stored under
+    previews/ by the SHA-256 of the source, so the same file uploaded twice
+    is rendered once and every derivative URL is immutable.
+    """
+    def kind(self, filename):
+        ext = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+        if ext in IMAGE_EXTENSIONS:
+            return 'image'
+        if ext in VIDEO_EXTENSIONS:
+            return 'video'
+        if ext in PDF_EXTENSIONS:
+            return 'pdf'
+        if ext in OFFICE_EXTENSIONS:
+            return 'office'
+        return None
+
+    def source_hash(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _relative_dir(self, digest):
+        return os.path.join('previews', digest[:2])
+
+    def enqueue(self, model, pk, path, on_ready=None):
+        """
+        Queue previews for the file at path and store them on model row pk
+        (its previews column). on_ready(row) runs after they are committed.
+        """
+        if task_queue.app is None or not current_app.config.get('PREVIEWS_ENABLED', True):
+            return None
+        if not self.kind(os.path.basename(path)):
+            return None
+        # Behind narration, like audio transcoding: a missing thumbnail only costs bandwidth
+        return task_queue.submit(self._preview_job, model, pk, path, on_ready,
+                                 priority=-1, name=f"preview:{os.path.basename(path)}")
+
+    def _preview_job(self, job, model, pk, path, on_ready):
+        job.update(done=0, total=1, message=f"Rendering previews of {os.path.basename(path)}")
+        previews = self.generate(path)
+        row = db.session.get(model, pk)
+        if previews is None or row is None:
+            return None
+        row.previews = previews
+        db.session.commit()
+        job.advance()
+        if on_ready:
+            on_ready(row)
+        return previews
+
+    def generate(self, path):
+        """{thumb, display: URL, width, height} of the source, rendering only what is not already stored."""
+        kind = self.kind(os.path.basename(path))
+        if not kind or not os.path.exists(path):
+            return None
+        digest = self.source_hash(path)
+        upload_dir = current_app.config['UPLOAD_FOLDER']
+        relative_dir = self._relative_dir(digest)
+        manifest = os.path.join(upload_dir, relative_dir, f"{digest}.json")
+        if os.path.exists(manifest):
+            with open(manifest, encoding='utf-8') as f:
+                previews = json.load(f)
+            # Reused by a new row: refresh mtimes so storage GC's grace period covers it
+            for stored in [manifest] + [os.path.join(upload_dir, previews[name].split('/uploads/', 1)[-1]) for name in SIZES]:
+                if os.path.exists(stored):
+                    os.utime(stored)
+            return previews
+
+        try:
+            image = self._render(path, kind)
+        except Exception as e:
+            logger.error(f"DEMO LOG ERROR: Preview of {os.path.basename(path)} failed: {e}")
+            return None
+        if image is None:
+            return None
+
+        os.makedirs(os.path.join(upload_dir, relative_dir), exist_ok=True)
+        previews = {'kind': kind, 'width': image.width, 'height': image.height}
+        for name, (side, quality) in SIZES.items():
+            relative = os.path.join(relative_dir, f"{digest}-{name}.webp")
+            target = os.path.join(upload_dir, relative)
+            if not os.path.exists(target):
+                copy = image.copy()
+                copy.thumbnail((side, side), Image.LANCZOS)
+                copy.save(target + '.part', 'WEBP', quality=quality, method=4)
+                os.replace(target + '.part', target)
+            previews[name] = f"/uploads/{relative.replace(os.sep, '/')}"
+
+        with open(manifest + '.part', 'w', encoding='utf-8') as f:
+            json.dump(previews, f)
+        os.replace(manifest + '.part', manifest)
+        logger.info(f"DEMO LOG: Previews for {os.path.basename(path)} ({kind}, {image.width}x{image.height})")
+        return previews
+
+    def _render(self, path, kind):
+        if kind == 'image':
+            return self._image(path)
+        if kind == 'pdf':
+            return self._pdf_page(path)
+        if kind == 'office':
+            return self._office_page(path)
+        return self._poster_frame(path)
+
+    def _image(self, path):
+        with Image.open(path) as image:
+            image.seek(0)
+            # Phone photos are stored sideways with an EXIF rotation
+            image = ImageOps.exif_transpose(image)
+            return image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+    def _pdf_page(self, path):
+        from pdf2image import convert_from_path
+        dpi = current_app.config.get('PREVIEW_PDF_DPI', 100)
+        pages = convert_from_path(path, dpi=dpi, first_page=1, last_page=1)
+        return pages[0].convert('RGB') if pages else None
+
+    def _office_page(self, path):
+        # Word files go through LibreOffice to PDF, then render like any PDF
+        soffice = current_app.config.get('SOFFICE_BINARY') or shutil.which('soffice') or shutil.which('libreoffice')
+        if not soffice:
+            logger.warning("DEMO LOG: LibreOffice not available, skipping document preview")
+            return None
+        with tempfile.TemporaryDirectory() as out_dir:
+            subprocess.run([soffice, '--headless', '--convert-to', 'pdf', '--outdir', out_dir, path],
+                           check=True, capture_output=True, timeout=current_app.config.get('PREVIEW_TIMEOUT', 120))
+            pdf = os.path.join(out_dir, os.path.splitext(os.path.basename(path))[0] + '.pdf')
+            return self._pdf_page(pdf) if os.path.exists(pdf) else None
+
+    def _poster_frame(self, path):
+        import cv2
+        capture = cv2.VideoCapture(path)
+        try:
+            # One second in (or a tenth of short clips) skips black lead-in frames
+            fps = capture.get(cv2.CAP_PROP_FPS) or 25
+            frames = capture.get(cv2.CAP_PROP_FRAME_COUNT) or 0
+            position = min(fps, frames / 10) if frames else 0
+            capture.set(cv2.CAP_PROP_POS_FRAMES, int(position))
+            ok, frame = capture.read()
+            if not ok:
+                capture.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                ok, frame = capture.read()
+            if not ok:
+                return None
+            return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        finally:
+            capture.release()
+
+preview_service = PreviewService()
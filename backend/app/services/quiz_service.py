@@ -1,6 +1,9 @@
 import random
+import re
 import uuid
 import logging
+from collections import Counter
+from app.utils.text_utils import split_sentences, tokenize_words
 
 logger = logging.getLogger("QuizService")
 
@@ -8,48 +11,88 @@ class QuizService:
     def __init__(self):
         pass
 
-    def generate_quiz(self, content_text, level='medium', num_questions=3):
+    def generate_quiz(self, content_text, level='medium', num_questions=3, keywords=None, distractors=None):
         """
-        Generate a 3-question quiz for the demo with heuristics
+        Generate a fill-in-the-blank quiz around the lesson's keywords.
+        keywords: ranked keyword list (e.g. from the classroom term index);
+        distractors: callable(term, k, exclude) returning wrong answers.
+        Both fall back to statistics of the lesson text itself.
         """
         logger.info(f"DEMO LOG: Quiz Generation Request -> Level: {level}")
-        
+
         try:
-            sentences = [s.strip() for s in content_text.split('.') if len(s.strip()) > 15]
+            sentences = [s for s in split_sentences(content_text or '') if len(s) > 15]
             if not sentences:
-                sentences = ["This lesson is about learning.", "Education is important.", "Knowledge is power."]
+                sentences = ["This lesson is about learning", "Education is important", "Knowledge is power"]
+
+            local_keywords = self._local_keywords(content_text)
+            local_distractors = self._local_distractors(local_keywords)
+            if keywords is None:
+                keywords = local_keywords
+            if distractors is None:
+                distractors = local_distractors
 
             questions = []
-            
-            # Use top sentences to create questions
-            for i in range(min(num_questions, len(sentences))):
-                sentence = sentences[i]
-                
-                # Simple MCQ logic: find a noun-like word or keyword to blank out
-                words = sentence.split()
-                if len(words) > 5:
-                    keyword = words[random.randint(2, len(words)-1)]
-                    display_q = sentence.replace(keyword, "__________")
-                    
+            used = set()
+
+            # One question per keyword, anchored on the first unused sentence that mentions it
+            for keyword in keywords:
+                if len(questions) >= num_questions:
+                    break
+                pattern = re.compile(rf'(?<![\w]){re.escape(keyword)}(?![\w])', re.IGNORECASE)
+                for idx, sentence in enumerate(sentences):
+                    match = pattern.search(sentence) if idx not in used else None
+                    if not match:
+                        continue
+                    # Options share one case: a capitalised answer among lowercase distractors would give it away
+                    answer = match.group(0).lower()
+                    exclude = [w.lower() for w in sentence.split()]
+                    wrong = [w.lower() for w in distractors(keyword, 3, exclude=exclude)]
+                    if len(wrong) < 3:
+                        wrong += [w.lower() for w in local_distractors(keyword, 3 - len(wrong), exclude=exclude + wrong)]
+                    if not wrong:
+                        break
+                    options = [answer] + wrong
+                    random.shuffle(options)
+                    used.add(idx)
                     questions.append({
                         'id': str(uuid.uuid4()),
-                        'question': f"Question {i+1}: Fill in the blank:\n'{display_q}'",
-                        'options': [keyword, "Unknown", "Incorrect", "Placeholder"],
-                        'correctAnswer': keyword,
+                        'question': f"Question {len(questions)+1}: Fill in the blank:\n'{pattern.sub('__________', sentence, count=1)}'",
+                        'options': options,
+                        'correctAnswer': answer,
                         'explanation': f"Based on the sentence: '{sentence}'"
                     })
-                else:
-                    questions.append({
-                        'id': str(uuid.uuid4()),
-                        'question': f"True or False: {sentence}",
-                        'options': ["True", "False"],
-                        'correctAnswer': "True",
-                        'explanation': "The lesson explicitly states this."
-                    })
-            
+                    break
+
+            # Short lessons: fall back to true/false statements
+            for idx, sentence in enumerate(sentences):
+                if len(questions) >= num_questions:
+                    break
+                if idx in used:
+                    continue
+                used.add(idx)
+                questions.append({
+                    'id': str(uuid.uuid4()),
+                    'question': f"True or False: {sentence}",
+                    'options': ["True", "False"],
+                    'correctAnswer': "True",
+                    'explanation': "The lesson explicitly states this."
+                })
+
             logger.info(f"DEMO LOG: Generated {len(questions)} quiz questions.")
             return questions
-            
+
         except Exception as e:
             logger.error(f"DEMO LOG ERROR: Quiz generation failed: {e}")
             return []
+
+    def _local_keywords(self, text):
+        # Frequent, longer words carry more information than short common ones
+        counts = Counter(tokenize_words(text, min_length=4))
+        return [word for word, _ in sorted(counts.items(), key=lambda item: (-item[1] * len(item[0]), item[0]))]
+
+    def _local_distractors(self, keywords):
+        def pick(term, k, exclude=()):
+            excluded = set(exclude) | {term}
+            return [w for w in keywords if w not in excluded and w[:4] != term[:4]][:k]
+        return pick
@@ -0,0 +1,328 @@
+import json
+import logging
+import os
+import time
+from collections import Counter
+from datetime import datetime
+from flask import current_app
+from app import db, task_queue
+from app.models.content import Content, Translation
+from app.services.lesson_template import generate_lesson_content, is_extraction_failure
+from app.services.translation_service import FALLBACK_PREFIX
+
+logger = logging.getLogger("ReprocessService")
+
+STAGES = ('ocr', 'translate', 'simplify', 'tts')
+VIDEO_TYPES = ('mp4', 'mov', 'avi', 'mkv')
+
+# Status column per stage and the statuses that make a lesson a target for it
+STAGE_COLUMNS = {
+    'ocr': Content.ocr_status,
+    'translate': Content.translation_status,
+    'simplify': Content.simplification_status,
+    'tts': Content.audio_status,
+}
+STAGE_TARGETS = {
+    'ocr': (Content.STATUS_FAILED,),
+    'translate': (Content.STATUS_PENDING, Content.STATUS_FAILED),
+    'simplify': (Content.STATUS_PENDING, Content.STATUS_FAILED),
+    'tts': (Content.STATUS_PENDING, Content.STATUS_FAILED),
+}
+
+class ReprocessService:
+    """
+    Re-runs failed or pending processing stages (OCR, translation,
+    simplification, narration) over the lesson library. Targets come from
+    the indexed per-stage status columns, so a run only touches lessons that
+    need work. Lessons are handed out in keyset order in waves of parallel
+    task queue chunks; each lesson is committed once its stages are done and
+    a checkpoint is written after every wave, so an interrupted run resumes
+    after the last finished wave.
+    """
+    def __init__(self):
+        self._services = {}
+
+    def _service(self, name):
+        # Built on first use: a translate-only run never loads OCR, a dry run loads nothing
+        if name not in self._services:
+            if name == 'ocr':
+                from app.services.ocr_service import OCRService
+                self._services[name] = OCRService()
+            elif name == 'stt':
+                from app.services.stt_service import STTService
+                self._services[name] = STTService()
+            elif name == 'translate':
+                from app.services.translation_service import TranslationService
+                self._services[name] = TranslationService()
+            elif name == 'simplify':
+                from app.services.variant_service import VariantService
+                self._services[name] = VariantService()
+            elif name == 'tts':
+                from app.services.audio_pipeline_service import AudioPipelineService
+                self._services[name] = AudioPipelineService()
+        return self._services[name]
+
+    def checkpoint_path(self, stages):
+        directory = current_app.config.get('REPROCESS_CHECKPOINT_DIR') or os.getcwd()
+        return os.path.join(directory, f".reprocess-{'-'.join(stages)}.json")
+
+    def _read_checkpoint(self, path):
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _write_checkpoint(self, path, state):
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({**state, 'updatedAt': datetime.utcnow().isoformat()}, f)
+        os.replace(path + '.tmp', path)
+
+    def targets_query(self, stages):
+        """Lessons with a requested stage pending/failed, plus rows not classified yet (NULL flags)."""
+        conditions = [Content.ocr_status.is_(None)] + [
+            STAGE_COLUMNS[stage].in_(STAGE_TARGETS[stage]) for stage in stages
+        ]
+        return db.session.query(Content.content_id).filter(db.or_(*conditions))
+
+    def run(self, stages=STAGES, chunk_size=None, workers=None, limit=None, dry_run=False, resume=True, on_wave=None):
+        """
+        Process every target lesson for stages. Returns counts per stage and
+        status, plus throughput. on_wave(stats) is called after each wave.
+        """
+        stages = [stage for stage in STAGES if stage in stages]
+        chunk_size = chunk_size or current_app.config.get('REPROCESS_CHUNK_SIZE', 25)
+        workers = workers or current_app.config.get('TASK_QUEUE_WORKERS', 2)
+
+        checkpoint = self.checkpoint_path(stages)
+        state = (self._read_checkpoint(checkpoint) if resume and not dry_run else None) or {}
+        cursor = state.get('cursor')
+        stats = {'lessons': state.get('lessons', 0), 'stages': Counter(), 'errors': state.get('errors', 0)}
+        for key, count in state.get('stages', {}).items():
+            stats['stages'][key] = count
+        if cursor:
+            logger.info(f"DEMO LOG: Resuming reprocessing of {stages} after {cursor}")
+
+        started = time.time()
+        seen = 0
+        while limit is None or seen < limit:
+            query = self.targets_query(stages)
+            if cursor:
+                query = query.filter(Content.content_id > cursor)
+            wave = chunk_size * workers
+            if limit is not None:
+                wave = min(wave, limit - seen)
+            ids = [content_id for (content_id,) in query.order_by(Content.content_id).limit(wave)]
+            if not ids:
+                break
+
+            chunks = [ids[start:start + chunk_size] for start in range(0, len(ids), chunk_size)]
+            if dry_run:
+                results = [self._plan_chunk(chunk, stages) for chunk in chunks]
+            else:
+                results = self._run_wave(chunks, stages)
+            for result in results:
+                stats['lessons'] += result['lessons']
+                stats['errors'] += result.get('errors', 0)
+                stats['stages'].update(result['stages'])
+
+            seen += len(ids)
+            cursor = ids[-1]
+            if not dry_run:
+                self._write_checkpoint(checkpoint, {
+                    'stages': dict(stats['stages']), 'cursor': cursor,
+                    'lessons': stats['lessons'], 'errors': stats['errors']
+                })
+            if on_wave:
+                on_wave(stats)
+
+        # A finished pass starts from the top next time, retrying whatever failed again
+        if not dry_run and (limit is None or seen < limit) and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+
+        elapsed = time.time() - started
+        stats['stages'] = dict(stats['stages'])
+        stats['seconds'] = round(elapsed, 2)
+        stats['lessonsPerSecond'] = round(seen / elapsed, 1) if elapsed else None
+        logger.info(f"DEMO LOG: Reprocessed {seen} lessons for {stages} in {elapsed:.1f}s")
+        return stats
+
+    def _run_wave(self, chunks, stages):
+        job_ids = [
+            task_queue.submit(self._process_chunk, chunk, stages, name=f"reprocess:{chunk[0]}")
+            for chunk in chunks
+        ]
+        task_queue.join()
+        results = []
+        for job_id, chunk in zip(job_ids, chunks):
+            job = task_queue.get(job_id)
+            if job and job.status == 'finished':
+                results.append(job.result)
+            else:
+                # Lessons committed before the failure keep their new flags; the rest are retried next pass
+                logger.error(f"Reprocessing chunk starting at {chunk[0]} failed: {job.error if job else 'unknown'}")
+                results.append({'lessons': 0, 'errors': len(chunk), 'stages': {}})
+        return results
+
+    def _load(self, content_ids):
+        contents = Content.query.options(db.undefer_group('body')).filter(Content.content_id.in_(content_ids)).all()
+        translations = {}
+        for t in Translation.query.options(db.undefer_group('body')).filter(Translation.content_id.in_(content_ids)):
+            translations.setdefault(t.content_id, []).append(t)
+        return contents, translations
+
+    def classify(self, content, translations):
+        """Set the stage flags of a lesson saved before they existed, from what is stored."""
+        content.ocr_status = Content.STATUS_FAILED if is_extraction_failure(content.text) else Content.STATUS_DONE
+        content.translation_status = (
+            Content.STATUS_FAILED if any((t.translated_text or '').startswith(FALLBACK_PREFIX) for t in translations)
+            else Content.STATUS_DONE
+        )
+        content.simplification_status = (
+            Content.STATUS_DONE if all(row.simplified_text and row.explanation_text for row in [content] + translations)
+            else Content.STATUS_PENDING
+        )
+        content.audio_status = (
+            Content.STATUS_DONE if all(row.audio_url for row in [content] + translations) else Content.STATUS_PENDING
+        )
+
+    def _needs(self, content, stage):
+        return getattr(content, STAGE_COLUMNS[stage].key) in STAGE_TARGETS[stage]
+
+    def _plan_chunk(self, content_ids, stages):
+        """Dry run: classify in memory and count what would run, without calling any service or writing."""
+        contents, translations = self._load(content_ids)
+        planned = Counter()
+        for content in contents:
+            if content.ocr_status is None:
+                self.classify(content, translations.get(content.content_id, []))
+            would_run = [stage for stage in stages if self._needs(content, stage)]
+            # Fixing OCR changes the text, so every later requested stage runs too
+            if 'ocr' in would_run:
+                would_run = ['ocr'] + [stage for stage in stages if stage != 'ocr']
+            planned.update(f"{stage}:planned" for stage in would_run)
+        db.session.rollback()
+        return {'lessons': len(contents), 'stages': planned}
+
+    def _process_chunk(self, job, content_ids, stages):
+        contents, translations = self._load(content_ids)
+        job.update(done=0, total=len(contents), message='Reprocessing lessons')
+        counts = Counter()
+        changed = []
+        for content in contents:
+            rows = translations.get(content.content_id, [])
+            if content.ocr_status is None:
+                self.classify(content, rows)
+            ran = [stage for stage in stages if self._needs(content, stage)]
+            text_changed = False
+            if 'ocr' in ran:
+                text_changed = self._ocr(content)
+                counts[f"ocr:{content.ocr_status}"] += 1
+            # Stages are re-checked: fixing the text makes the later ones pending
+            if 'translate' in stages and self._needs(content, 'translate'):
+                rows, translated = self._translate(content, rows, retranslate_all=text_changed)
+                text_changed = text_changed or translated
+                counts[f"translate:{content.translation_status}"] += 1
+            if 'simplify' in stages and self._needs(content, 'simplify'):
+                self._simplify(content, rows)
+                counts[f"simplify:{content.simplification_status}"] += 1
+            if 'tts' in stages and self._needs(content, 'tts'):
+                self._service('tts').generate_for_content(content, rows, commit=False)
+                counts[f"tts:{content.audio_status}"] += 1
+            if text_changed:
+                self._reindex(content, rows)
+                changed.append(content.content_id)
+            if ran or text_changed:
+                # Flags and results land together, so an interrupted chunk only redoes the lesson in flight
+                db.session.commit()
+            job.advance()
+        # Lessons that were only classified
+        db.session.commit()
+
+        if changed and current_app.config.get('SEMANTIC_SEARCH', True):
+            from app.services.semantic_search_service import semantic_search_service
+            for content_id in changed:
+                semantic_search_service.enqueue_content(content_id)
+        return {'lessons': len(contents), 'stages': dict(counts)}
+
+    def _ocr(self, content):
+        """Re-extract from the original upload; fall back to the lesson template. Returns True if the text changed."""
+        text = None
+        path = os.path.join(current_app.config['UPLOAD_FOLDER'], content.original_file_url or '')
+        if content.original_file_url and os.path.exists(path):
+            if content.file_type in VIDEO_TYPES:
+                text = self._service('stt').extract_text_from_video(path, language=content.language)
+            else:
+                text = self._service('ocr').extract_text(path, content.file_type, content.language)
+
+        if text and not is_extraction_failure(text):
+            content.ocr_status = Content.STATUS_DONE
+        elif is_extraction_failure(content.text):
+            text = generate_lesson_content(content.topic, content.subject, content.level)
+            content.ocr_status = Content.STATUS_FALLBACK
+        else:
+            # Already replaced by the template earlier; keep it
+            content.ocr_status = Content.STATUS_FALLBACK
+            return False
+
+        content.text = text
+        content.content_hash = Content.compute_hash(
+            content.subject, content.topic, content.language, text, content.classroom_id
+        )
+        # Everything derived from the old text is stale now
+        content.translation_status = Content.STATUS_PENDING
+        content.simplification_status = Content.STATUS_PENDING
+        content.audio_status = Content.STATUS_PENDING
+        return True
+
+    def _translate(self, content, rows, retranslate_all=False):
+        """
+        Retranslate failed translations (all of them when the text changed)
+        and add any allowed language that is missing. Returns the translation
+        rows and whether any text was (re)translated.
+        """
+        existing = {t.language: t for t in rows}
+        allowed = [lang for lang in (content.allowed_languages or '').split(',') if lang]
+        languages = [
+            lang for lang in dict.fromkeys(list(existing) + allowed)
+            if lang != content.language and (
+                retranslate_all or lang not in existing
+                or (existing[lang].translated_text or '').startswith(FALLBACK_PREFIX)
+            )
+        ]
+        results = self._service('translate').translate_to_multiple(content.text, languages)
+        for lang, text in results.items():
+            if lang in existing:
+                existing[lang].translated_text = text
+                existing[lang].simplified_text = None
+                existing[lang].audio_url = None
+            else:
+                existing[lang] = Translation(content_id=content.content_id, language=lang, translated_text=text)
+                db.session.add(existing[lang])
+
+        failed = any((t.translated_text or '').startswith(FALLBACK_PREFIX) for t in existing.values())
+        content.translation_status = Content.STATUS_FAILED if failed else Content.STATUS_DONE
+        if results:
+            content.simplification_status = Content.STATUS_PENDING
+            content.audio_status = Content.STATUS_PENDING
+        return list(existing.values()), bool(results)
+
+    def _simplify(self, content, rows):
+        # precompute() keeps an existing simplified_text, so clear the stale ones first
+        for row in [content] + rows:
+            row.simplified_text = None
+        try:
+            db.session.flush()
+            self._service('simplify').precompute(content, rows)
+            content.simplification_status = Content.STATUS_DONE
+        except Exception as e:
+            logger.error(f"DEMO LOG ERROR: Simplification failed for {content.content_id}: {e}")
+            content.simplification_status = Content.STATUS_FAILED
+
+    def _reindex(self, content, rows):
+        from app.services.search_service import search_service
+        from app.services.term_index_service import term_index_service
+
+        term_index_service.index_content(content)
+        search_service.index_content(content, {t.language: t.translated_text for t in rows})
+
+reprocess_service = ReprocessService()
@@ -0,0 +1,134 @@
+import logging
+from sqlalchemy import bindparam, text
+from app import db
+from app.models.content import Content, Translation
+from app.models.search import SearchDocument, PG_TSVECTOR
+from app.utils.text_utils import search_terms
+
+logger = logging.getLogger("SearchService")
+
+# bm25 column weights for (title, body); lower scores rank first
+FTS5_WEIGHTS = (4.0, 1.0)
+
+class SearchService:
+    """
+    Full-text lesson search over the original text and every translation.
+    Documents are tokenized in Python (script-aware, NFC) and indexed with
+    SQLite FTS5 or a Postgres GIN tsvector index, kept current on upload.
+    """
+    def _dialect(self):
+        return db.session.get_bind().dialect.name
+
+    def index_content(self, content, translations=None):
+        """
+        (Re)index one lesson. translations: {language: text}, loaded from the
+        database when not given. Caller commits.
+        """
+        if translations is None:
+            translations = dict(
+                Translation.query.filter_by(content_id=content.content_id)
+                .with_entities(Translation.language, Translation.translated_text)
+            )
+        self.remove_content(content.content_id)
+
+        title = ' '.join(search_terms(f"{content.topic} {content.subject}"))
+        docs = [
+            SearchDocument(
+                content_id=content.content_id, language=language, classroom_id=content.classroom_id,
+                subject=content.subject, title=title, body=' '.join(search_terms(body))
+            )
+            for language, body in [(content.language, content.text)] + list(translations.items()) if body
+        ]
+        db.session.add_all(docs)
+        db.session.flush()
+        if docs and self._dialect() == 'sqlite':
+            db.session.execute(
+                text("INSERT INTO search_fts(rowid, title, body) VALUES (:id, :title, :body)"),
+                [{'id': d.id, 'title': d.title, 'body': d.body} for d in docs]
+            )
+        return len(docs)
+
+    def remove_content(self, content_id):
+        docs = SearchDocument.query.filter_by(content_id=content_id).all()
+        if not docs:
+            return
+        if self._dialect() == 'sqlite':
+            # External-content FTS5 tables need the old values to remove a row
+            db.session.execute(
+                text("INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', :id, :title, :body)"),
+                [{'id': d.id, 'title': d.title, 'body': d.body} for d in docs]
+            )
+        for doc in docs:
+            db.session.delete(doc)
+        db.session.flush()
+
+    def backfill(self, batch_size=200):
+        """Index lessons that have no search documents yet. Commits per batch."""
+        indexed = db.session.query(SearchDocument.content_id).distinct()
+        total = 0
+        while True:
+            batch = Content.query.options(db.undefer(Content.text)).filter(
+                ~Content.content_id.in_(indexed)
+            ).limit(batch_size).all()
+            if not batch:
+                return total
+            for content in batch:
+                self.index_content(content)
+            db.session.commit()
+            total += len(batch)
+            logger.info(f"DEMO LOG: Search index backfilled {total} lessons")
+
+    def search(self, query, classroom_ids=None, subject=None, language=None, limit=20, offset=0):
+        """
+        Ranked lessons for query, best matching language per lesson:
+        [{'contentId', 'language', 'score'}]. classroom_ids=None means no
+        classroom restriction. Fetches one extra row so callers know if
+        there is another page.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return []
+
+        filters = []
+        params = {'limit': limit + 1, 'offset': offset}
+        if classroom_ids is not None:
+            filters.append("d.classroom_id IN :classroom_ids")
+            params['classroom_ids'] = list(classroom_ids) or ['']
+        if subject:
+            filters.append("d.subject = :subject")
+            params['subject'] = subject
+        if language:
+            filters.append("d.language = :language")
+            params['language'] = language
+        where = ''.join(f" AND {f}" for f in filters)
+
+        if self._dialect() == 'postgresql':
+            # Every term must match; the last one as a prefix so results appear while typing
+            params['tsquery'] = ' & '.join([t for t in terms[:-1]] + [terms[-1] + ':*'])
+            sql = (
+                f"SELECT d.content_id, (array_agg(d.language ORDER BY ts_rank({PG_TSVECTOR}, q) DESC))[1], "
+                f"MAX(ts_rank({PG_TSVECTOR}, q)) AS score "
+                f"FROM search_documents d, to_tsquery('simple', :tsquery) q "
+                f"WHERE ({PG_TSVECTOR}) @@ q{where} "
+                "GROUP BY d.content_id ORDER BY score DESC, d.content_id LIMIT :limit OFFSET :offset"
+            )
+        else:
+            params['match'] = ' '.join(f'"{t}"' for t in terms[:-1]) + f' "{terms[-1]}"*'
+            # LIMIT -1 keeps SQLite from flattening the subquery, which bm25() does not allow
+            sql = (
+                "SELECT d.content_id, d.language, MIN(m.score) AS score FROM ("
+                f"SELECT rowid AS doc_id, bm25(search_fts, {FTS5_WEIGHTS[0]}, {FTS5_WEIGHTS[1]}) AS score "
+                "FROM search_fts WHERE search_fts MATCH :match LIMIT -1"
+                f") m JOIN search_documents d ON d.id = m.doc_id WHERE 1 = 1{where} "
+                "GROUP BY d.content_id ORDER BY score, d.content_id LIMIT :limit OFFSET :offset"
+            )
+
+        statement = text(sql)
+        if 'classroom_ids' in params:
+            statement = statement.bindparams(bindparam('classroom_ids', expanding=True))
+        return [
+            {'contentId': content_id, 'language': lang, 'score': abs(float(score))}
+            for content_id, lang, score in db.session.execute(statement, params)
+        ]
+
+search_service = SearchService()
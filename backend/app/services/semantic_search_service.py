@@ -0,0 +1,313 @@
+import json
+import logging
+import os
+import threading
+import time
+import faiss
+import numpy as np
+from flask import current_app
+from sentence_transformers import SentenceTransformer
+from app import db, task_queue
+from app.models.content import Content, Translation
+
+logger = logging.getLogger("SemanticSearchService")
+
+INDEX_FILE = 'lessons.faiss'
+META_FILE = 'lessons.json'
+# Filters matching at most this many vectors are scored exactly instead of through HNSW
+EXACT_SEARCH_LIMIT = 5000
+# Rebuild from the database once this share of the index is stale vectors
+MAX_STALE_RATIO = 0.3
+
+class SemanticSearchService:
+    """
+    Cross-lingual lesson search: one multilingual sentence embedding per
+    lesson per language in a FAISS HNSW index (inner product over
+    normalized vectors), so a Hindi or Tamil query finds English lessons.
+
+    HNSW cannot delete, so re-indexed lessons leave stale vectors that are
+    skipped at query time until the next rebuild. The index and its metadata
+    are saved under SEMANTIC_INDEX_DIR and warm-loaded in the background at
+    startup.
+
+    Classroom and subject filters read per-classroom and per-subject id sets
+    kept up to date on every index change, never a scan of the whole index.
+    The sets are immutable and replaced on change, so a query picks its
+    candidates without taking the lock.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._model = None
+        self._index = None
+        self._docs = {}   # vector id -> [content_id, language, classroom_id, subject]
+        self._by_content = {}
+        self._by_filter = {}   # ('classroom', id) / ('subject', name) -> frozenset of live vector ids
+        self._next_id = 1
+        self._stale = 0
+        self._dirty = False
+        self._saved_at = 0.0
+
+    def start_warm_load(self, app):
+        """Queue loading the index and indexing lessons it is missing. Call once the schema exists (run.py)."""
+        if app.config.get('SEMANTIC_SEARCH', True) and app.config.get('SEMANTIC_WARM_LOAD', True):
+            return task_queue.submit(self._warm_load, priority=5, name='semantic:warm-load')
+        return None
+
+    def _warm_load(self, job):
+        job.update(message='Loading semantic index')
+        self._ensure_loaded()
+        # Catch up on lessons saved after the last index write (saves are rate-limited) or never indexed
+        indexed = set(self._by_content)
+        missing = [content_id for (content_id,) in db.session.query(Content.content_id) if content_id not in indexed]
+        for start in range(0, len(missing), 256):
+            chunk = missing[start:start + 256]
+            self.add_contents(Content.query.options(db.undefer(Content.text)).filter(Content.content_id.in_(chunk)).all())
+            job.update(done=start + len(chunk), total=len(missing), message='Indexing lessons missing from the semantic index')
+        self.save(force=True)
+        return {'vectors': len(self._docs), 'added': len(missing)}
+
+    # Model and index lifecycle
+
+    def _encoder(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    name = current_app.config.get('SEMANTIC_MODEL', 'paraphrase-multilingual-MiniLM-L12-v2')
+                    logger.info(f"DEMO LOG: Loading multilingual embedding model {name}")
+                    self._model = SentenceTransformer(name)
+        return self._model
+
+    def _embed(self, texts):
+        vectors = self._encoder().encode(texts, batch_size=32, normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype='float32')
+
+    def _paths(self):
+        directory = current_app.config.get('SEMANTIC_INDEX_DIR') or os.path.join(os.getcwd(), 'semantic_index')
+        os.makedirs(directory, exist_ok=True)
+        return os.path.join(directory, INDEX_FILE), os.path.join(directory, META_FILE)
+
+    def _new_index(self):
+        dim = self._encoder().get_sentence_embedding_dimension()
+        hnsw = faiss.IndexHNSWFlat(dim, current_app.config.get('SEMANTIC_HNSW_M', 32), faiss.METRIC_INNER_PRODUCT)
+        hnsw.hnsw.efConstruction = 80
+        return faiss.IndexIDMap2(hnsw)
+
+    def _ensure_loaded(self):
+        if self._index is not None:
+            return
+        with self._lock:
+            if self._index is not None:
+                return
+            index_path, meta_path = self._paths()
+            if os.path.exists(index_path) and os.path.exists(meta_path):
+                self._index = faiss.read_index(index_path)
+                with open(meta_path, encoding='utf-8') as f:
+                    meta = json.load(f)
+                self._docs = {int(k): v for k, v in meta['docs'].items()}
+                self._next_id = meta['nextId']
+                self._stale = meta.get('stale', 0)
+                for vector_id, (content_id, *_) in self._docs.items():
+                    self._by_content.setdefault(content_id, []).append(vector_id)
+                self._retag(added=self._docs.items())
+                logger.info(f"DEMO LOG: Semantic index loaded with {len(self._docs)} vectors")
+            else:
+                self._index = self._new_index()
+            self._set_ef_search()
+
+    def _ef_search(self):
+        return current_app.config.get('SEMANTIC_EF_SEARCH', 64)
+
+    def _set_ef_search(self):
+        faiss.downcast_index(self._index.index).hnsw.efSearch = self._ef_search()
+
+    def save(self, force=False):
+        """Write the index and metadata atomically; rate-limited unless force."""
+        interval = current_app.config.get('SEMANTIC_INDEX_SAVE_INTERVAL', 60)
+        with self._lock:
+            if self._index is None or not self._dirty or (not force and time.time() - self._saved_at < interval):
+                return False
+            index_path, meta_path = self._paths()
+            faiss.write_index(self._index, index_path + '.tmp')
+            with open(meta_path + '.tmp', 'w', encoding='utf-8') as f:
+                json.dump({'docs': self._docs, 'nextId': self._next_id, 'stale': self._stale}, f)
+            os.replace(index_path + '.tmp', index_path)
+            os.replace(meta_path + '.tmp', meta_path)
+            self._dirty = False
+            self._saved_at = time.time()
+        return True
+
+    # Indexing
+
+    def _documents(self, contents):
+        """(content, language, text) for every lesson and translation, in one translation query."""
+        by_id = {c.content_id: c for c in contents}
+        docs = [(c, c.language, c.text) for c in contents]
+        for t in Translation.query.options(db.undefer(Translation.translated_text)).filter(
+            Translation.content_id.in_(list(by_id))
+        ):
+            docs.append((by_id[t.content_id], t.language, t.translated_text))
+        return [
+            (content, language, f"{content.topic}. {content.subject}. {text}")
+            for content, language, text in docs if text
+        ]
+
+    def add_contents(self, contents):
+        """Embed and (re)index lessons with all their translations."""
+        self._ensure_loaded()
+        docs = self._documents(contents)
+        if not docs:
+            return 0
+        vectors = self._embed([text for _, _, text in docs])
+        with self._lock:
+            removed = []
+            for content in contents:
+                removed += self._remove(content.content_id)
+            ids = np.arange(self._next_id, self._next_id + len(docs), dtype='int64')
+            self._index.add_with_ids(vectors, ids)
+            self._next_id += len(docs)
+            added = []
+            for vector_id, (content, language, _) in zip(ids.tolist(), docs):
+                doc = [content.content_id, language, content.classroom_id, content.subject]
+                self._docs[vector_id] = doc
+                self._by_content.setdefault(content.content_id, []).append(vector_id)
+                added.append((vector_id, doc))
+            self._retag(added, removed)
+            self._dirty = True
+        return len(docs)
+
+    def _remove(self, content_id):
+        """Drop a lesson's vectors from the live set; returns their (vector id, doc) for _retag."""
+        removed = []
+        for vector_id in self._by_content.pop(content_id, []):
+            doc = self._docs.pop(vector_id, None)
+            if doc is not None:
+                self._stale += 1
+                removed.append((vector_id, doc))
+        self._dirty = True
+        return removed
+
+    def _retag(self, added=(), removed=()):
+        """Update the filter id sets for (vector id, doc) pairs, one copy per touched set. Caller holds the lock."""
+        changes = {}
+        for position, pairs in ((0, added), (1, removed)):
+            for vector_id, doc in pairs:
+                for key in (('classroom', doc[2]), ('subject', doc[3])):
+                    changes.setdefault(key, (set(), set()))[position].add(vector_id)
+        for key, (plus, minus) in changes.items():
+            ids = (self._by_filter.get(key, frozenset()) - minus) | plus
+            if ids:
+                self._by_filter[key] = frozenset(ids)
+            else:
+                self._by_filter.pop(key, None)
+
+    def remove_content(self, content_id):
+        self._ensure_loaded()
+        with self._lock:
+            self._retag(removed=self._remove(content_id))
+
+    def enqueue_content(self, content_id):
+        """Embed a lesson off the request path (model inference is too slow to do inline)."""
+        if not current_app.config.get('SEMANTIC_SEARCH', True):
+            return None
+        return task_queue.submit(self._index_job, content_id, name=f"semantic:{content_id}")
+
+    def _index_job(self, job, content_id):
+        content = Content.query.options(db.undefer(Content.text)).get(content_id)
+        if not content:
+            return {'vectors': 0}
+        added = self.add_contents([content])
+        if self._stale > MAX_STALE_RATIO * max(self._index.ntotal, 1):
+            self.rebuild()
+        else:
+            self.save()
+        return {'vectors': added}
+
+    def rebuild(self, batch_size=256):
+        """Re-embed every lesson into a fresh index (drops stale vectors) and save it."""
+        self._ensure_loaded()
+        with self._lock:
+            self._index = self._new_index()
+            self._set_ef_search()
+            self._docs, self._by_content, self._by_filter, self._next_id, self._stale = {}, {}, {}, 1, 0
+        total = 0
+        last = None
+        while True:
+            query = Content.query.options(db.undefer(Content.text)).order_by(Content.content_id)
+            if last is not None:
+                query = query.filter(Content.content_id > last)
+            batch = query.limit(batch_size).all()
+            if not batch:
+                break
+            total += self.add_contents(batch)
+            last = batch[-1].content_id
+            logger.info(f"DEMO LOG: Semantic index rebuilt {total} vectors")
+        self.save(force=True)
+        return total
+
+    # Queries
+
+    def search(self, query, classroom_ids=None, subject=None, limit=20):
+        """Best lessons for query as [{'contentId', 'language', 'score'}], one per lesson."""
+        self._ensure_loaded()
+        if not query or not self._docs:
+            return []
+        if classroom_ids is not None:
+            classroom_ids = set(classroom_ids)
+        candidates = self._candidates(classroom_ids, subject)
+        if candidates is not None and not candidates:
+            return []
+        vector = self._embed([query])
+
+        def allowed(doc):
+            return (classroom_ids is None or doc[2] in classroom_ids) and (not subject or doc[3] == subject)
+
+        with self._lock:
+            # FAISS does not allow searching while another thread adds, so only the index calls and hit lookups are locked
+            if candidates is None:
+                hits = self._approximate(vector, limit)
+            elif len(candidates) <= EXACT_SEARCH_LIMIT:
+                hits = self._exact(vector, [vid for vid in candidates if vid in self._docs])
+            else:
+                selector = faiss.IDSelectorBatch(len(candidates), faiss.swig_ptr(np.fromiter(candidates, dtype='int64')))
+                params = faiss.SearchParametersHNSW(sel=selector, efSearch=self._ef_search())
+                hits = self._approximate(vector, limit, params)
+
+            # Candidates were picked without the lock: skip ids removed (or reused by a rebuild) since
+            best = {}
+            for vector_id, score in hits:
+                doc = self._docs.get(vector_id)
+                if doc is None or not allowed(doc):
+                    continue
+                content_id, language = doc[:2]
+                if content_id not in best or score > best[content_id]['score']:
+                    best[content_id] = {'contentId': content_id, 'language': language, 'score': float(score)}
+        return sorted(best.values(), key=lambda hit: -hit['score'])[:limit]
+
+    def _candidates(self, classroom_ids, subject):
+        """Vector ids passing the filters, from the filter id sets; None when unfiltered."""
+        candidates = None
+        if classroom_ids is not None:
+            candidates = frozenset().union(*(self._by_filter.get(('classroom', c), ()) for c in classroom_ids))
+        if subject:
+            by_subject = self._by_filter.get(('subject', subject), frozenset())
+            candidates = by_subject if candidates is None else candidates & by_subject
+        return candidates
+
+    def _exact(self, vector, candidates):
+        if not candidates:
+            return []
+        matrix = self._index.reconstruct_batch(np.asarray(candidates, dtype='int64'))
+        scores = matrix @ vector[0]
+        return list(zip(candidates, scores.tolist()))
+
+    def _approximate(self, vector, limit, params=None):
+        # Over-fetch to make room for stale vectors and other languages of the same lesson
+        fetch = max(limit * 8, 64)
+        while True:
+            scores, ids = self._index.search(vector, min(fetch, self._index.ntotal), params=params)
+            hits = [(vid, score) for vid, score in zip(ids[0].tolist(), scores[0].tolist()) if vid in self._docs]
+            if len({self._docs[vid][0] for vid, _ in hits}) >= limit or fetch >= self._index.ntotal:
+                return hits
+            fetch *= 4
+
+semantic_search_service = SemanticSearchService()
@@ -1,12 +1,23 @@
 import logging
+from app.utils.text_utils import split_sentences, sentence_stop
 
 # Configure logging
 logger = logging.getLogger("SimplificationService")
 
+LEVELS = ['easy', 'medium', 'detailed']
+EXPLANATION = 'explanation'
+
 class SimplificationService:
     def __init__(self):
         pass
 
+    def normalize_level(self, level):
+        # Normalize level names for demo consistency
+        level = (level or 'medium').lower().strip()
+        if 'easy' in level: return 'easy'
+        elif 'detail' in level: return 'detailed'
+        return 'medium'
+
     def simplify_text(self, text, level='medium', style='standard'):
         """
         Simplifies text based on level with logging and demo-ready heuristics.
@@ -15,52 +26,114 @@ class SimplificationService:
         if not text:
             return ""
 
-        # Normalize level names for demo consistency
-        level = level.lower().strip()
-        if 'easy' in level: level = 'easy'
-        elif 'detail' in level: level = 'detailed'
-        else: level = 'medium'
+        level = self.normalize_level(level)
 
         logger.info(f"DEMO LOG: Simplification Request -> Level: {level} | Style: {style}")
         logger.info(f"DEMO LOG: Input Lesson Text Snippet: {text[:100]}...")
 
         try:
-            sentences = [s.strip() for s in text.split('.') if s.strip()]
-            
-            if level == 'easy':
-                return self._generate_easy(sentences)
-            elif level == 'detailed':
-                return self._generate_detailed(sentences)
-            else:
-                return self._generate_medium(sentences)
-
+            return self._render(level, split_sentences(text), sentence_stop(text))
         except Exception as e:
             logger.error(f"DEMO LOG ERROR: Simplification failed: {e}")
             return text
 
-    def _generate_easy(self, sentences):
+    def simplify_all_levels(self, text, style='standard', include_explanation=False):
+        """All three levels (and optionally the explanation) from a single sentence parse."""
+        kinds = LEVELS + [EXPLANATION] if include_explanation else LEVELS
+        if not text:
+            return {kind: "" for kind in kinds}
+
+        sentences = split_sentences(text)
+        stop = sentence_stop(text)
+        results = {}
+        for kind in kinds:
+            try:
+                results[kind] = self._render(kind, sentences, stop)
+            except Exception as e:
+                logger.error(f"DEMO LOG ERROR: Simplification failed for level {kind}: {e}")
+                results[kind] = text
+        return results
+
+    def explain_text(self, text):
+        if not text:
+            return ""
+        try:
+            return self._generate_explanation(split_sentences(text), sentence_stop(text))
+        except Exception as e:
+            logger.error(f"DEMO LOG ERROR: Explanation failed: {e}")
+            return text
+
+    def simplify_many(self, items, all_levels=False, include_explanation=False):
+        """
+        Bulk simplification. items is a list of (text, level[, style]) tuples,
+        dicts with text/level/style keys or plain texts. Identical texts are
+        parsed once.
+        Returns one dict per item, in order.
+        """
+        logger.info(f"DEMO LOG: Batch Simplification Request -> {len(items)} items")
+
+        parsed = {}
+        results = []
+        for item in items:
+            if isinstance(item, dict):
+                text, level, style = item.get('text'), item.get('level'), item.get('style', 'standard')
+            elif isinstance(item, str):
+                # A bare string is one text, not a sequence of one-character texts
+                text, level, style = item, None, 'standard'
+            else:
+                text, level, style = (tuple(item) + (None, 'standard'))[:3]
+
+            level = self.normalize_level(level)
+            key = (text or '', style)
+            if key not in parsed:
+                parsed[key] = self.simplify_all_levels(text, style, include_explanation)
+            levels = parsed[key]
+
+            result = {'level': level, 'simplifiedText': levels[level]}
+            if all_levels:
+                result['levels'] = levels
+            results.append(result)
+        return results
+
+    def _render(self, level, sentences, stop='.'):
+        if level == EXPLANATION:
+            return self._generate_explanation(sentences, stop)
+        if level == 'easy':
+            return self._generate_easy(sentences, stop)
+        elif level == 'detailed':
+            return self._generate_detailed(sentences, stop)
+        return self._generate_medium(sentences, stop)
+
+    def _generate_easy(self, sentences, stop='.'):
         header = "💡 **Easy Version:**\n"
         # Core concept + 2 simple sentences
-        content = "This lesson is about " + sentences[0].lower() + ". "
+        content = "This lesson is about " + sentences[0].lower() + f"{stop} "
         if len(sentences) > 1:
-            content += "Specifically, it explains how " + sentences[1].lower() + ". "
-        
+            content += "Specifically, it explains how " + sentences[1].lower() + f"{stop} "
+
         content += "\n\n**Example:** Think of it like a bicycle wheel - all parts work together to move forward!"
         return header + content
 
-    def _generate_medium(self, sentences):
+    def _generate_medium(self, sentences, stop='.'):
         header = "📘 **Standard Overview:**\n"
-        return header + ". ".join(sentences[:min(5, len(sentences))]) + "."
+        return header + f"{stop} ".join(sentences[:min(5, len(sentences))]) + stop
 
-    def _generate_detailed(self, sentences):
+    def _generate_detailed(self, sentences, stop='.'):
         header = "🔍 **Detailed Explanation:**\n"
-        content = ". ".join(sentences) + ".\n\n"
-        
+        content = f"{stop} ".join(sentences) + f"{stop}\n\n"
+
         # Add educational examples/analogies
         content += "**In-depth Breakdown:**\n1. " + (sentences[0] if sentences else "Concept overview")
         if len(sentences) > 2:
             content += "\n2. Analysis of " + sentences[1]
             content += "\n3. Conclusion about " + sentences[2]
-            
+
         content += "\n\n**Analogy for Learning:** Imagine you are building a LEGO castle; every piece (part of this lesson) contributes to the final structure."
         return header + content
+
+    def _generate_explanation(self, sentences, stop='.'):
+        header = "📝 **Explanation:**\n"
+        content = "Key ideas in this lesson:\n"
+        content += "\n".join(f"- {sentence}{stop}" for sentence in sentences[:5])
+        content += "\n\n**Why it matters:** " + sentences[0] + f"{stop} Each idea above builds on this one, so revisit it whenever a later step feels unclear."
+        return header + content
@@ -0,0 +1,265 @@
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models.assignment import Assignment, Submission
+from app.models.content import Content, Translation
+from app.models.dm import DirectMessage
+from app.models.upload import UploadSession
+
+logger = logging.getLogger("StorageService")
+
+# Columns holding a path or URL of a file in UPLOAD_FOLDER
+REFERENCE_COLUMNS = [
+    Content.original_file_url,
+    Content.audio_url,
+    Translation.audio_url,
+    Assignment.file_url,
+    Submission.file_url,
+    DirectMessage.media_url
+]
+PREVIEW_COLUMNS = [Content.previews, DirectMessage.previews, Assignment.previews, Submission.previews]
+
+URL_PREFIXES = ('/uploads/', '/media/audio/', 'uploads/')
+# Derived files that live as long as their source (see TranscodeService)
+TRANSCODE_SUFFIXES = ('.lo.opus', '.lo.mp3')
+# Reported but never reclaimed: admin curriculum files and their resume checkpoints
+PROTECTED_CATEGORIES = {'imports'}
+
+# Files per sweep batch; stays under SQLite's default limit of 999 bound parameters
+BATCH = 500
+SAMPLE_SIZE = 50
+
+def normalize(value):
+    """Path relative to UPLOAD_FOLDER ('/' separated) for a stored URL or filename; None for external URLs."""
+    if not value or '://' in value:
+        return None
+    value = value.split('?', 1)[0]
+    for prefix in URL_PREFIXES:
+        if value.startswith(prefix):
+            value = value[len(prefix):]
+            break
+    value = os.path.normpath(value).replace(os.sep, '/').lstrip('/')
+    return None if value.startswith('..') or value == '.' else value
+
+def category(path):
+    name = path.rsplit('/', 1)[-1]
+    if name.endswith('.processed.jpg'):
+        return 'ocr-temp'
+    if '/' in path:
+        top = path.split('/', 1)[0]
+        if top in ('previews', 'chunked', 'imports'):
+            return top
+    if '.lo.' in name:
+        return 'transcodes'
+    if name.startswith('tts_'):
+        return 'tts'
+    return 'uploads'
+
+class StorageService:
+    """
+    Storage accounting and mark-and-sweep GC for UPLOAD_FOLDER.
+
+    Mark streams every file reference out of the database (upload columns,
+    audio URLs, preview manifests, live chunked uploads) into a temporary
+    SQLite table, so the live set never has to fit in memory. Sweep walks
+    the store once, looks each batch of files up in that table and counts
+    usage per category. Unreferenced files older than the grace period are
+    orphans. Before deleting, each batch is checked against the database
+    again, so a row committed during the run still keeps its file.
+    Generated caches reuse files by touching them (TTS, previews), which
+    keeps a reused file inside the grace period.
+    """
+    def __init__(self):
+        self._running = threading.Lock()
+
+    def _upload_dir(self):
+        return current_app.config['UPLOAD_FOLDER']
+
+    # Mark
+
+    def _references(self):
+        yield_per = current_app.config.get('STORAGE_GC_YIELD_PER', 5000)
+        for column in REFERENCE_COLUMNS:
+            query = db.select(column).where(column.isnot(None)).execution_options(yield_per=yield_per)
+            for value in db.session.execute(query).scalars():
+                path = normalize(value)
+                if path:
+                    yield path
+                    if category(path) in ('uploads', 'tts'):
+                        stem = path.rsplit('.', 1)[0]
+                        for suffix in TRANSCODE_SUFFIXES:
+                            yield stem + suffix
+        for column in PREVIEW_COLUMNS:
+            query = db.select(column).where(column.isnot(None)).execution_options(yield_per=yield_per)
+            for previews in db.session.execute(query).scalars():
+                for key in ('thumb', 'display'):
+                    path = normalize((previews or {}).get(key))
+                    if path:
+                        yield path
+                        # <digest>-thumb.webp -> <digest>.json manifest in the same directory
+                        directory, name = path.rsplit('/', 1)
+                        yield f"{directory}/{name.split('-', 1)[0]}.json"
+        for upload_id in self._live_upload_ids():
+            yield f"chunked/{upload_id}.part"
+
+    def _live_upload_ids(self):
+        cutoff = datetime.utcnow() - timedelta(seconds=current_app.config.get('UPLOAD_SESSION_TTL', 7 * 24 * 3600))
+        query = db.select(UploadSession.id).where(
+            UploadSession.status != UploadSession.STATUS_CONSUMED, UploadSession.updated_at >= cutoff
+        )
+        return db.session.execute(query).scalars()
+
+    def _mark(self, marks):
+        marks.execute("CREATE TABLE marks (path TEXT PRIMARY KEY) WITHOUT ROWID")
+        count, batch = 0, []
+        for path in self._references():
+            batch.append((path,))
+            if len(batch) >= BATCH:
+                marks.executemany("INSERT OR IGNORE INTO marks VALUES (?)", batch)
+                count += len(batch)
+                batch = []
+        marks.executemany("INSERT OR IGNORE INTO marks VALUES (?)", batch)
+        marks.commit()
+        return count + len(batch)
+
+    # Sweep
+
+    def _walk(self, root, relative=''):
+        """(relative path, stat) of every file under root, depth first, without listing whole trees into memory."""
+        with os.scandir(os.path.join(root, relative) if relative else root) as entries:
+            for entry in entries:
+                path = f"{relative}/{entry.name}" if relative else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._walk(root, path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield path, entry.stat(follow_symlinks=False)
+
+    def _still_referenced(self, paths):
+        """Paths of this batch referenced by a row committed since mark ran."""
+        forms = {}
+        for path in paths:
+            for form in (path, *(prefix + path for prefix in URL_PREFIXES)):
+                forms[form] = path
+        values = list(forms)
+        live = set()
+        for start in range(0, len(values), BATCH):
+            chunk = values[start:start + BATCH]
+            for column in REFERENCE_COLUMNS:
+                query = db.select(column).where(column.in_(chunk))
+                live.update(forms[value] for value in db.session.execute(query).scalars())
+        return live
+
+    def _grace(self, path):
+        if category(path) == 'tts':
+            # On-demand narration is a cache; cache hits touch the file (TTSService)
+            return current_app.config.get('TTS_CACHE_MAX_AGE', 30 * 24 * 3600)
+        return current_app.config.get('STORAGE_GC_GRACE_SECONDS', 24 * 3600)
+
+    def _sweep_batch(self, batch, marks, report, started, dry_run):
+        placeholders = ','.join('?' * len(batch))
+        marked = {row[0] for row in marks.execute(f"SELECT path FROM marks WHERE path IN ({placeholders})",
+                                                  [path for path, _ in batch])}
+        orphans = []
+        for path, stat in batch:
+            usage = report['categories'].setdefault(category(path), {
+                'files': 0, 'bytes': 0, 'orphans': 0, 'orphanBytes': 0, 'reclaimed': 0, 'reclaimedBytes': 0
+            })
+            usage['files'] += 1
+            usage['bytes'] += stat.st_size
+            if path in marked or category(path) in PROTECTED_CATEGORIES:
+                continue
+            if started - stat.st_mtime < self._grace(path):
+                report['inGrace'] += 1
+                continue
+            usage['orphans'] += 1
+            usage['orphanBytes'] += stat.st_size
+            orphans.append((path, stat))
+            if len(report['sample']) < SAMPLE_SIZE:
+                report['sample'].append(path)
+
+        if dry_run or not orphans:
+            return
+        live = self._still_referenced([path for path, _ in orphans])
+        root = self._upload_dir()
+        for path, stat in orphans:
+            if path in live:
+                report['rescued'] += 1
+                continue
+            try:
+                os.remove(os.path.join(root, path))
+            except FileNotFoundError:
+                continue
+            except OSError as e:
+                logger.error(f"DEMO LOG ERROR: Could not remove {path}: {e}")
+                report['errors'] += 1
+                continue
+            usage = report['categories'][category(path)]
+            usage['reclaimed'] += 1
+            usage['reclaimedBytes'] += stat.st_size
+
+    def _expire_upload_sessions(self):
+        cutoff = datetime.utcnow() - timedelta(seconds=current_app.config.get('UPLOAD_SESSION_TTL', 7 * 24 * 3600))
+        expired = UploadSession.query.filter(
+            db.or_(UploadSession.status == UploadSession.STATUS_CONSUMED, UploadSession.updated_at < cutoff)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return expired
+
+    def run(self, dry_run=True, job=None):
+        """
+        Account for every file in UPLOAD_FOLDER and, unless dry_run, delete
+        orphans past their grace period. Returns the usage report.
+        """
+        if not self._running.acquire(blocking=False):
+            raise RuntimeError('Storage GC is already running')
+        work_dir = tempfile.mkdtemp(prefix='storage-gc-', dir=current_app.config.get('STORAGE_GC_WORK_DIR'))
+        try:
+            started = time.time()
+            marks = sqlite3.connect(os.path.join(work_dir, 'marks.db'))
+            marks.execute("PRAGMA journal_mode=OFF")
+            marks.execute("PRAGMA synchronous=OFF")
+            if job:
+                job.update(message='Marking referenced files')
+            report = {'dryRun': dry_run, 'references': self._mark(marks), 'categories': {}, 'inGrace': 0,
+                      'rescued': 0, 'errors': 0, 'sample': []}
+
+            root = self._upload_dir()
+            scanned, batch = 0, []
+            if os.path.isdir(root):
+                for entry in self._walk(root):
+                    batch.append(entry)
+                    if len(batch) >= BATCH:
+                        self._sweep_batch(batch, marks, report, started, dry_run)
+                        scanned += len(batch)
+                        batch = []
+                        if job:
+                            job.update(done=scanned, message=f"Swept {scanned} files")
+                if batch:
+                    self._sweep_batch(batch, marks, report, started, dry_run)
+                    scanned += len(batch)
+            marks.close()
+
+            if not dry_run:
+                report['expiredUploads'] = self._expire_upload_sessions()
+            usage = report['categories'].values()
+            report['totals'] = {key: sum(u[key] for u in usage)
+                                for key in ('files', 'bytes', 'orphans', 'orphanBytes', 'reclaimed', 'reclaimedBytes')}
+            report['seconds'] = round(time.time() - started, 2)
+            logger.info(
+                f"DEMO LOG: Storage GC {'report' if dry_run else 'run'}: {scanned} files, "
+                f"{report['totals']['orphans']} orphans ({report['totals']['orphanBytes']} bytes), "
+                f"{report['totals']['reclaimedBytes']} bytes reclaimed in {report['seconds']}s"
+            )
+            return report
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+            self._running.release()
+
+storage_service = StorageService()
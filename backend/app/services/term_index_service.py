@@ -0,0 +1,162 @@
+import bisect
+import logging
+import math
+import threading
+import time
+from collections import Counter, defaultdict
+from flask import current_app
+from app import db
+from app.models.content import Content
+from app.models.term_index import ClassroomTerm, ContentTerm
+from app.utils.db_utils import upsert_add
+from app.utils.text_utils import tokenize_words
+
+logger = logging.getLogger("TermIndexService")
+
+MAX_TERM_LENGTH = 100
+
+class TermIndexService:
+    """
+    Classroom-level TF-IDF index. Term and document frequencies are kept in
+    the database and updated per upload; the per-classroom vocabulary sorted
+    by IDF is cached in memory so keyword and distractor lookups are O(k).
+    """
+    def __init__(self):
+        self._vocab = {}
+        self._lock = threading.Lock()
+
+    def index_content(self, content):
+        """(Re)index one lesson and adjust classroom document frequencies. Caller commits."""
+        if not content.classroom_id:
+            return False
+
+        counts = Counter(term[:MAX_TERM_LENGTH] for term in tokenize_words(content.text))
+        existing = {row.term: row for row in ContentTerm.query.filter_by(content_id=content.content_id)}
+
+        for term, row in existing.items():
+            if term not in counts:
+                db.session.delete(row)
+        for term, tf in counts.items():
+            if term in existing:
+                existing[term].term_freq = tf
+            else:
+                db.session.add(ContentTerm(content_id=content.content_id, term=term, classroom_id=content.classroom_id, term_freq=tf))
+
+        added = [term for term in counts if term not in existing]
+        removed = [term for term in existing if term not in counts]
+        if added:
+            upsert_add(
+                ClassroomTerm.__table__,
+                [{'classroom_id': content.classroom_id, 'term': term, 'doc_freq': 1} for term in added],
+                index_elements=['classroom_id', 'term'],
+                increments=['doc_freq']
+            )
+        if removed:
+            ClassroomTerm.query.filter(
+                ClassroomTerm.classroom_id == content.classroom_id, ClassroomTerm.term.in_(removed)
+            ).update({ClassroomTerm.doc_freq: ClassroomTerm.doc_freq - 1}, synchronize_session=False)
+            ClassroomTerm.query.filter(
+                ClassroomTerm.classroom_id == content.classroom_id, ClassroomTerm.doc_freq <= 0
+            ).delete(synchronize_session=False)
+
+        self.invalidate(content.classroom_id)
+        return True
+
+    def index_classroom(self, classroom_id):
+        """Index every not-yet-indexed lesson of a classroom (backfill). Caller commits."""
+        indexed = db.session.query(ContentTerm.content_id).filter_by(classroom_id=classroom_id).distinct()
+        pending = Content.query.options(db.undefer(Content.text)).filter(
+            Content.classroom_id == classroom_id, ~Content.content_id.in_(indexed)
+        ).all()
+        for content in pending:
+            self.index_content(content)
+        if pending:
+            logger.info(f"DEMO LOG: Indexed {len(pending)} lessons for classroom {classroom_id}")
+        return len(pending)
+
+    def invalidate(self, classroom_id):
+        with self._lock:
+            self._vocab.pop(classroom_id, None)
+
+    def _vocabulary(self, classroom_id):
+        ttl = current_app.config.get('TERM_INDEX_CACHE_TTL', 300)
+        cached = self._vocab.get(classroom_id)
+        if cached and time.time() - cached['builtAt'] < ttl:
+            return cached
+
+        docs = db.session.query(db.func.count(db.distinct(ContentTerm.content_id))).filter(
+            ContentTerm.classroom_id == classroom_id
+        ).scalar() or 0
+        idf = {
+            term: math.log((1 + docs) / (1 + df)) + 1
+            for term, df in db.session.query(ClassroomTerm.term, ClassroomTerm.doc_freq).filter_by(classroom_id=classroom_id)
+        }
+        ranked = sorted((score, term) for term, score in idf.items())
+        vocab = {
+            'builtAt': time.time(),
+            'docs': docs,
+            'idf': idf,
+            'terms': [term for _, term in ranked],
+            'scores': [score for score, _ in ranked]
+        }
+        with self._lock:
+            self._vocab[classroom_id] = vocab
+        return vocab
+
+    def keywords_for(self, contents, k=10):
+        """Top-k TF-IDF keywords for many lessons, from a single term query."""
+        by_id = {c.content_id: c for c in contents if c.classroom_id}
+        if not by_id:
+            return {}
+
+        rows = defaultdict(list)
+        for content_id, term, tf in db.session.query(ContentTerm.content_id, ContentTerm.term, ContentTerm.term_freq).filter(
+            ContentTerm.content_id.in_(list(by_id))
+        ):
+            rows[content_id].append((term, tf))
+
+        keywords = {}
+        for content_id, terms in rows.items():
+            idf = self._vocabulary(by_id[content_id].classroom_id)['idf']
+            scored = sorted(terms, key=lambda item: (-item[1] * idf.get(item[0], 1.0), item[0]))
+            keywords[content_id] = [term for term, _ in scored[:k]]
+        return keywords
+
+    def distractors(self, classroom_id, term, k=3, exclude=()):
+        """
+        Plausible wrong answers: classroom terms with a similar IDF (equally
+        specific), similar length and the same script as the answer.
+        """
+        vocab = self._vocabulary(classroom_id)
+        terms, scores = vocab['terms'], vocab['scores']
+        if not terms:
+            return []
+
+        exclude = {e.lower() for e in exclude} | {term.lower()}
+        ascii_term = term.isascii()
+        pos = bisect.bisect_left(scores, vocab['idf'].get(term.lower(), scores[-1]))
+
+        picked = []
+        left, right = pos - 1, pos
+        budget = 50 * k
+        while len(picked) < k and budget > 0 and (left >= 0 or right < len(terms)):
+            for idx in (right, left):
+                if 0 <= idx < len(terms):
+                    candidate = terms[idx]
+                    if (candidate not in exclude
+                            and candidate.isascii() == ascii_term
+                            and abs(len(candidate) - len(term)) <= max(3, len(term) // 2)
+                            and candidate[:4] != term.lower()[:4]):
+                        picked.append(candidate)
+                        exclude.add(candidate)
+                        if len(picked) == k:
+                            break
+            left, right = left - 1, right + 1
+            budget -= 1
+        return picked
+
+    def distractor_picker(self, classroom_id):
+        """Callable in the shape QuizService.generate_quiz expects."""
+        return lambda term, k, exclude=(): self.distractors(classroom_id, term, k, exclude)
+
+term_index_service = TermIndexService()
@@ -0,0 +1,156 @@
+import logging
+import mimetypes
+import os
+import shutil
+import subprocess
+import threading
+from flask import current_app
+from app import task_queue
+
+logger = logging.getLogger("TranscodeService")
+
+mimetypes.add_type('audio/ogg', '.opus')
+
+AUDIO_EXTENSIONS = {'mp3', 'wav', 'm4a', 'ogg', 'webm'}
+
+# Low-bitrate mono speech variants, stored next to the source file
+VARIANTS = {
+    'opus': {
+        'suffix': '.lo.opus',
+        'args': ['-c:a', 'libopus', '-b:a', '20k', '-vbr', 'on', '-application', 'voip', '-ac', '1', '-ar', '24000']
+    },
+    # Compatible fallback for browsers without Ogg/Opus playback (older Safari)
+    'mp3': {
+        'suffix': '.lo.mp3',
+        'args': ['-c:a', 'libmp3lame', '-b:a', '32k', '-ac', '1', '-ar', '22050']
+    }
+}
+
+SLOW_CONNECTIONS = {'slow-2g', '2g', '3g'}
+CLIENT_HINTS = ['Save-Data', 'ECT', 'Downlink']
+
+class TranscodeService:
+    """
+    Produces low-bitrate mono Opus/MP3 variants of lesson audio in the
+    background and picks the right variant per request from client hints.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stats = {'files': 0, 'bytesIn': 0, 'bytesOut': 0, 'bytesSaved': 0, 'failed': 0}
+
+    def _ffmpeg(self):
+        binary = current_app.config.get('FFMPEG_BINARY') or shutil.which('ffmpeg')
+        if binary:
+            return binary
+        try:
+            # moviepy ships a static ffmpeg through imageio-ffmpeg
+            import imageio_ffmpeg
+            return imageio_ffmpeg.get_ffmpeg_exe()
+        except Exception:
+            return None
+
+    def is_audio(self, filename):
+        return '.lo.' not in filename and filename.rsplit('.', 1)[-1].lower() in AUDIO_EXTENSIONS
+
+    def variant_path(self, path, variant):
+        stem = path.rsplit('.', 1)[0]
+        return stem + VARIANTS[variant]['suffix']
+
+    def enqueue(self, path):
+        """Queue transcoding of an audio file; no-op outside of a configured app."""
+        if task_queue.app is None or not current_app.config.get('AUDIO_TRANSCODE', True):
+            return None
+        if not self.is_audio(os.path.basename(path)):
+            return None
+        # Below narration pre-generation so students get some audio first
+        return task_queue.submit(self._transcode_job, path, priority=-1, name=f"transcode:{os.path.basename(path)}")
+
+    def _transcode_job(self, job, path):
+        job.update(done=0, total=len(VARIANTS), message=f"Transcoding {os.path.basename(path)}")
+        result = self.transcode(path, on_variant=lambda variant: job.advance(message=f"{variant} ready"))
+        return result
+
+    def transcode(self, path, on_variant=None):
+        ffmpeg = self._ffmpeg()
+        if not ffmpeg:
+            logger.warning("DEMO LOG: ffmpeg not available, skipping audio transcoding")
+            return None
+        if not os.path.exists(path):
+            return None
+
+        original = os.path.getsize(path)
+        sizes = {}
+        for variant, spec in VARIANTS.items():
+            target = self.variant_path(path, variant)
+            if not os.path.exists(target):
+                tmp = target + '.part'
+                cmd = [ffmpeg, '-y', '-loglevel', 'error', '-i', path, '-vn'] + spec['args'] + ['-f', 'ogg' if variant == 'opus' else 'mp3', tmp]
+                try:
+                    subprocess.run(cmd, check=True, capture_output=True, timeout=current_app.config.get('AUDIO_TRANSCODE_TIMEOUT', 300))
+                    os.replace(tmp, target)
+                except Exception as e:
+                    logger.error(f"DEMO LOG ERROR: Transcoding {path} to {variant} failed: {e}")
+                    if os.path.exists(tmp):
+                        os.remove(tmp)
+                    with self._lock:
+                        self.stats['failed'] += 1
+                    continue
+            sizes[variant] = os.path.getsize(target)
+            if on_variant:
+                on_variant(variant)
+
+        if not sizes:
+            return None
+
+        smallest = min(sizes.values())
+        saved = max(original - smallest, 0)
+        with self._lock:
+            self.stats['files'] += 1
+            self.stats['bytesIn'] += original
+            self.stats['bytesOut'] += smallest
+            self.stats['bytesSaved'] += saved
+        logger.info(f"DEMO LOG: Transcoded {os.path.basename(path)}: {original} -> {sizes} bytes (saved {saved})")
+        return {'original': original, 'variants': sizes, 'bytesSaved': saved}
+
+    def wants_low_bitrate(self, request):
+        quality = request.args.get('quality')
+        if quality:
+            return quality == 'low'
+        if request.headers.get('Save-Data', '').lower() == 'on':
+            return True
+        ect = request.headers.get('ECT', '').lower()
+        if ect:
+            return ect in SLOW_CONNECTIONS
+        try:
+            return float(request.headers['Downlink']) < current_app.config.get('AUDIO_LOW_BITRATE_DOWNLINK', 1.5)
+        except (KeyError, ValueError):
+            return current_app.config.get('AUDIO_LOW_BITRATE_DEFAULT', True)
+
+    def supports_opus(self, request):
+        codec = request.args.get('codec')
+        if codec:
+            return codec == 'opus'
+        accept = request.headers.get('Accept', '')
+        if 'audio/ogg' in accept or 'audio/opus' in accept or 'audio/webm' in accept:
+            return True
+        ua = request.headers.get('User-Agent', '')
+        # Safari (not Chrome/Android WebViews that also say "Safari") lacks Ogg Opus
+        return not ('Safari' in ua and 'Chrome' not in ua and 'Chromium' not in ua and 'Android' not in ua)
+
+    def negotiate(self, directory, filename, request):
+        """Name of the audio variant to serve for this request."""
+        if not self.is_audio(filename) or not self.wants_low_bitrate(request):
+            return filename
+        candidates = ['opus', 'mp3'] if self.supports_opus(request) else ['mp3']
+        for variant in candidates:
+            variant_name = self.variant_path(filename, variant)
+            if os.path.isfile(os.path.join(directory, variant_name)):
+                return variant_name
+        return filename
+
+    def add_vary_headers(self, response):
+        response.vary.update(CLIENT_HINTS + ['Accept', 'User-Agent'])
+        response.headers['Accept-CH'] = ', '.join(CLIENT_HINTS)
+        return response
+
+transcode_service = TranscodeService()
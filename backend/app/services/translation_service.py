@@ -8,6 +8,9 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("TranslationService")
 
+# Prefix of the untranslated text returned when every translator failed
+FALLBACK_PREFIX = "[Stability Fallback] "
+
 class TranslationService:
     def __init__(self):
         self.model_name = "facebook/nllb-200-distilled-600M"
@@ -70,7 +73,7 @@ class TranslationService:
         except Exception as e:
             logger.error(f"DEMO LOG ERROR: Translation failed for {target_language}: {e}")
             # Final fallback if both fail
-            return f"[Stability Fallback] {text}"
+            return f"{FALLBACK_PREFIX}{text}"
 
     def translate_to_multiple(self, text, target_languages):
         translations = {}
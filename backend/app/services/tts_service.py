@@ -3,6 +3,7 @@ import hashlib
 import logging
 from gtts import gTTS
 from flask import current_app
+from app.services.transcode_service import transcode_service
 
 logger = logging.getLogger("TTSService")
 
@@ -43,11 +44,14 @@ class TTSService:
 
             if os.path.exists(file_path):
                 logger.info(f"DEMO LOG: Audio Cache Hit: {filename}")
+                # Storage GC ages unreferenced narration by mtime, so a hit keeps it
+                os.utime(file_path)
                 return f"/media/audio/{filename}"
 
             logger.info(f"DEMO LOG: Creating New Audio File: {filename}")
             tts = gTTS(text=text, lang=target_lang, slow=False)
             tts.save(file_path)
+            transcode_service.enqueue(file_path)
             
             return f"/media/audio/{filename}"
             
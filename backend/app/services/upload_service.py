@@ -0,0 +1,215 @@
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from flask import current_app, request
+from werkzeug.exceptions import ClientDisconnected
+from werkzeug.http import parse_content_range_header
+from werkzeug.utils import secure_filename
+from app import db
+from app.models.upload import UploadSession
+
+logger = logging.getLogger("UploadService")
+
+BLOCK_SIZE = 1 << 16
+
+class UploadError(ValueError):
+    """A chunked upload request that cannot be applied; carries the HTTP status and the session, if any."""
+    def __init__(self, message, status=400, upload=None):
+        super().__init__(message)
+        self.status = status
+        self.upload = upload
+
+class ChunkedFile:
+    """
+    A finalized chunked upload, shaped like the werkzeug FileStorage the
+    upload endpoints already handle: filename plus save(path), which moves
+    the assembled file into place instead of copying it.
+    """
+    def __init__(self, service, upload):
+        self._service = service
+        self.upload = upload
+        self.filename = upload.filename
+
+    def save(self, dst):
+        self._service.consume(self.upload, dst)
+
+class UploadService:
+    """
+    Resumable uploads for files too large or connections too flaky for one
+    multipart body: create a session, PUT byte ranges in order, finalize.
+    Each range is streamed to a .part file and into a running SHA-256 as it
+    arrives, so no request holds more than one block in memory. A dropped
+    connection keeps every byte already written; the client reads
+    'received' from the session and continues from there.
+    """
+    def __init__(self):
+        self._hashers = {}   # upload id -> (sha256 object, bytes hashed)
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _dir(self):
+        path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'chunked')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def part_path(self, upload):
+        return os.path.join(self._dir(), f"{upload.id}.part")
+
+    def _lock(self, upload_id):
+        with self._guard:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _release(self, upload_id):
+        with self._guard:
+            self._locks.pop(upload_id, None)
+            self._hashers.pop(upload_id, None)
+
+    def create(self, user_id, filename, size, sha256=None):
+        filename = secure_filename(filename or '')
+        if not filename or '.' not in filename:
+            raise UploadError('filename with an extension required')
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            raise UploadError('size required')
+        limit = current_app.config.get('UPLOAD_MAX_SIZE', 2 * 1024 ** 3)
+        if size <= 0 or size > limit:
+            raise UploadError(f'size must be between 1 and {limit} bytes', 413)
+
+        upload = UploadSession(id=str(uuid.uuid4()), user_id=user_id, filename=filename, size=size,
+                               received=0, expected_sha256=(sha256 or '').lower() or None)
+        open(self.part_path(upload), 'wb').close()
+        db.session.add(upload)
+        db.session.commit()
+        logger.info(f"DEMO LOG: Chunked upload {upload.id} started for {filename} ({size} bytes)")
+        return upload
+
+    def get(self, upload_id, user_id=None):
+        upload = db.session.get(UploadSession, upload_id)
+        if upload is None:
+            raise UploadError('Upload not found', 404)
+        # Sessions opened by a signed-in user are only usable by that user
+        if upload.user_id and upload.user_id != user_id:
+            raise UploadError('Upload belongs to another user', 403)
+        return upload
+
+    def _hasher(self, upload, path):
+        """Running hash of the first upload.received bytes; rebuilt from disk after a restart or on another worker."""
+        cached = self._hashers.get(upload.id)
+        if cached and cached[1] == upload.received:
+            return cached[0]
+        hasher, remaining = hashlib.sha256(), upload.received
+        with open(path, 'rb') as f:
+            while remaining:
+                block = f.read(min(BLOCK_SIZE, remaining))
+                if not block:
+                    raise UploadError('Upload data is missing on disk', 410, upload)
+                hasher.update(block)
+                remaining -= len(block)
+        return hasher
+
+    def write(self, upload, start, length, stream):
+        """Append length bytes read from stream at offset start, which must equal upload.received."""
+        with self._lock(upload.id):
+            db.session.refresh(upload)
+            if upload.status != UploadSession.STATUS_UPLOADING:
+                raise UploadError('Upload already finalized', 409, upload)
+            if start != upload.received:
+                raise UploadError(f'Expected a range starting at {upload.received}', 409, upload)
+            if length <= 0 or start + length > upload.size:
+                raise UploadError('Range exceeds the declared size', 416, upload)
+
+            path = self.part_path(upload)
+            hasher = self._hasher(upload, path)
+            position = start
+            try:
+                with open(path, 'r+b') as f:
+                    f.seek(start)
+                    while position < start + length:
+                        block = stream.read(min(BLOCK_SIZE, start + length - position))
+                        if not block:
+                            break
+                        f.write(block)
+                        hasher.update(block)
+                        position += len(block)
+                    # Bytes past position are from an attempt that was never recorded
+                    f.truncate(position)
+            except ClientDisconnected:
+                logger.info(f"DEMO LOG: Upload {upload.id} disconnected at {position} bytes")
+            finally:
+                self._hashers[upload.id] = (hasher, position)
+                upload.received = position
+                db.session.commit()
+            return upload
+
+    def write_request(self, upload):
+        """Apply the current PUT: its raw body holds the bytes named by Content-Range: bytes <start>-<end>/<size>."""
+        content_range = parse_content_range_header(request.headers.get('Content-Range'))
+        if content_range is None or content_range.units != 'bytes' or content_range.start is None:
+            raise UploadError('Content-Range: bytes <start>-<end>/<size> required', 400, upload)
+        if content_range.length is not None and content_range.length != upload.size:
+            raise UploadError('Content-Range size does not match the upload', 400, upload)
+        length = content_range.stop - content_range.start
+        if request.content_length is not None and request.content_length != length:
+            raise UploadError('Body length does not match Content-Range', 400, upload)
+        return self.write(upload, content_range.start, length, request.stream)
+
+    def finalize(self, upload):
+        with self._lock(upload.id):
+            db.session.refresh(upload)
+            if upload.status != UploadSession.STATUS_UPLOADING:
+                return upload
+            if upload.received != upload.size:
+                raise UploadError(f'Upload incomplete: {upload.received} of {upload.size} bytes', 409, upload)
+            digest = self._hasher(upload, self.part_path(upload)).hexdigest()
+            if upload.expected_sha256 and digest != upload.expected_sha256:
+                # Start over rather than hand a corrupt file to the endpoints
+                open(self.part_path(upload), 'wb').close()
+                self._hashers.pop(upload.id, None)
+                upload.received = 0
+                db.session.commit()
+                raise UploadError('Checksum mismatch; upload reset', 422, upload)
+            upload.sha256 = digest
+            upload.status = UploadSession.STATUS_COMPLETE
+            db.session.commit()
+        self._release(upload.id)
+        logger.info(f"DEMO LOG: Chunked upload {upload.id} complete ({upload.size} bytes, sha256 {digest[:12]})")
+        return upload
+
+    def resolve(self, upload_id, user_id=None):
+        upload = self.get(upload_id, user_id)
+        if upload.status != UploadSession.STATUS_COMPLETE:
+            raise UploadError('Upload not finalized' if upload.status == UploadSession.STATUS_UPLOADING
+                              else 'Upload already used', 409, upload)
+        return ChunkedFile(self, upload)
+
+    def consume(self, upload, dst):
+        os.replace(self.part_path(upload), dst)
+        upload.status = UploadSession.STATUS_CONSUMED
+        db.session.commit()
+
+    def abort(self, upload):
+        with self._lock(upload.id):
+            if os.path.exists(self.part_path(upload)):
+                os.remove(self.part_path(upload))
+            db.session.delete(upload)
+            db.session.commit()
+        self._release(upload.id)
+
+upload_service = UploadService()
+
+def incoming_file(user_id=None):
+    """
+    The file sent with this request: the multipart 'file' part, or the
+    finalized chunked upload named by the uploadId form field. None when
+    neither was sent.
+    """
+    file = request.files.get('file')
+    if file and file.filename:
+        return file
+    upload_id = request.form.get('uploadId') or request.args.get('uploadId')
+    if upload_id:
+        return upload_service.resolve(upload_id, user_id)
+    return None
@@ -0,0 +1,96 @@
+import logging
+from app import db
+from app.models.content import Content, Translation, SimplificationVariant
+from app.services.simplification_service import SimplificationService, LEVELS, EXPLANATION
+from app.utils.db_utils import upsert_add
+
+logger = logging.getLogger("VariantService")
+
+VARIANT_KINDS = LEVELS + [EXPLANATION]
+
+class VariantService:
+    """
+    Stores every simplification level and the explanation per content and
+    language, so switching level in the UI is a read instead of a recompute.
+    """
+    def __init__(self, simplification_service=None):
+        self.simplification_service = simplification_service or SimplificationService()
+
+    def store(self, content_id, language, levels, replace=True):
+        """Add or replace the variant rows for one language (caller commits)."""
+        existing = {}
+        if replace:
+            existing = {
+                v.level: v for v in SimplificationVariant.query.filter_by(content_id=content_id, language=language)
+            }
+        for level, text in levels.items():
+            if level not in VARIANT_KINDS:
+                continue
+            if level in existing:
+                existing[level].text = text
+            else:
+                db.session.add(SimplificationVariant(content_id=content_id, language=language, level=level, text=text))
+
+    def precompute(self, content, translations=None):
+        """Compute and store variants for a content and its translations in one batch."""
+        if translations is None:
+            translations = Translation.query.options(db.undefer_group('body')).filter_by(content_id=content.content_id).all()
+
+        rows = [(content, content.text, content.language)] + [(t, t.translated_text, t.language) for t in translations]
+        results = self.simplification_service.simplify_many(
+            [(text, content.level) for _, text, _ in rows], all_levels=True, include_explanation=True
+        )
+        for (row, _, language), result in zip(rows, results):
+            levels = result['levels']
+            row.explanation_text = levels[EXPLANATION]
+            if not row.simplified_text:
+                row.simplified_text = result['simplifiedText']
+            self.store(content.content_id, language, levels)
+        logger.info(f"DEMO LOG: Stored {len(rows) * len(VARIANT_KINDS)} variants for {content.content_id}")
+
+    def get_variants(self, content_id, language=None):
+        """
+        Stored variants as {language: {level: text}}. Missing languages are
+        computed from the stored text and written back.
+        """
+        content = Content.query.get(content_id)
+        if not content:
+            return None
+
+        query = SimplificationVariant.query.filter_by(content_id=content_id)
+        if language:
+            query = query.filter_by(language=language)
+        variants = {}
+        for v in query:
+            variants.setdefault(v.language, {})[v.level] = v.text
+
+        wanted = [language] if language else [content.language] + [
+            t.language for t in Translation.query.filter_by(content_id=content_id).with_entities(Translation.language)
+        ]
+        missing = [lang for lang in wanted if set(variants.get(lang, {})) != set(VARIANT_KINDS)]
+        if missing:
+            self._write_back(content, missing, variants)
+        return variants
+
+    def _write_back(self, content, languages, variants):
+        texts = {content.language: content.text}
+        for t in Translation.query.options(db.undefer(Translation.translated_text)).filter(
+            Translation.content_id == content.content_id, Translation.language.in_(languages)
+        ):
+            texts[t.language] = t.translated_text
+
+        languages = [lang for lang in languages if texts.get(lang)]
+        results = self.simplification_service.simplify_many(
+            [(texts[lang], content.level) for lang in languages], all_levels=True, include_explanation=True
+        )
+        rows = []
+        for lang, result in zip(languages, results):
+            variants[lang] = result['levels']
+            rows += [{'content_id': content.content_id, 'language': lang, 'level': level, 'text': text}
+                     for level, text in result['levels'].items() if level in VARIANT_KINDS]
+        # Concurrent first reads of the same content compute the same rows; the later writer just overwrites
+        if rows:
+            upsert_add(SimplificationVariant.__table__, rows,
+                       index_elements=['content_id', 'language', 'level'], increments=[], replace=['text'])
+        db.session.commit()
+        logger.info(f"DEMO LOG: Lazily computed variants for {content.content_id} in {languages}")
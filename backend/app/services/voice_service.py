@@ -1,5 +1,6 @@
 
 import os
+from app.services.transcode_service import transcode_service
 try:
     from gtts import gTTS
     import speech_recognition as sr
@@ -30,6 +31,7 @@ class VoiceService:
             # Save to file
             tts = gTTS(text=text, lang=gtts_lang, slow=False)
             tts.save(output_path)
+            transcode_service.enqueue(output_path)
             return True
         except Exception as e:
             print(f"TTS Error: {e}")
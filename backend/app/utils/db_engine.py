@@ -0,0 +1,94 @@
+import logging
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+logger = logging.getLogger("DBEngine")
+
+REPLICA = 'replica'
+READ_METHODS = ('GET', 'HEAD')
+
+def engine_options(uri, config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the database behind uri."""
+    if uri.startswith('postgresql') or uri.startswith('postgres'):
+        return {
+            'pool_size': config.get('DB_POOL_SIZE', 10),
+            'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+            'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+            'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+            # Drop connections the server or a proxy closed while idle instead of failing the request
+            'pool_pre_ping': True
+        }
+    if uri.startswith('sqlite') and ':memory:' not in uri:
+        return {
+            'connect_args': {
+                # Wait for a writer instead of raising "database is locked"
+                'timeout': config.get('SQLITE_BUSY_TIMEOUT_MS', 15000) / 1000.0,
+                # Request threads and task queue workers share the pool
+                'check_same_thread': False
+            }
+        }
+    return {}
+
+def configure_engine(engine, config):
+    """Per-connection settings that cannot be passed as engine options."""
+    if engine.dialect.name != 'sqlite' or engine.url.database in (None, '', ':memory:'):
+        return
+
+    journal_mode = config.get('SQLITE_JOURNAL_MODE', 'WAL')
+    synchronous = config.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    busy_timeout = int(config.get('SQLITE_BUSY_TIMEOUT_MS', 15000))
+
+    @event.listens_for(engine, 'connect')
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers run alongside the single writer; NORMAL sync is durable in WAL mode
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={journal_mode}")
+        cursor.execute(f"PRAGMA synchronous={synchronous}")
+        cursor.execute(f"PRAGMA busy_timeout={busy_timeout}")
+        cursor.close()
+
+def apply_profile(app):
+    """Fill in engine options and the replica bind from config. Call before db.init_app."""
+    config = app.config
+    config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', engine_options(config['SQLALCHEMY_DATABASE_URI'], config))
+    replica_url = config.get('DATABASE_REPLICA_URL')
+    if replica_url:
+        binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+        binds.setdefault(REPLICA, {'url': replica_url, **engine_options(replica_url, config)})
+        config['SQLALCHEMY_BINDS'] = binds
+
+def use_primary(fn=None):
+    """
+    Keep the rest of this request on the primary database, e.g. a GET that
+    must see a write it just made. Works as a decorator or as a plain call.
+    """
+    if fn is None:
+        g.use_primary = True
+        return None
+
+    from functools import wraps
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        g.use_primary = True
+        return fn(*args, **kwargs)
+    return wrapper
+
+class RoutingSession(Session):
+    """
+    Sends SELECTs issued while serving GET/HEAD requests to the 'replica'
+    bind when DATABASE_REPLICA_URL is set. Writes, flushes, background jobs
+    and requests marked with use_primary() always use the primary.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            return self._db.engines[REPLICA]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause):
+        if self._flushing or clause is None or not getattr(clause, 'is_select', False):
+            return False
+        if not has_request_context() or request.method not in READ_METHODS or g.get('use_primary'):
+            return False
+        return REPLICA in self._db.engines
@@ -0,0 +1,26 @@
+from app import db
+
+
+def dialect_insert(table):
+    """INSERT construct with ON CONFLICT support for the active database."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return insert(table)
+
+
+def upsert_add(table, rows, index_elements, increments, replace=(), batch_size=200):
+    """
+    Insert rows; where the key already exists, add the row's values for the
+    increments columns to the stored ones (and overwrite the replace columns).
+    Atomic per row, so concurrent writers never lose updates.
+    """
+    for start in range(0, len(rows), batch_size):
+        stmt = dialect_insert(table).values(rows[start:start + batch_size])
+        updates = {col: table.c[col] + stmt.excluded[col] for col in increments}
+        updates.update({col: stmt.excluded[col] for col in replace})
+        db.session.execute(stmt.on_conflict_do_update(index_elements=index_elements, set_=updates))
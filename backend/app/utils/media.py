@@ -0,0 +1,129 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import threading
+from flask import abort, current_app, request, send_file
+from werkzeug.security import safe_join
+
+logger = logging.getLogger("MediaServing")
+
+# Names the app itself derives from content and never rewrites: TTS narration
+# (tts_<lang>_<md5>.mp3 and its .lo.opus/.lo.mp3 transcodes) and preview
+# derivatives (previews/<aa>/<sha256>-<size>.webp). User uploads are kept
+# out even when their names contain hex, since they can be replaced in place.
+GENERATED_NAMES = [
+    re.compile(r'^tts_[a-z]+_(?P<hash>[0-9a-f]{32})(?P<variant>(?:\.lo)?\.(?:mp3|opus))$'),
+    re.compile(r'^previews/[0-9a-f]{2}/(?P<hash>[0-9a-f]{64})(?P<variant>-(?:thumb|display)\.webp)$'),
+]
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Precompressed siblings, in order of preference
+PRECOMPRESSED = [('br', '.br'), ('gzip', '.gz')]
+
+_etag_cache = {}
+_etag_lock = threading.Lock()
+
+
+def content_etag(path, stat=None):
+    """
+    Strong ETag derived from file contents. Hashes are cached per
+    (path, mtime, size) so each file is read at most once per change.
+    """
+    stat = stat or os.stat(path)
+    key = (stat.st_mtime_ns, stat.st_size)
+    cached = _etag_cache.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    etag = digest.hexdigest()[:32]
+
+    with _etag_lock:
+        if len(_etag_cache) >= current_app.config.get('MEDIA_ETAG_CACHE_SIZE', 10000):
+            _etag_cache.clear()
+        _etag_cache[path] = (key, etag)
+    return etag
+
+
+def generated_etag(filename):
+    """
+    Strong ETag for an app-generated, content-addressed name, or None.
+    Includes the variant suffix: the .mp3 and .lo.opus of one narration
+    share a hash but are different bytes, so If-Range must tell them apart.
+    """
+    name = filename.replace(os.sep, '/').lstrip('/')
+    for pattern in GENERATED_NAMES:
+        match = pattern.match(name)
+        if match:
+            return match.group('hash') + match.group('variant')
+    return None
+
+
+def _precompressed_variant(path):
+    if request.range is not None:
+        return None, None
+    accepted = request.accept_encodings
+    for encoding, suffix in PRECOMPRESSED:
+        if accepted[encoding] and os.path.isfile(path + suffix):
+            return path + suffix, encoding
+    return None, None
+
+
+def send_media(directory, filename):
+    """
+    Serve a stored media file with byte-range support, strong ETags,
+    conditional 304s, long-lived caching for content-addressed names and
+    optional X-Accel-Redirect / X-Sendfile offload to the front web server.
+    """
+    path = safe_join(directory, filename)
+    if path is None or not os.path.isfile(path):
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    served_path, encoding = _precompressed_variant(path)
+    served_path = served_path or path
+    stat = os.stat(served_path)
+
+    immutable_etag = generated_etag(filename)
+    if immutable_etag and not encoding:
+        # Name already identifies the bytes; no need to read the file
+        etag = immutable_etag
+    else:
+        etag = content_etag(served_path, stat)
+
+    accel_prefix = current_app.config.get('MEDIA_X_ACCEL_PREFIX')
+    if accel_prefix:
+        relative = os.path.relpath(served_path, directory).replace(os.sep, '/')
+        response = current_app.response_class(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{relative}"
+        response.set_etag(etag)
+        response.last_modified = stat.st_mtime
+        response.make_conditional(request)
+    else:
+        response = send_file(
+            served_path,
+            mimetype=mimetype,
+            conditional=True,
+            etag=etag,
+            last_modified=stat.st_mtime,
+            max_age=0
+        )
+
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+
+    response.cache_control.public = True
+    if immutable_etag:
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        # Uploads can be replaced under the same name, so revalidate every time
+        response.cache_control.max_age = current_app.config.get('MEDIA_MAX_AGE', 0)
+        response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,107 @@
+import base64
+import json
+from datetime import datetime
+from flask import current_app, request
+from sqlalchemy.orm import defer, undefer
+from app import db
+
+class CursorError(ValueError):
+    """Raised for a ?cursor= value that was not issued by paginate()."""
+
+def encode_cursor(sort_value, row_id):
+    if isinstance(sort_value, datetime):
+        sort_value = {'dt': sort_value.isoformat()}
+    raw = json.dumps([sort_value, row_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        sort_value, row_id = json.loads(raw)
+        if isinstance(sort_value, dict):
+            sort_value = datetime.fromisoformat(sort_value['dt'])
+    except (ValueError, TypeError, KeyError) as e:
+        raise CursorError('Invalid cursor') from e
+    return sort_value, row_id
+
+def _cursor_value(column, value, nullable=False):
+    """value, checked against column's Python type; Postgres fails (500) on a bind of the wrong type."""
+    if value is None and nullable:
+        return value
+    try:
+        expected = column.type.python_type
+    except NotImplementedError:
+        expected = None
+    if value is None or isinstance(value, (list, dict)) or (expected is not None and not isinstance(value, expected)):
+        raise CursorError('Invalid cursor')
+    return value
+
+def page_size():
+    """?limit= clamped to PAGE_SIZE_MAX, PAGE_SIZE_DEFAULT when absent or malformed."""
+    default = current_app.config.get('PAGE_SIZE_DEFAULT', 100)
+    maximum = current_app.config.get('PAGE_SIZE_MAX', 500)
+    try:
+        limit = int(request.args.get('limit', default))
+    except (TypeError, ValueError):
+        limit = default
+    return max(1, min(limit, maximum))
+
+def paginate(query, sort_column, id_column, descending=True):
+    """
+    One page of query in (sort_column, id_column) order, continuing after
+    ?cursor=. Keyset rather than OFFSET, so every page costs the same no
+    matter how deep it is and rows inserted meanwhile never shift a page.
+    Returns (items, next_cursor); next_cursor is None on the last page.
+    """
+    limit = page_size()
+    cursor = request.args.get('cursor')
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        # A NULL sort value was encoded from a real row; it just matches nothing further
+        sort_value = _cursor_value(sort_column, sort_value, nullable=True)
+        row_id = _cursor_value(id_column, row_id)
+        if descending:
+            after = db.or_(sort_column < sort_value, db.and_(sort_column == sort_value, id_column < row_id))
+        else:
+            after = db.or_(sort_column > sort_value, db.and_(sort_column == sort_value, id_column > row_id))
+        query = query.filter(after)
+
+    order = (sort_column.desc(), id_column.desc()) if descending else (sort_column.asc(), id_column.asc())
+    rows = query.order_by(*order).limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+    return items, next_cursor
+
+def with_cursor(response, next_cursor):
+    """For endpoints that return a bare JSON list: the next page's cursor goes in a header."""
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+def requested_fields():
+    """?fields=a,b,c as a set of response keys, or None for everything."""
+    raw = request.args.get('fields')
+    if not raw:
+        return None
+    return {f.strip() for f in raw.split(',') if f.strip()}
+
+def load_fields(query, model, fields):
+    """
+    Load model.HEAVY_FIELDS columns in the main query when their response
+    keys are wanted (all of them when fields is None) and skip them otherwise.
+    Works for columns that are deferred by default as well as regular ones.
+    """
+    heavy = getattr(model, 'HEAVY_FIELDS', {})
+    options = [
+        undefer(getattr(model, attr)) if fields is None or key in fields else defer(getattr(model, attr))
+        for key, attr in heavy.items()
+    ]
+    return query.options(*options) if options else query
+
+def project(item, fields):
+    if fields is None:
+        return item
+    return {key: value for key, value in item.items() if key in fields}
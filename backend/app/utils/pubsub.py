@@ -0,0 +1,118 @@
+import json
+import logging
+import queue
+import threading
+from collections import defaultdict
+
+logger = logging.getLogger("PubSub")
+
+class LocalSubscription:
+    def __init__(self, broker, channel, maxsize):
+        self.broker = broker
+        self.channel = channel
+        self._queue = queue.Queue(maxsize=maxsize)
+
+    def put(self, event):
+        # A stalled client loses its oldest events rather than blocking publishers;
+        # it catches up through the sync endpoint on reconnect
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Next event, or None after timeout seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker._unsubscribe(self)
+
+class LocalBroker:
+    """In-process fan-out; only reaches subscribers in the same process."""
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = LocalSubscription(self, channel, self.queue_size)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(event)
+        return len(subscribers)
+
+class RedisSubscription:
+    def __init__(self, pubsub, channel):
+        self._pubsub = pubsub
+        self._pubsub.subscribe(channel)
+
+    def get(self, timeout=None):
+        message = self._pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout or 0)
+        return json.loads(message['data']) if message else None
+
+    def close(self):
+        self._pubsub.close()
+
+class RedisBroker:
+    """Redis pub/sub, for several worker processes or hosts. Needs the redis package."""
+    def __init__(self, url):
+        import redis
+        self._client = redis.Redis.from_url(url)
+
+    def subscribe(self, channel):
+        return RedisSubscription(self._client.pubsub(), channel)
+
+    def publish(self, channel, event):
+        return self._client.publish(channel, json.dumps(event))
+
+class PubSub:
+    """
+    Channel fan-out for server push. In-process by default; set PUBSUB_URL
+    (redis://...) when the app runs as more than one process so an event
+    published by one worker reaches streams held open by the others.
+    Events are JSON-serializable dicts.
+    """
+    def __init__(self):
+        self.broker = LocalBroker()
+
+    def init_app(self, app):
+        url = app.config.get('PUBSUB_URL')
+        if url:
+            self.broker = RedisBroker(url)
+            logger.info("Pub/sub using Redis broker")
+        else:
+            self.broker = LocalBroker(app.config.get('PUBSUB_QUEUE_SIZE', 100))
+        app.extensions['pubsub'] = self
+
+    def subscribe(self, channel):
+        return self.broker.subscribe(channel)
+
+    def publish(self, channel, event):
+        try:
+            return self.broker.publish(channel, event)
+        except Exception as e:
+            # Push is best effort: clients re-sync from their cursor, so a lost event is only late
+            logger.error(f"Publish to {channel} failed: {e}")
+            return 0
@@ -0,0 +1,60 @@
+import logging
+from sqlalchemy import inspect, text, LargeBinary
+from app import db
+from app.models.types import CompressedText
+
+logger = logging.getLogger("Schema")
+
+def needs_binary(column, existing, engine):
+    return (
+        engine.dialect.name == 'postgresql'
+        and isinstance(column.type, CompressedText)
+        and not isinstance(existing['type'], LargeBinary)
+    )
+
+def ensure_schema():
+    """
+    Bring an existing SQLite/Postgres database up to date with the models.
+    create_all() only creates tables that are missing, so columns and
+    indexes added to existing tables afterwards are applied here: nullable
+    columns via ALTER TABLE ADD COLUMN, indexes via CREATE INDEX, and on
+    Postgres text columns that became CompressedText are converted to BYTEA.
+    Safe to run on every start. Returns {'columns': [...], 'indexes': [...]} of what changed.
+    """
+    db.create_all()
+    engine = db.engine
+    inspector = inspect(engine)
+    preparer = engine.dialect.identifier_preparer
+    changes = {'columns': [], 'indexes': []}
+
+    with engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            existing_columns = {c['name']: c for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    if needs_binary(column, existing_columns[column.name], engine):
+                        # Text column that became CompressedText; SQLite stores either in place
+                        conn.execute(text(
+                            f"ALTER TABLE {preparer.format_table(table)} ALTER COLUMN {preparer.format_column(column)} "
+                            f"TYPE BYTEA USING convert_to({preparer.format_column(column)}, 'UTF8')"
+                        ))
+                        changes['columns'].append(f"{table.name}.{column.name}")
+                    continue
+                if column.primary_key or not column.nullable:
+                    logger.warning(f"Cannot add NOT NULL column {table.name}.{column.name} to existing rows, skipping")
+                    continue
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.format_table(table)} "
+                    f"ADD COLUMN {preparer.format_column(column)} {column.type.compile(dialect=engine.dialect)}"
+                ))
+                changes['columns'].append(f"{table.name}.{column.name}")
+
+            existing_indexes = {ix['name'] for ix in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn)
+                    changes['indexes'].append(index.name)
+
+    if changes['columns'] or changes['indexes']:
+        logger.info(f"Schema updated: {len(changes['columns'])} columns, {len(changes['indexes'])} indexes added")
+    return changes
@@ -0,0 +1,158 @@
+import itertools
+import logging
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+logger = logging.getLogger("TaskQueue")
+
+
+class Job:
+    """
+    Progress handle passed to every background job as its first argument.
+    """
+    def __init__(self, job_id, name):
+        self.id = job_id
+        self.name = name
+        self.status = 'queued'
+        self.total = 0
+        self.done = 0
+        self.message = ''
+        self.result = None
+        self.error = None
+        self.created_at = datetime.utcnow()
+        self.started_at = None
+        self.finished_at = None
+
+    def update(self, done=None, total=None, message=None):
+        if total is not None:
+            self.total = total
+        if done is not None:
+            self.done = done
+        if message is not None:
+            self.message = message
+
+    def advance(self, step=1, message=None):
+        self.update(done=self.done + step, message=message)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'done': self.done,
+            'total': self.total,
+            'progress': round(self.done / self.total, 3) if self.total else (1.0 if self.status == 'finished' else 0.0),
+            'message': self.message,
+            'result': self.result,
+            'error': self.error,
+            'createdAt': self.created_at.isoformat(),
+            'startedAt': self.started_at.isoformat() if self.started_at else None,
+            'finishedAt': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class TaskQueue:
+    """
+    In-process priority queue for background pipeline stages.
+
+    Jobs run on daemon worker threads inside an application context so they
+    can use db.session like a request handler. Higher priority runs first;
+    equal priorities run in submission order.
+    """
+    def __init__(self, app=None, workers=2, history=500):
+        self.app = None
+        self.workers = workers
+        self.eager = False
+        self.history = history
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.workers = app.config.get('TASK_QUEUE_WORKERS', self.workers)
+        self.eager = app.config.get('TASK_QUEUE_EAGER', False)
+        app.extensions['task_queue'] = self
+
+    def submit(self, fn, *args, priority=0, name=None, **kwargs):
+        """Queue fn(job, *args, **kwargs) and return the job id."""
+        job = Job(str(uuid.uuid4()), name or getattr(fn, '__name__', 'job'))
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim_history()
+
+        if self.eager:
+            self._run(job, fn, args, kwargs)
+            return job.id
+
+        self._ensure_workers()
+        self._queue.put((-priority, next(self._counter), job, fn, args, kwargs))
+        logger.info(f"Queued job {job.name} ({job.id}) with priority {priority}")
+        return job.id
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def find(self, name):
+        """Most recent job submitted under the given name."""
+        with self._lock:
+            for job in reversed(self._jobs.values()):
+                if job.name == name:
+                    return job
+        return None
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def join(self):
+        """Block until every queued job has run, e.g. before a command-line script exits."""
+        if not self.eager:
+            self._queue.join()
+
+    def _trim_history(self):
+        while len(self._jobs) > self.history:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if oldest.status in ('queued', 'running'):
+                break
+            self._jobs.pop(oldest_id)
+
+    def _ensure_workers(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, name=f"task-queue-{len(self._threads)}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def _worker(self):
+        while True:
+            _, _, job, fn, args, kwargs = self._queue.get()
+            try:
+                self._run(job, fn, args, kwargs)
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job, fn, args, kwargs):
+        from app import db
+
+        job.status = 'running'
+        job.started_at = datetime.utcnow()
+        with self.app.app_context():
+            try:
+                job.result = fn(job, *args, **kwargs)
+                job.status = 'finished'
+            except Exception as e:
+                logger.exception(f"Job {job.name} ({job.id}) failed: {e}")
+                db.session.rollback()
+                job.status = 'failed'
+                job.error = str(e)
+            finally:
+                job.finished_at = datetime.utcnow()
+                db.session.remove()
@@ -0,0 +1,91 @@
+import re
+import unicodedata
+
+# Sentence terminators: Latin . ! ?, Devanagari danda / double danda, Urdu full stop
+DANDA = '।'
+DOUBLE_DANDA = '॥'
+URDU_FULL_STOP = '۔'
+
+_BOUNDARY = re.compile(r'([.!?]+)(?=[\s"\')\]]|$)|([।॥۔]+)|(\n\s*\n|\n(?=\s*[-*\d#]))')
+
+# Tokens ending in "." that do not end a sentence
+ABBREVIATIONS = {
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'e.g', 'i.e',
+    'fig', 'no', 'eq', 'dept', 'govt', 'ch', 'vol', 'pg', 'sec'
+}
+
+
+def split_sentences(text):
+    """
+    Split multilingual text into sentences without their terminators.
+    Handles danda-terminated Indic text, Urdu, decimals (3.14), common
+    abbreviations (Dr., e.g.) and initials (A. P. J.).
+    """
+    if not text:
+        return []
+
+    sentences = []
+    start = 0
+    for match in _BOUNDARY.finditer(text):
+        if match.group(1) == '.':
+            words = text[start:match.start()].split()
+            last = words[-1].lower() if words else ''
+            if last in ABBREVIATIONS or (len(last) == 1 and last.isalpha()):
+                continue
+        sentence = text[start:match.start()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+
+    tail = text[start:].strip()
+    if tail:
+        sentences.append(tail)
+    return sentences
+
+
+def sentence_stop(text):
+    """Full stop used by the script the text is written in."""
+    if DANDA in text or DOUBLE_DANDA in text:
+        return DANDA
+    if URDU_FULL_STOP in text:
+        return URDU_FULL_STOP
+    return '.'
+
+
+# Words in Latin and Indic scripts; Indic vowel signs are combining marks that
+# \w alone would split on, so the Brahmic and Arabic letter ranges (minus
+# danda and Urdu punctuation) are listed explicitly
+_WORD = re.compile(r'[\w\u0900-\u0963\u0966-\u0DFF\u0620-\u065F\u066E-\u06D3\u06D5-\u06FF]+')
+
+STOPWORDS = {
+    # English
+    'the', 'and', 'for', 'are', 'was', 'were', 'this', 'that', 'with', 'from', 'into', 'their',
+    'they', 'them', 'these', 'those', 'which', 'what', 'when', 'where', 'who', 'how', 'why',
+    'has', 'have', 'had', 'been', 'being', 'its', 'also', 'can', 'will', 'would', 'should',
+    'could', 'may', 'might', 'about', 'such', 'some', 'other', 'than', 'then', 'there',
+    'here', 'more', 'most', 'very', 'all', 'any', 'each', 'both', 'our', 'your', 'not',
+    'but', 'one', 'two', 'use', 'used', 'using', 'like', 'many', 'much', 'known', 'called',
+    'generally', 'involves', 'describes', 'lesson',
+    # Hindi
+    'है', 'हैं', 'और', 'का', 'की', 'के', 'में', 'से', 'को', 'एक', 'यह', 'वह', 'पर', 'भी',
+    'तो', 'ही', 'था', 'थी', 'थे', 'लिए', 'कि', 'जो', 'इस', 'उस', 'कर', 'करते', 'होता', 'होती'
+}
+
+
+def tokenize_words(text, min_length=3):
+    """Lower-cased word tokens without stopwords, numbers or very short words."""
+    if not text:
+        return []
+    return [
+        word for word in (w.lower() for w in _WORD.findall(text))
+        if len(word) >= min_length and not word.isdigit() and word not in STOPWORDS and '_' not in word
+    ]
+
+def search_terms(text):
+    """
+    Tokens for the full-text index and for queries against it: NFC-normalized
+    so precomposed and decomposed Indic text match, two-letter words kept.
+    """
+    if not text:
+        return []
+    return tokenize_words(unicodedata.normalize('NFC', text), min_length=2)
@@ -0,0 +1,105 @@
+"""
+Concurrency benchmark for the database engine profile.
+
+Runs the same mixed read/write workload (many threads, mostly reads of a
+recent-messages page, some inserts) twice: once with SQLAlchemy's default
+engine settings and once with the profile from app/utils/db_engine.py
+(WAL, busy timeout and synchronous=NORMAL for SQLite; pool sizing and
+pre-ping for Postgres). Prints throughput, latency and errors per run.
+
+    python bench_db_concurrency.py
+    BENCH_DATABASE_URL=postgresql://localhost/equilearn_bench BENCH_THREADS=64 python bench_db_concurrency.py
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import random
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Text, DateTime, select, insert
+from app.utils.db_engine import engine_options, configure_engine
+
+THREADS = int(os.getenv('BENCH_THREADS', 32))
+OPS_PER_THREAD = int(os.getenv('BENCH_OPS', 200))
+WRITE_RATIO = float(os.getenv('BENCH_WRITE_RATIO', 0.2))
+
+metadata = MetaData()
+messages = Table(
+    'bench_messages', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('author', String(50), index=True),
+    Column('body', Text),
+    Column('created_at', DateTime)
+)
+
+def build_engine(url, tuned):
+    if not tuned:
+        return create_engine(url)
+    config = {}
+    engine = create_engine(url, **engine_options(url, config))
+    configure_engine(engine, config)
+    return engine
+
+def worker(engine, latencies, errors):
+    rng = random.Random()
+    for _ in range(OPS_PER_THREAD):
+        author = f"user-{rng.randrange(50)}"
+        started = time.perf_counter()
+        try:
+            if rng.random() < WRITE_RATIO:
+                with engine.begin() as conn:
+                    conn.execute(insert(messages).values(author=author, body='x' * 200, created_at=datetime.utcnow()))
+            else:
+                with engine.connect() as conn:
+                    conn.execute(
+                        select(messages).where(messages.c.author == author).order_by(messages.c.id.desc()).limit(20)
+                    ).fetchall()
+            latencies.append(time.perf_counter() - started)
+        except Exception as e:
+            errors[type(e).__name__ + ': ' + str(e).splitlines()[0][:60]] += 1
+
+def run(url, tuned):
+    engine = build_engine(url, tuned)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    latencies, errors = [], Counter()
+    threads = [threading.Thread(target=worker, args=(engine, latencies, errors)) for _ in range(THREADS)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    engine.dispose()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    label = 'tuned profile' if tuned else 'default engine'
+    print(f"\n{label}: {len(latencies)} ok / {sum(errors.values())} failed in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.0f} ops/s), "
+          f"p50 {statistics.median(latencies) * 1000 if latencies else 0:.1f} ms, p95 {p95 * 1000:.1f} ms")
+    for error, count in errors.most_common(5):
+        print(f"  {count} x {error}")
+    return sum(errors.values())
+
+def main():
+    url = os.getenv('BENCH_DATABASE_URL')
+    tmpdir = None
+    if not url:
+        tmpdir = tempfile.mkdtemp(prefix='equilearn-bench-')
+        url = f"sqlite:///{os.path.join(tmpdir, 'bench.db')}"
+    print(f"Benchmarking {THREADS} threads x {OPS_PER_THREAD} ops ({WRITE_RATIO:.0%} writes) against {url}")
+
+    run(url, tuned=False)
+    # A fresh file so the default run's journal mode does not carry over
+    if tmpdir:
+        url = f"sqlite:///{os.path.join(tmpdir, 'bench-tuned.db')}"
+    failed = run(url, tuned=True)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
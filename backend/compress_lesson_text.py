@@ -0,0 +1,47 @@
+"""
+Compress lesson bodies that were stored before the text columns became
+CompressedText.
+
+Old rows stay readable as they are; this rewrites them in batches so they
+take the compressed form too. Safe to re-run. On SQLite run VACUUM
+afterwards to return the freed pages to the filesystem.
+
+    python compress_lesson_text.py
+"""
+from sqlalchemy.orm.attributes import flag_modified
+from app import create_app, db
+from app.models.content import Content, Translation
+from app.models.types import CompressedText
+from app.utils.schema import ensure_schema
+
+BATCH_SIZE = 200
+
+def recompress(model, key):
+    columns = [c.key for c in model.__table__.columns if isinstance(c.type, CompressedText)]
+    rewritten = 0
+    last = None
+    while True:
+        query = model.query.options(db.undefer_group('body')).order_by(key)
+        if last is not None:
+            query = query.filter(key > last)
+        rows = query.limit(BATCH_SIZE).all()
+        if not rows:
+            break
+        for row in rows:
+            for column in columns:
+                if getattr(row, column) is not None:
+                    flag_modified(row, column)
+        last = getattr(rows[-1], key.key)
+        db.session.commit()
+        rewritten += len(rows)
+        print(f"  {model.__tablename__}: {rewritten} rows")
+    return rewritten
+
+if __name__ == "__main__":
+    app = create_app('development')
+    with app.app_context():
+        ensure_schema()
+        print("Compressing lesson text...")
+        recompress(Content, Content.content_id)
+        recompress(Translation, Translation.id)
+        print("Done!")
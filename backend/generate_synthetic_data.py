@@ -0,0 +1,359 @@
+"""
+Deterministic synthetic data for load and scaling benchmarks.
+
+seed_db.py creates a handful of demo rows; this fills the database at
+production-like scale so query costs that grow with table size show up:
+students, teachers, classrooms, lessons with translations, quizzes with
+questions and attempts, and direct messages. Popularity is skewed (a few
+big classrooms, busy quizzes and chatty conversations, a long tail of quiet
+ones) via Zipf weights, and every table draws from its own seeded random
+stream, so the same --seed always produces the same rows and changing one
+count does not reshuffle the other tables.
+
+Rows are written with multi-row INSERTs, committed per batch.
+
+    python generate_synthetic_data.py --scale 0.01                # ~1k students, quick local run
+    python generate_synthetic_data.py --reset                      # full size: 100k students, 200k lessons, 2M DMs
+    python generate_synthetic_data.py --lessons 50000 --dms 0 --classroom-skew 1.4
+
+Every synthetic user logs in with password "synthetic123"
+(e.g. student000001@synthetic.equilearn.test).
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+from app import create_app, db
+from app.models.user import User
+from app.models.classroom import Classroom, classroom_students, classroom_teachers
+from app.models.content import Content, Translation
+from app.models.quiz import Quiz, Question, StudentQuizAttempt
+from app.models.dm import DirectMessage
+from app.utils.schema import ensure_schema
+
+PASSWORD = 'synthetic123'
+ID_PREFIX = 'syn-'
+EMAIL_DOMAIN = 'synthetic.equilearn.test'
+
+SUBJECTS = ['Physics', 'Chemistry', 'Biology', 'Mathematics', 'History', 'Geography', 'Civics', 'English', 'Computer Science']
+LEVELS = ['easy', 'medium', 'detailed']
+LANGUAGES = ['hi', 'ta', 'te', 'kn', 'ml', 'bn', 'mr']
+# Consonant block per script, so translations exercise real tokenization and compression
+SCRIPTS = {
+    'en': [chr(c) for c in range(ord('a'), ord('z') + 1)],
+    'hi': [chr(c) for c in range(0x0915, 0x0939)],
+    'mr': [chr(c) for c in range(0x0915, 0x0939)],
+    'ta': [chr(c) for c in range(0x0B95, 0x0BB9)],
+    'te': [chr(c) for c in range(0x0C15, 0x0C39)],
+    'kn': [chr(c) for c in range(0x0C95, 0x0CB9)],
+    'ml': [chr(c) for c in range(0x0D15, 0x0D39)],
+    'bn': [chr(c) for c in range(0x0995, 0x09B9)],
+}
+SENTENCE_POOL = 2000
+
+def stream(seed, name):
+    """Independent random stream per table."""
+    return random.Random(f"{seed}:{name}")
+
+def zipf_cum_weights(n, skew):
+    total, cum = 0.0, []
+    for rank in range(1, n + 1):
+        total += 1.0 / rank ** skew
+        cum.append(total)
+    return cum
+
+def skewed(rng, population, skew):
+    """Shuffled copy of population and its cumulative Zipf weights, for pick()."""
+    order = list(population)
+    rng.shuffle(order)
+    return order, zipf_cum_weights(len(order), skew)
+
+def pick(rng, order, cum):
+    return order[bisect_left(cum, rng.random() * cum[-1])]
+
+def count_around(rng, mean, low=0, high=None):
+    """Exponentially distributed count with the given mean (most small, a few large)."""
+    value = int(round(rng.expovariate(1.0 / mean))) if mean > 0 else 0
+    value = max(low, value)
+    return min(value, high) if high is not None else value
+
+def moment(rng, start, days):
+    return start + timedelta(seconds=rng.randrange(days * 86400))
+
+def make_words(rng, letters, count):
+    return [''.join(rng.choice(letters) for _ in range(rng.randint(2, 9))) for _ in range(count)]
+
+def sentence_pool(rng, language):
+    words = make_words(rng, SCRIPTS[language], 3000)
+    pool = []
+    for _ in range(SENTENCE_POOL):
+        sentence = ' '.join(rng.choice(words) for _ in range(rng.randint(6, 20)))
+        pool.append(sentence[0].upper() + sentence[1:] + '.')
+    return pool
+
+def body(rng, pool, mean_sentences):
+    return ' '.join(rng.choice(pool) for _ in range(count_around(rng, mean_sentences, low=3, high=mean_sentences * 6)))
+
+def insert_batches(target, rows, batch_size, label):
+    """Multi-row INSERT of rows (an iterable of dicts) in batches, committing each. Returns the row count."""
+    table = target.__table__ if hasattr(target, '__table__') else target
+    started = time.time()
+    total = 0
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+        total += len(batch)
+        if total % (batch_size * 20) == 0:
+            print(f"  {label}: {total} rows ({total / (time.time() - started):.0f}/s)")
+    elapsed = time.time() - started
+    print(f"{label}: {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/s)")
+    return total
+
+def scaled(value, scale, minimum=1):
+    return max(minimum, int(value * scale)) if value else 0
+
+class SyntheticData:
+    def __init__(self, args):
+        self.args = args
+        self.start = datetime.fromisoformat(args.start)
+        self.password_hash = generate_password_hash(PASSWORD)  # hashed once; per-row hashing would dominate
+        self.students = [f"{ID_PREFIX}s{i:06d}" for i in range(1, args.students + 1)]
+        self.teachers = [f"{ID_PREFIX}t{i:05d}" for i in range(1, args.teachers + 1)]
+        self.classrooms = [f"{ID_PREFIX}c{i:05d}" for i in range(1, args.classrooms + 1)]
+        self.subject_of = {}
+        self.teacher_of = {}
+        self.roster = {}
+        self.quizzes = []
+
+    def _names(self, rng, count):
+        syllables = make_words(rng, SCRIPTS['en'], 400)
+        return [f"{rng.choice(syllables).title()} {rng.choice(syllables).title()}" for _ in range(count)]
+
+    def users(self):
+        rng = stream(self.args.seed, 'users')
+        names = self._names(rng, 2000)
+        for role, ids in (('teacher', self.teachers), ('student', self.students)):
+            for user_id in ids:
+                yield {
+                    'id': user_id, 'name': rng.choice(names), 'role': role,
+                    'email': f"{role}{user_id[len(ID_PREFIX) + 1:]}@{EMAIL_DOMAIN}",
+                    'password_hash': self.password_hash,
+                    'language': rng.choice(['en'] * 3 + LANGUAGES),
+                    'learning_pace': rng.choice(['slow', 'medium', 'fast']),
+                    'preferred_style': rng.choice(['visual', 'auditory', 'reading']),
+                    'created_at': moment(rng, self.start, self.args.days)
+                }
+
+    def classroom_rows(self):
+        rng = stream(self.args.seed, 'classrooms')
+        teachers, cum = skewed(rng, self.teachers, self.args.teacher_skew)
+        for classroom_id in self.classrooms:
+            subject = rng.choice(SUBJECTS)
+            teacher_id = pick(rng, teachers, cum)
+            self.subject_of[classroom_id] = subject
+            self.teacher_of[classroom_id] = teacher_id
+            yield {
+                'id': classroom_id, 'name': f"{subject} {rng.randint(6, 12)}-{rng.choice('ABCDEFGH')}",
+                'subject': subject, 'description': f"Synthetic {subject} class",
+                'teacher_id': teacher_id, 'allowed_languages': ','.join(rng.sample(LANGUAGES, 3)),
+                'created_at': moment(rng, self.start, self.args.days)
+            }
+
+    def teacher_links(self):
+        for classroom_id in self.classrooms:
+            yield {'classroom_id': classroom_id, 'teacher_id': self.teacher_of[classroom_id]}
+
+    def enrollments(self):
+        rng = stream(self.args.seed, 'enrollments')
+        classrooms, cum = skewed(rng, self.classrooms, self.args.classroom_skew)
+        for student_id in self.students:
+            joined = {pick(rng, classrooms, cum) for _ in range(count_around(rng, self.args.enrollments, low=1, high=12))}
+            for classroom_id in sorted(joined):
+                self.roster.setdefault(classroom_id, []).append(student_id)
+                yield {'classroom_id': classroom_id, 'student_id': student_id}
+
+    def lessons(self, translations):
+        rng = stream(self.args.seed, 'lessons')
+        pools = {lang: sentence_pool(stream(self.args.seed, f"pool:{lang}"), lang) for lang in ['en'] + LANGUAGES}
+        classrooms, cum = skewed(rng, self.classrooms, self.args.classroom_skew)
+        for i in range(1, self.args.lessons + 1):
+            content_id = f"{ID_PREFIX}l{i:07d}"
+            classroom_id = pick(rng, classrooms, cum)
+            subject = self.subject_of[classroom_id]
+            topic = f"{subject} topic {rng.randrange(5000)}"
+            text = body(rng, pools['en'], self.args.lesson_sentences)
+            languages = rng.sample(LANGUAGES, min(len(LANGUAGES), count_around(rng, self.args.translations)))
+            yield {
+                'content_id': content_id, 'subject': subject, 'topic': topic,
+                'level': rng.choice(LEVELS), 'language': 'en', 'text': text,
+                'simplified_text': text[:len(text) // 2], 'classroom_id': classroom_id,
+                'uploaded_by': self.teacher_of[classroom_id], 'approved': True,
+                'created_at': moment(rng, self.start, self.args.days),
+                'content_hash': Content.compute_hash(subject, topic, 'en', text, classroom_id),
+                'ocr_status': Content.STATUS_DONE, 'translation_status': Content.STATUS_DONE,
+                'simplification_status': Content.STATUS_DONE, 'audio_status': Content.STATUS_PENDING
+            }
+            for lang in languages:
+                translated = body(rng, pools[lang], self.args.lesson_sentences)
+                translations.append({
+                    'content_id': content_id, 'language': lang, 'translated_text': translated,
+                    'simplified_text': translated[:len(translated) // 2]
+                })
+
+    def quiz_rows(self):
+        rng = stream(self.args.seed, 'quizzes')
+        classrooms, cum = skewed(rng, self.classrooms, self.args.classroom_skew)
+        for i in range(1, self.args.quizzes + 1):
+            quiz_id = f"{ID_PREFIX}q{i:06d}"
+            classroom_id = pick(rng, classrooms, cum)
+            self.quizzes.append((quiz_id, classroom_id))
+            yield {
+                'id': quiz_id, 'classroom_id': classroom_id,
+                'topic': f"{self.subject_of[classroom_id]} quiz {i}",
+                'created_by': self.teacher_of[classroom_id], 'created_at': moment(rng, self.start, self.args.days)
+            }
+
+    def questions(self):
+        rng = stream(self.args.seed, 'questions')
+        for quiz_id, _ in self.quizzes:
+            for n in range(self.args.questions_per_quiz):
+                options = [f"Option {chr(65 + k)}" for k in range(4)]
+                yield {
+                    'quiz_id': quiz_id, 'question_text': f"Question {n + 1}?", 'question_type': 'mcq',
+                    'options': json.dumps(options), 'correct_answer': rng.choice(options)
+                }
+
+    def attempts(self):
+        rng = stream(self.args.seed, 'attempts')
+        quizzes, cum = skewed(rng, [q for q in self.quizzes if self.roster.get(q[1])], self.args.quiz_skew)
+        if not quizzes:
+            return
+        total = self.args.questions_per_quiz
+        for _ in range(self.args.attempts):
+            quiz_id, classroom_id = pick(rng, quizzes, cum)
+            yield {
+                'quiz_id': quiz_id, 'student_id': rng.choice(self.roster[classroom_id]),
+                'score': int(round(rng.betavariate(4, 2) * total)), 'total_questions': total,
+                'completed_at': moment(rng, self.start, self.args.days)
+            }
+
+    def conversations(self, rng):
+        """(a, b) pairs: mostly student-teacher within a classroom, the rest classmates."""
+        pairs = set()
+        classrooms = [c for c in self.classrooms if self.roster.get(c)]
+        attempts = 0
+        while len(pairs) < self.args.conversations and attempts < self.args.conversations * 5 and classrooms:
+            attempts += 1
+            classroom_id = rng.choice(classrooms)
+            student_id = rng.choice(self.roster[classroom_id])
+            if rng.random() < self.args.teacher_share or len(self.roster[classroom_id]) < 2:
+                other = self.teacher_of[classroom_id]
+            else:
+                other = rng.choice(self.roster[classroom_id])
+            if other != student_id:
+                pairs.add(tuple(sorted((student_id, other))))
+        return sorted(pairs)
+
+    def messages(self):
+        rng = stream(self.args.seed, 'dms')
+        pairs, cum = skewed(rng, self.conversations(rng), self.args.conversation_skew)
+        if not pairs:
+            return
+        end = self.start + timedelta(days=self.args.days)
+        pool = sentence_pool(stream(self.args.seed, 'pool:dm'), 'en')
+        for i in range(1, self.args.dms + 1):
+            a, b = pick(rng, pairs, cum)
+            sender, receiver = (a, b) if rng.random() < 0.5 else (b, a)
+            timestamp = moment(rng, self.start, self.args.days)
+            read = timestamp < end - timedelta(days=7) or rng.random() < 0.5
+            yield {
+                'id': f"{ID_PREFIX}m{i:08d}", 'sender_id': sender, 'receiver_id': receiver,
+                'content': rng.choice(pool), 'read': read, 'timestamp': timestamp,
+                'read_at': timestamp + timedelta(minutes=rng.randrange(1, 720)) if read else None
+            }
+
+    def generate(self):
+        batch = self.args.batch_size
+        started = time.time()
+        insert_batches(User, self.users(), batch, 'users')
+        insert_batches(Classroom, self.classroom_rows(), batch, 'classrooms')
+        insert_batches(classroom_teachers, self.teacher_links(), batch, 'classroom_teachers')
+        insert_batches(classroom_students, self.enrollments(), batch, 'classroom_students')
+
+        # Translations are buffered per lesson batch and written right after it, keeping memory flat
+        translations = []
+        lessons = self.lessons(translations)
+        lesson_total = translation_total = 0
+        while True:
+            written = insert_batches(Content, itertools.islice(lessons, batch * 10), batch, 'content')
+            translation_total += insert_batches(Translation, translations, batch, 'translations')
+            translations.clear()
+            lesson_total += written
+            if written < batch * 10:
+                break
+
+        insert_batches(Quiz, self.quiz_rows(), batch, 'quizzes')
+        insert_batches(Question, self.questions(), batch, 'questions')
+        insert_batches(StudentQuizAttempt, self.attempts(), batch, 'quiz_attempts')
+        insert_batches(DirectMessage, self.messages(), batch, 'direct_messages')
+        print(f"Done! {lesson_total} lessons, {translation_total} translations in {time.time() - started:.1f}s total")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiplier applied to every count below')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate all tables first')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Rows per INSERT and commit')
+    parser.add_argument('--start', default='2026-01-01', help='First day of generated timestamps')
+    parser.add_argument('--days', type=int, default=365, help='Days covered by generated timestamps')
+    counts = parser.add_argument_group('counts')
+    counts.add_argument('--students', type=int, default=100000)
+    counts.add_argument('--teachers', type=int, default=2500)
+    counts.add_argument('--classrooms', type=int, default=5000)
+    counts.add_argument('--lessons', type=int, default=200000)
+    counts.add_argument('--quizzes', type=int, default=50000)
+    counts.add_argument('--attempts', type=int, default=1000000)
+    counts.add_argument('--conversations', type=int, default=150000)
+    counts.add_argument('--dms', type=int, default=2000000)
+    shape = parser.add_argument_group('distributions')
+    shape.add_argument('--enrollments', type=float, default=2.0, help='Mean classrooms per student')
+    shape.add_argument('--translations', type=float, default=2.0, help='Mean translations per lesson')
+    shape.add_argument('--lesson-sentences', type=int, default=25, help='Mean sentences per lesson')
+    shape.add_argument('--questions-per-quiz', type=int, default=5)
+    shape.add_argument('--teacher-share', type=float, default=0.6, help='Share of conversations with a teacher')
+    shape.add_argument('--classroom-skew', type=float, default=1.1, help='Zipf exponent of classroom popularity')
+    shape.add_argument('--teacher-skew', type=float, default=0.8, help='Zipf exponent of classrooms per teacher')
+    shape.add_argument('--quiz-skew', type=float, default=1.0, help='Zipf exponent of attempts per quiz')
+    shape.add_argument('--conversation-skew', type=float, default=1.2, help='Zipf exponent of messages per conversation')
+    args = parser.parse_args(argv)
+
+    for name in ('students', 'teachers', 'classrooms', 'lessons', 'quizzes', 'attempts', 'conversations', 'dms'):
+        setattr(args, name, scaled(getattr(args, name), args.scale))
+
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+        ensure_schema()
+        if db.session.query(User.id).filter(User.id.like(f"{ID_PREFIX}%")).first():
+            print("Synthetic data already present; run with --reset to regenerate it.")
+            return 1
+        print(f"Generating synthetic data (seed {args.seed}, scale {args.scale}): "
+              f"{args.students} students, {args.classrooms} classrooms, {args.lessons} lessons, {args.dms} DMs")
+        SyntheticData(args).generate()
+        print("Run rebuild_analytics.py, rebuild_search_index.py and rebuild_dm_inbox.py to build the derived tables.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Bulk-import a curriculum dataset (JSON array or JSONL of lessons).
+
+Each record needs "topic" (or "title") and "content" (or "text"); "subject",
+"language", "level" and "classroomId" fall back to the options below.
+Lessons already in the database (same content hash) are skipped, and an
+interrupted import resumes from its checkpoint file when run again.
+
+    python import_curriculum.py datasets/educational/sample_ncert.json --subject Science
+    python import_curriculum.py cbse_class10.jsonl --classroom <id> --translate hi,ta --simplify
+"""
+import argparse
+import os
+import sys
+
+from app import create_app, task_queue
+from app.services.curriculum_import_service import curriculum_import_service
+from app.utils.schema import ensure_schema
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('path')
+    parser.add_argument('--subject', help='Subject for records without one')
+    parser.add_argument('--language', default='en')
+    parser.add_argument('--level', default='medium')
+    parser.add_argument('--classroom', help='Classroom id to attach lessons to')
+    parser.add_argument('--batch-size', type=int, help='Rows per INSERT (default IMPORT_BATCH_SIZE)')
+    parser.add_argument('--transaction-size', type=int, help='Rows per commit and checkpoint (default IMPORT_TRANSACTION_SIZE)')
+    parser.add_argument('--translate', default='', help='Comma-separated languages to translate into after import')
+    parser.add_argument('--simplify', action='store_true', help='Precompute simplification levels after import')
+    parser.add_argument('--no-resume', action='store_true', help='Ignore an existing checkpoint and start from the top')
+    args = parser.parse_args()
+
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+    with app.app_context():
+        ensure_schema()
+        stats = curriculum_import_service.import_file(
+            args.path, subject=args.subject, language=args.language, level=args.level,
+            classroom_id=args.classroom, batch_size=args.batch_size, transaction_size=args.transaction_size,
+            target_languages=[lang for lang in args.translate.split(',') if lang], enrich=args.simplify,
+            resume=not args.no_resume
+        )
+        print(f"Imported {stats['inserted']} lessons ({stats['duplicates']} duplicates, {stats['invalid']} invalid) "
+              f"from {stats['records']} records in {stats['seconds']}s ({stats['lessonsPerSecond']} lessons/s)")
+        if stats['jobs']:
+            print(f"Waiting for {len(stats['jobs'])} processing batches...")
+            task_queue.join()
+            failed = [job_id for job_id in stats['jobs'] if task_queue.get(job_id).status == 'failed']
+            print(f"Done! {len(stats['jobs']) - len(failed)} batches processed, {len(failed)} failed.")
+            return 1 if failed else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
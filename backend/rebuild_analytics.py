@@ -0,0 +1,20 @@
+"""
+Rebuild the analytics rollup tables from quiz_attempts and progress.
+
+Rollups are maintained incrementally on every write; run this after bulk
+imports that bypass the API, or if the rollups are ever suspected to drift.
+
+    python rebuild_analytics.py
+"""
+from app import create_app, db
+from app.services.analytics_service import analytics_service
+from app.utils.schema import ensure_schema
+
+if __name__ == "__main__":
+    app = create_app('development')
+    with app.app_context():
+        ensure_schema()
+        print("Rebuilding analytics rollups...")
+        analytics_service.rebuild()
+        db.session.commit()
+        print("Done!")
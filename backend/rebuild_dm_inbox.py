@@ -0,0 +1,21 @@
+"""
+Rebuild the DM inbox summaries (dm_conversation_summaries) from direct_messages.
+
+Summaries are maintained on every send and read, and run.py builds them once
+when the table is empty; run this after bulk-loading messages that bypass the
+API (e.g. generate_synthetic_data.py), or if unread counts ever look wrong.
+
+    python rebuild_dm_inbox.py
+"""
+from app import create_app, db
+from app.services.inbox_service import inbox_service
+from app.utils.schema import ensure_schema
+
+if __name__ == "__main__":
+    app = create_app('development')
+    with app.app_context():
+        ensure_schema()
+        print("Rebuilding DM inbox summaries...")
+        inbox_service.rebuild()
+        db.session.commit()
+        print("Done!")
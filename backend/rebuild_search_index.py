@@ -0,0 +1,19 @@
+"""
+Index lessons that are not in the full-text search index yet.
+
+New uploads are indexed as they are saved; run this once after upgrading an
+existing database, or after bulk imports that bypass the API.
+
+    python rebuild_search_index.py
+"""
+from app import create_app
+from app.services.search_service import search_service
+from app.utils.schema import ensure_schema
+
+if __name__ == "__main__":
+    app = create_app('development')
+    with app.app_context():
+        ensure_schema()
+        print("Indexing lessons for search...")
+        total = search_service.backfill()
+        print(f"Done! {total} lessons indexed.")
@@ -0,0 +1,18 @@
+"""
+Rebuild the semantic (cross-lingual) lesson search index from scratch.
+
+Uploads are added incrementally in the background and missing lessons are
+picked up at startup; run this to drop stale vectors or after changing
+SEMANTIC_MODEL, since vectors from different models cannot be mixed.
+
+    python rebuild_semantic_index.py
+"""
+from app import create_app
+from app.services.semantic_search_service import semantic_search_service
+
+if __name__ == "__main__":
+    app = create_app('development')
+    with app.app_context():
+        print("Re-embedding all lessons...")
+        total = semantic_search_service.rebuild()
+        print(f"Done! {total} vectors indexed.")
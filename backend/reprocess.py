@@ -0,0 +1,58 @@
+"""
+Re-run failed or pending processing stages over the lesson library.
+
+Targets are picked from the per-lesson status flags (ocr_status,
+translation_status, simplification_status, audio_status), so only lessons
+that need work are loaded. Lessons saved before the flags existed are
+classified on the first pass. Work runs in parallel chunks on the task queue,
+every lesson is committed as soon as it is done and progress is checkpointed,
+so an interrupted run picks up where it stopped when started again.
+
+    python reprocess.py --dry-run
+    python reprocess.py --stages ocr,translate,simplify
+    python reprocess.py --stages tts --workers 4 --limit 1000
+"""
+import argparse
+import os
+import sys
+
+from app import create_app, task_queue
+from app.services.reprocess_service import reprocess_service, STAGES
+from app.utils.schema import ensure_schema
+
+def report(stats, prefix=''):
+    stages = ', '.join(f"{key}={count}" for key, count in sorted(stats['stages'].items())) or 'nothing to do'
+    print(f"{prefix}{stats['lessons']} lessons, {stats['errors']} errors | {stages}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--stages', default=','.join(STAGES), help=f"Comma-separated subset of {','.join(STAGES)}")
+    parser.add_argument('--workers', type=int, help='Parallel chunks (default TASK_QUEUE_WORKERS)')
+    parser.add_argument('--chunk-size', type=int, help='Lessons per chunk (default REPROCESS_CHUNK_SIZE)')
+    parser.add_argument('--limit', type=int, help='Stop after this many lessons')
+    parser.add_argument('--dry-run', action='store_true', help='Only report what would be reprocessed')
+    parser.add_argument('--no-resume', action='store_true', help='Ignore the checkpoint and start from the top')
+    args = parser.parse_args(argv)
+
+    stages = [stage for stage in args.stages.split(',') if stage]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+    if args.workers:
+        task_queue.workers = args.workers
+    with app.app_context():
+        ensure_schema()
+        print(f"{'Planning' if args.dry_run else 'Reprocessing'} stages: {', '.join(stages)}")
+        stats = reprocess_service.run(
+            stages, chunk_size=args.chunk_size, workers=args.workers, limit=args.limit,
+            dry_run=args.dry_run, resume=not args.no_resume,
+            on_wave=lambda progress: report(progress, prefix='  ')
+        )
+        report(stats, prefix='Done! ' if not args.dry_run else 'Would process: ')
+        print(f"{stats['seconds']}s ({stats['lessonsPerSecond']} lessons/s)")
+        return 1 if stats['errors'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,10 @@
 import os
 import logging
 from app import create_app, db
+from app.utils.schema import ensure_schema
+from app.models.dm import DirectMessage, backfill_conversation_keys
+from app.services.inbox_service import inbox_service
+from app.services.semantic_search_service import semantic_search_service
 
 # Configure basic logging for the runner
 logging.basicConfig(
@@ -20,8 +24,19 @@ if not os.path.exists(app.config['UPLOAD_FOLDER']):
 with app.app_context():
     try:
         logger.info("Initializing database tables...")
-        db.create_all()
+        # Creates missing tables, then adds columns/indexes introduced since the database was created
+        ensure_schema()
+        backfilled = backfill_conversation_keys()
+        if backfilled:
+            logger.info(f"Backfilled conversation keys for {backfilled} direct messages")
+        # Inbox summaries are maintained on write; build them once for messages that predate them
+        if inbox_service.is_empty() and db.session.query(DirectMessage.id).first():
+            inbox_service.rebuild()
+            db.session.commit()
+            logger.info("Built DM inbox summaries")
         logger.info("Database initialized successfully.")
+        # Only now: the warm load queries content, which ensure_schema may just have created
+        semantic_search_service.start_warm_load(app)
     except Exception as e:
         logger.error(f"Critical error during database initialization: {e}")
 
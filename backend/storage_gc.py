@@ -0,0 +1,59 @@
+"""
+Account for and reclaim upload storage.
+
+Marks every file the database still references, sweeps UPLOAD_FOLDER once
+and reports usage per category (uploads, tts, transcodes, previews,
+chunked, imports, ocr-temp). With --reclaim, unreferenced files older than
+the grace period are deleted and expired chunked upload sessions dropped.
+
+    python storage_gc.py
+    python storage_gc.py --reclaim
+    python storage_gc.py --reclaim --grace-hours 72 --json
+"""
+import argparse
+import json
+import os
+import sys
+
+from app import create_app
+from app.services.storage_service import storage_service
+from app.utils.schema import ensure_schema
+
+def megabytes(count):
+    return f"{count / (1024 * 1024):.1f} MB"
+
+def print_report(report):
+    print(f"{'category':<12} {'files':>9} {'size':>12} {'orphans':>9} {'orphaned':>12} {'reclaimed':>12}")
+    rows = sorted(report['categories'].items()) + [('total', report['totals'])]
+    for name, usage in rows:
+        print(f"{name:<12} {usage['files']:>9} {megabytes(usage['bytes']):>12} {usage['orphans']:>9} "
+              f"{megabytes(usage['orphanBytes']):>12} {megabytes(usage['reclaimedBytes']):>12}")
+    print(f"{report['references']} references marked, {report['inGrace']} unreferenced files still in grace, "
+          f"{report['rescued']} rescued by new references, {report['errors']} errors")
+    if report['sample']:
+        print("Orphans (sample):")
+        for path in report['sample'][:10]:
+            print(f"  {path}")
+    print(f"{report['seconds']}s")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--reclaim', action='store_true', help='Delete orphans (default: report only)')
+    parser.add_argument('--grace-hours', type=float, help='Only reclaim files older than this (default STORAGE_GC_GRACE_SECONDS)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args(argv)
+
+    app = create_app(os.getenv('FLASK_ENV', 'development'))
+    if args.grace_hours is not None:
+        app.config['STORAGE_GC_GRACE_SECONDS'] = int(args.grace_hours * 3600)
+    with app.app_context():
+        ensure_schema()
+        report = storage_service.run(dry_run=not args.reclaim)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 1 if report['errors'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
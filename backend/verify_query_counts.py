@@ -0,0 +1,122 @@
+"""
+Query-count regression check for list endpoints.
+
+Builds an in-memory SQLite database with a realistically sized classroom and
+counts the SQL statements issued while listing it. The count must not grow
+with the number of rows; the script exits non-zero if it does.
+
+    python verify_query_counts.py
+"""
+import sys
+import uuid
+from contextlib import contextmanager
+from flask import Flask
+from sqlalchemy import event
+from app import db
+
+LESSONS = 200
+LANGUAGES = ['hi', 'ta', 'te']
+PEERS = 30
+MESSAGES_PER_PEER = 20
+
+def build_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+@contextmanager
+def count_queries():
+    statements = []
+    def before_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', before_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', before_execute)
+
+def seed():
+    from app.models.user import User
+    from app.models.classroom import Classroom
+    from app.models.content import Content, Translation, SimplificationVariant
+
+    teacher = User(id='teacher-qc', name='Teacher', email='teacher-qc@example.com', role='teacher', password_hash='x')
+    student = User(id='student-qc', name='Student', email='student-qc@example.com', role='student', password_hash='x')
+    classroom = Classroom(id='class-qc', name='Class', subject='Science', allowed_languages='hi,ta', teacher_id=teacher.id)
+    classroom.students.append(student)
+    db.session.add_all([teacher, student, classroom])
+
+    for i in range(LESSONS):
+        content_id = str(uuid.uuid4())
+        db.session.add(Content(
+            content_id=content_id, subject='Science', topic=f'Lesson {i}', level='medium', language='en',
+            text=f'Lesson {i} body.', classroom_id=classroom.id, uploaded_by=teacher.id
+        ))
+        for lang in LANGUAGES:
+            db.session.add(Translation(content_id=content_id, language=lang, translated_text=f'{lang} {i}'))
+            db.session.add(SimplificationVariant(content_id=content_id, language=lang, level='easy', text=f'{lang} easy {i}'))
+    db.session.commit()
+    return student
+
+def seed_messages(student_id):
+    from app.models.user import User
+    from app.models.dm import DirectMessage
+    from app.services.inbox_service import inbox_service
+
+    for p in range(PEERS):
+        peer = User(id=f'peer-qc-{p}', name=f'Peer {p}', email=f'peer-qc-{p}@example.com', role='student', password_hash='x')
+        db.session.add(peer)
+        for i in range(MESSAGES_PER_PEER):
+            sender, receiver = (peer.id, student_id) if i % 2 else (student_id, peer.id)
+            message = DirectMessage(sender_id=sender, receiver_id=receiver, content=f'Message {i}')
+            db.session.add(message)
+            db.session.flush()
+            inbox_service.record_messages([message])
+    db.session.commit()
+
+def check(name, statements, budget):
+    status = "OK" if len(statements) <= budget else "FAIL"
+    print(f"[{status}] {name}: {len(statements)} queries (budget {budget})")
+    return len(statements) <= budget
+
+def main():
+    from app.services.content_feed_service import ContentFeedService
+
+    app = build_app()
+    ok = True
+    with app.app_context():
+        from app.models import user, classroom, content, quiz, progress, assignment, doubt, dm  # noqa: F401
+        db.create_all()
+        student_id = seed().id
+        db.session.expunge_all()
+        feed = ContentFeedService()
+
+        with count_queries() as statements:
+            contents = feed.contents_for_classrooms(feed.student_classroom_ids(student_id))
+            payload = feed.serialize(contents)
+        ok &= check(f"student content feed ({len(payload)} lessons)", statements, 5)
+        ok &= all(set(item['translations']) == {'hi', 'ta'} for item in payload)
+
+        from app.models.classroom import Classroom
+        with count_queries() as statements:
+            classrooms = Classroom.to_dict_many(Classroom.query.all())
+        ok &= check(f"classroom listing ({len(classrooms)} classrooms)", statements, 2)
+        ok &= classrooms[0]['studentCount'] == 1
+
+        from app.services.inbox_service import inbox_service
+        seed_messages(student_id)
+        db.session.expunge_all()
+        with app.test_request_context('/?limit=50'):
+            with count_queries() as statements:
+                summaries, _ = inbox_service.inbox(student_id)
+                inbox = [s.to_dict() for s in summaries]
+        ok &= check(f"dm inbox ({len(inbox)} conversations, {PEERS * MESSAGES_PER_PEER} messages)", statements, 1)
+        ok &= all(item['unreadCount'] == MESSAGES_PER_PEER // 2 for item in inbox)
+
+    print("\nQuery counts verified." if ok else "\nQuery-count regression detected!")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Query-plan regression check for the hot read paths.
+
+Creates the schema (in-memory SQLite by default, or the database in
+PLAN_DATABASE_URL, e.g. a scratch Postgres), runs EXPLAIN on each hot query
+and fails if any of them reads a table with a full scan instead of an index.
+On Postgres sequential scans are disabled for the session, so a Seq Scan in
+the plan means no usable index exists at all.
+
+    python verify_query_plans.py
+    PLAN_DATABASE_URL=postgresql://localhost/equilearn_plans python verify_query_plans.py
+"""
+import os
+import sys
+from datetime import datetime
+from flask import Flask
+from app import db
+
+def build_app():
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('PLAN_DATABASE_URL', 'sqlite:///:memory:')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+def hot_queries():
+    from app.models.assignment import Assignment, Submission
+    from app.models.classroom import Classroom, classroom_students
+    from app.models.content import Content, Translation, SimplificationVariant
+    from app.models.dm import DirectMessage, ConversationSummary
+    from app.models.doubt import DoubtThread
+    from app.models.progress import Progress
+    from app.models.quiz import Quiz, Question, StudentQuizAttempt
+
+    ids = ['a', 'b', 'c']
+    now = datetime(2024, 1, 1)
+    page = lambda query, sort, key: query.order_by(sort.desc(), key.desc()).limit(101)
+    return {
+        'content page by classroom': page(Content.query.filter_by(classroom_id='c1'), Content.created_at, Content.content_id),
+        'content page after cursor': page(Content.query.filter(
+            Content.classroom_id == 'c1',
+            db.or_(Content.created_at < now, db.and_(Content.created_at == now, Content.content_id < 'x'))
+        ), Content.created_at, Content.content_id),
+        'translations for feed': Translation.query.filter(Translation.content_id.in_(ids)),
+        'translation by language': Translation.query.filter_by(content_id='a', language='hi'),
+        'variants for feed': SimplificationVariant.query.filter(SimplificationVariant.content_id.in_(ids)),
+        'student classroom ids': db.session.query(classroom_students.c.classroom_id).filter(classroom_students.c.student_id == 's1'),
+        'teacher classrooms': page(Classroom.query.filter_by(teacher_id='t1'), Classroom.created_at, Classroom.id),
+        'dm conversation': page(DirectMessage.query.filter_by(conversation_key='u1|u2'), DirectMessage.timestamp, DirectMessage.id),
+        'dm sync after cursor': DirectMessage.query.filter(
+            DirectMessage.conversation_key == 'u1|u2',
+            db.or_(DirectMessage.timestamp > now, db.and_(DirectMessage.timestamp == now, DirectMessage.id > 'x'))
+        ).order_by(DirectMessage.timestamp, DirectMessage.id).limit(101),
+        'dm inbox': page(ConversationSummary.query.filter_by(user_id='u1'), ConversationSummary.last_timestamp, ConversationSummary.peer_id),
+        'dm read receipts': db.session.query(DirectMessage.id, DirectMessage.read_at).filter(
+            DirectMessage.conversation_key == 'u1|u2', DirectMessage.read_at > now
+        ),
+        'quizzes by classroom': page(Quiz.query.filter_by(classroom_id='c1'), Quiz.created_at, Quiz.id),
+        'answer keys': db.session.query(Question.quiz_id, Question.id, Question.correct_answer).filter(Question.quiz_id.in_(ids)),
+        'attempts by quiz and student': StudentQuizAttempt.query.filter_by(quiz_id='q1', student_id='s1'),
+        'attempts by student': StudentQuizAttempt.query.filter_by(student_id='s1'),
+        'assignments by classroom': page(Assignment.query.filter_by(classroom_id='c1'), Assignment.created_at, Assignment.id),
+        'submissions by assignment': Submission.query.filter_by(assignment_id='a1'),
+        'doubt threads by classroom': DoubtThread.query.filter_by(classroom_id='c1'),
+        'progress by student': Progress.query.filter_by(student_id='s1'),
+        'progress upsert lookup': Progress.query.filter_by(student_id='s1', content_id='a'),
+    }
+
+def explain(query):
+    """Plan lines for a SQLAlchemy query on the active database."""
+    engine = db.engine
+    # Expand IN (...) lists into plain bound parameters; EXPLAIN cannot take the post-compile form
+    compiled = query.statement.compile(dialect=engine.dialect, compile_kwargs={'render_postcompile': True})
+    params = compiled.params
+    if compiled.positional:
+        params = tuple(
+            p.isoformat(sep=' ') if isinstance(p, datetime) else p
+            for p in (compiled.params[name] for name in compiled.positiontup)
+        )
+    prefix = 'EXPLAIN QUERY PLAN ' if engine.dialect.name == 'sqlite' else 'EXPLAIN '
+    with engine.connect() as conn:
+        if engine.dialect.name == 'postgresql':
+            conn.exec_driver_sql('SET enable_seqscan = off')
+        rows = conn.exec_driver_sql(prefix + str(compiled), params).fetchall()
+    return [str(row[-1]) for row in rows]
+
+def full_scans(plan):
+    # SQLite: "SCAN content" (no index); Postgres: "Seq Scan on content"
+    return [line for line in plan if (line.startswith('SCAN ') and ' USING ' not in line) or 'Seq Scan' in line]
+
+def main():
+    app = build_app()
+    ok = True
+    with app.app_context():
+        from app.models import user, classroom, content, quiz, progress, assignment, doubt, dm  # noqa: F401
+        from app.utils.schema import ensure_schema
+        ensure_schema()
+
+        for name, query in hot_queries().items():
+            plan = explain(query)
+            scans = full_scans(plan)
+            print(f"[{'FAIL' if scans else 'OK'}] {name}: {' | '.join(plan)}")
+            ok &= not scans
+
+    print("\nAll hot queries use indexes." if ok else "\nFull table scan detected!")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+"""
+End-to-end check of the resumable chunked upload protocol (/api/uploads).
+
+Drives UploadService the way the upload routes do, with real PUT request
+contexts, against an in-memory SQLite database and a temporary
+UPLOAD_FOLDER: create, PUT ranges (including an out-of-order one that must
+be refused with the resume offset), finalize, ownership checks and handing
+the result to an endpoint through incoming_file().
+
+    python verify_uploads.py
+"""
+import hashlib
+import os
+import sys
+import tempfile
+from flask import Flask
+from app import db
+
+def build_app(upload_dir):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['UPLOAD_FOLDER'] = upload_dir
+    db.init_app(app)
+    return app
+
+def check(name, condition, detail=''):
+    print(f"[{'OK' if condition else 'FAIL'}] {name}{f' ({detail})' if detail else ''}")
+    return bool(condition)
+
+def status_of(action):
+    """HTTP status the routes would answer: UploadError's, or 200."""
+    from app.services.upload_service import UploadError
+    try:
+        action()
+        return 200
+    except UploadError as e:
+        return e.status
+
+def main():
+    from app.models import user, upload  # noqa: F401
+    from app.services.upload_service import upload_service, incoming_file
+
+    payload = os.urandom(1000)
+    size = len(payload)
+    ok = True
+    with tempfile.TemporaryDirectory() as upload_dir:
+        app = build_app(upload_dir)
+        with app.app_context():
+            db.create_all()
+
+            def put(start, data, user_id='teacher-1'):
+                headers = {'Content-Range': f'bytes {start}-{start + len(data) - 1}/{size}'}
+                with app.test_request_context(f'/api/uploads/{upload_id}', method='PUT', data=data, headers=headers):
+                    return upload_service.write_request(upload_service.get(upload_id, user_id))
+
+            session = upload_service.create('teacher-1', 'lecture.mp4', size, hashlib.sha256(payload).hexdigest())
+            upload_id = session.id
+            ok &= check('create', session.received == 0 and os.path.exists(upload_service.part_path(session)))
+
+            ok &= check('first range', put(0, payload[:400]).received == 400)
+            ok &= check('gap refused (409)', status_of(lambda: put(600, payload[600:])) == 409)
+            ok &= check('resume offset kept', upload_service.get(upload_id, 'teacher-1').received == 400)
+
+            ok &= check('other user refused (403)', status_of(lambda: put(400, payload[400:800], 'someone-else')) == 403)
+            ok &= check('anonymous refused (403)', status_of(lambda: upload_service.get(upload_id, None)) == 403)
+
+            with app.test_request_context(f'/api/uploads/{upload_id}', method='PUT', data=payload[400:800]):
+                missing = status_of(lambda: upload_service.write_request(upload_service.get(upload_id, 'teacher-1')))
+            ok &= check('missing Content-Range refused (400)', missing == 400)
+
+            ok &= check('finalize before complete refused (409)',
+                        status_of(lambda: upload_service.finalize(upload_service.get(upload_id, 'teacher-1'))) == 409)
+
+            put(400, payload[400:800])
+            ok &= check('remaining ranges', put(800, payload[800:]).received == size)
+
+            done = upload_service.finalize(upload_service.get(upload_id, 'teacher-1'))
+            ok &= check('finalize', done.status == 'complete' and done.sha256 == hashlib.sha256(payload).hexdigest())
+
+            with app.test_request_context('/', method='POST', data={'uploadId': upload_id}):
+                file = incoming_file('teacher-1')
+                target = os.path.join(upload_dir, file.filename)
+                file.save(target)
+            with open(target, 'rb') as f:
+                ok &= check('incoming_file hands over the assembled file', f.read() == payload)
+
+            with app.test_request_context('/', method='POST', data={'uploadId': upload_id}):
+                ok &= check('second use refused (409)', status_of(lambda: incoming_file('teacher-1')) == 409)
+
+    print("\nChunked uploads verified." if ok else "\nChunked upload regression detected!")
+    return 0 if ok else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
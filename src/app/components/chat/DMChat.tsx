@@ -5,6 +5,7 @@ import { Button } from '@/app/components/ui/button';
 import { Input } from '@/app/components/ui/input';
 import { Send, Paperclip, FileText, Image as ImageIcon, Video, MessageSquare } from 'lucide-react';
 import { User } from '@/app/types';
+import { appendFile } from '@/app/utils/uploads';
 
 interface Message {
     id: string;
@@ -12,7 +13,26 @@ interface Message {
     content: string;
     mediaUrl?: string;
     mediaType?: 'image' | 'video' | 'document' | 'other';
+    previews?: { thumb: string; display: string; width: number; height: number } | null;
     timestamp: string;
+    read?: boolean;
+    readAt?: string | null;
+}
+
+interface Receipt {
+    id: string;
+    readAt: string;
+}
+
+// Merge new messages in by id (a message can arrive both pushed and synced) and apply read receipts
+function mergeMessages(current: Message[], incoming: Message[], receipts: Receipt[] = []): Message[] {
+    const byId = new Map(current.map((m) => [m.id, m]));
+    incoming.forEach((m) => byId.set(m.id, m));
+    receipts.forEach((r) => {
+        const m = byId.get(r.id);
+        if (m) byId.set(r.id, { ...m, read: true, readAt: r.readAt });
+    });
+    return Array.from(byId.values()).sort((a, b) => a.timestamp.localeCompare(b.timestamp));
 }
 
 interface DMChatProps {
@@ -26,18 +46,41 @@ export function DMChat({ currentUser, recipient, onBack }: DMChatProps) {
     const [newMessage, setNewMessage] = useState('');
     const [selectedFile, setSelectedFile] = useState<File | null>(null);
     const scrollRef = useRef<HTMLDivElement>(null);
+    // Sync cursor from the server: only messages and receipts after it are fetched
+    const cursorRef = useRef<string | null>(null);
+
+    const markRead = async () => {
+        try {
+            const token = localStorage.getItem('token');
+            await fetch(`/api/dm/read/${recipient.id}`, {
+                method: 'POST',
+                headers: {
+                    'Authorization': `Bearer ${token}`,
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ sender_id: currentUser.id }),
+            });
+        } catch (error) {
+            console.error("Failed to mark messages read", error);
+        }
+    };
 
-    const fetchMessages = async () => {
+    const syncMessages = async () => {
         try {
             const token = localStorage.getItem('token');
-            const res = await fetch(`/api/dm/messages/${recipient.id}?sender_id=${currentUser.id}`, {
+            const since = cursorRef.current ? `&since=${encodeURIComponent(cursorRef.current)}` : '';
+            const res = await fetch(`/api/dm/sync/${recipient.id}?sender_id=${currentUser.id}${since}`, {
                 headers: {
                     'Authorization': `Bearer ${token}`
                 }
             });
             if (res.ok) {
                 const data = await res.json();
-                setMessages(data);
+                const initial = !cursorRef.current;
+                cursorRef.current = data.cursor;
+                setMessages((prev) => mergeMessages(initial ? [] : prev, data.messages, data.receipts));
+                if (data.messages.some((m: Message) => m.senderId === recipient.id)) markRead();
+                if (data.hasMore) syncMessages();
             }
         } catch (error) {
             console.error("Failed to fetch messages", error);
@@ -45,10 +88,30 @@ export function DMChat({ currentUser, recipient, onBack }: DMChatProps) {
     };
 
     useEffect(() => {
-        fetchMessages();
-        // Poll for new messages every 5 seconds
-        const interval = setInterval(fetchMessages, 5000);
-        return () => clearInterval(interval);
+        cursorRef.current = null;
+        setMessages([]);
+        syncMessages();
+
+        // New messages and read receipts are pushed; a (re)connect catches up from the cursor
+        const stream = new EventSource(`/api/dm/stream?user_id=${currentUser.id}`);
+        stream.addEventListener('open', () => syncMessages());
+        stream.addEventListener('message', (e) => {
+            const { message } = JSON.parse((e as MessageEvent).data);
+            if (message.senderId !== recipient.id && message.receiverId !== recipient.id) return;
+            setMessages((prev) => mergeMessages(prev, [message]));
+            if (message.senderId === recipient.id) markRead();
+        });
+        stream.addEventListener('read', (e) => {
+            const { ids, readAt } = JSON.parse((e as MessageEvent).data);
+            setMessages((prev) => mergeMessages(prev, [], ids.map((id: string) => ({ id, readAt }))));
+        });
+
+        // Safety net for lost pushes; incremental, so cheap regardless of history length
+        const interval = setInterval(syncMessages, 30000);
+        return () => {
+            stream.close();
+            clearInterval(interval);
+        };
     }, [recipient, currentUser.id]);
 
     useEffect(() => {
@@ -63,11 +126,12 @@ export function DMChat({ currentUser, recipient, onBack }: DMChatProps) {
         formData.append('sender_id', currentUser.id);
         formData.append('receiver_id', recipient.id);
         formData.append('content', newMessage);
-        if (selectedFile) {
-            formData.append('file', selectedFile);
-        }
 
         try {
+            if (selectedFile) {
+                // Large files go up in resumable chunks and are referenced by uploadId
+                await appendFile(formData, selectedFile);
+            }
             const token = localStorage.getItem('token');
             const res = await fetch('/api/dm/send', {
                 method: 'POST',
@@ -79,7 +143,7 @@ export function DMChat({ currentUser, recipient, onBack }: DMChatProps) {
 
             if (res.ok) {
                 const sentMsg = await res.json();
-                setMessages([...messages, sentMsg]);
+                setMessages((prev) => mergeMessages(prev, [sentMsg]));
                 setNewMessage('');
                 setSelectedFile(null);
             } else {
@@ -121,8 +185,23 @@ export function DMChat({ currentUser, recipient, onBack }: DMChatProps) {
                                 <div className={`max-w-[75%] p-4 rounded-2xl shadow-sm ${isMe ? 'bg-primary text-primary-foreground rounded-tr-none' : 'bg-white text-slate-900 border border-border/50 rounded-tl-none'}`}>
                                     {msg.mediaUrl && (
                                         <div className="mb-3 overflow-hidden rounded-xl bg-black/5">
-                                            {msg.mediaType === 'image' && <img src={msg.mediaUrl} alt="attachment" className="w-full object-contain max-h-64" />}
-                                            {msg.mediaType === 'video' && <video src={msg.mediaUrl} controls className="w-full max-h-64" />}
+                                            {msg.mediaType === 'image' && (
+                                                // WebP previews once rendered; the original opens on click
+                                                <a href={msg.mediaUrl} target="_blank" rel="noopener noreferrer">
+                                                    <img
+                                                        src={msg.previews?.thumb || msg.mediaUrl}
+                                                        srcSet={msg.previews ? `${msg.previews.thumb} 320w, ${msg.previews.display} 1280w` : undefined}
+                                                        sizes="(max-width: 640px) 75vw, 400px"
+                                                        loading="lazy"
+                                                        alt="attachment"
+                                                        className="w-full object-contain max-h-64"
+                                                    />
+                                                </a>
+                                            )}
+                                            {msg.mediaType === 'video' && <video src={msg.mediaUrl} poster={msg.previews?.display} preload={msg.previews ? 'none' : 'metadata'} controls className="w-full max-h-64" />}
+                                            {msg.mediaType === 'document' && msg.previews && (
+                                                <img src={msg.previews.thumb} loading="lazy" alt="first page" className="w-full object-cover max-h-40" />
+                                            )}
                                             {msg.mediaType === 'document' && (
                                                 <a href={msg.mediaUrl} target="_blank" rel="noopener noreferrer" className="flex items-center gap-3 p-3 bg-white/20 hover:bg-white/30 transition-colors rounded-xl text-inherit no-underline">
                                                     <div className="p-2 bg-white/20 rounded-lg">
@@ -1,7 +1,8 @@
 
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useCallback } from 'react';
 import { Card, CardContent } from '@/app/components/ui/card';
 import { Button } from '@/app/components/ui/button';
+import { Input } from '@/app/components/ui/input';
 import { User } from '@/app/types';
 import { storage } from '@/app/utils/storage';
 
@@ -12,33 +13,43 @@ interface DMListProps {
 
 export function DMList({ currentUser, onSelectUser }: DMListProps) {
     const [users, setUsers] = useState<User[]>([]);
+    const [query, setQuery] = useState('');
+    const [nextCursor, setNextCursor] = useState<string | null>(null);
 
-    useEffect(() => {
-        // Fetch users from backend
-        // In a real app, this would exclude the current user or handle it in the backend
-        const fetchUsers = async () => {
-            try {
-                const token = localStorage.getItem('token');
-                const res = await fetch('/api/dm/users', {
-                    headers: {
-                        'Authorization': `Bearer ${token}`
-                    }
-                });
-                if (res.ok) {
-                    const data = await res.json();
-                    setUsers(data.filter((u: User) => u.id !== currentUser.id));
+    // Contacts are scoped server-side (classmates, teachers, institution) and exclude the current user
+    const fetchUsers = useCallback(async (search: string, cursor: string | null) => {
+        const params = new URLSearchParams({ sender_id: currentUser.id, limit: '50' });
+        if (search) params.set('q', search);
+        if (cursor) params.set('cursor', cursor);
+        try {
+            const token = localStorage.getItem('token');
+            const res = await fetch(`/api/dm/users?${params}`, {
+                headers: {
+                    'Authorization': `Bearer ${token}`
                 }
-            } catch (error) {
-                console.error("Failed to fetch users", error);
-
-                // Fallback for demo if API fails (or offline)
-                const allUsers = storage.getUsers();
-                setUsers(allUsers.filter((u: User) => u.id !== currentUser.id));
+            });
+            if (res.ok) {
+                const data: User[] = await res.json();
+                setUsers(prev => (cursor ? [...prev, ...data] : data));
+                setNextCursor(res.headers.get('X-Next-Cursor'));
             }
-        };
-        fetchUsers();
+        } catch (error) {
+            console.error("Failed to fetch users", error);
+
+            // Fallback for demo if API fails (or offline)
+            const needle = search.toLowerCase();
+            const allUsers = storage.getUsers();
+            setUsers(allUsers.filter((u: User) => u.id !== currentUser.id && u.name.toLowerCase().includes(needle)));
+            setNextCursor(null);
+        }
     }, [currentUser.id]);
 
+    useEffect(() => {
+        // Debounced so typing a name issues one request, not one per keystroke
+        const timer = setTimeout(() => fetchUsers(query.trim(), null), 250);
+        return () => clearTimeout(timer);
+    }, [query, fetchUsers]);
+
     return (
         <div className="p-6 space-y-6 min-h-[500px] flex flex-col">
             <div className="flex items-center justify-between mb-2">
@@ -46,6 +57,13 @@ export function DMList({ currentUser, onSelectUser }: DMListProps) {
                 <div className="h-1 flex-1 mx-4 bg-muted/30 rounded-full"></div>
             </div>
 
+            <Input
+                placeholder="Search people..."
+                value={query}
+                onChange={(e) => setQuery(e.target.value)}
+                className="rounded-xl"
+            />
+
             <div className="flex-1 space-y-3 overflow-y-auto pr-2 custom-scrollbar">
                 {users.length === 0 ? (
                     <div className="flex flex-col items-center justify-center h-[300px] text-center space-y-4">
@@ -86,6 +104,11 @@ export function DMList({ currentUser, onSelectUser }: DMListProps) {
                         </Card>
                     ))
                 )}
+                {nextCursor && (
+                    <Button variant="ghost" className="w-full rounded-xl font-bold" onClick={() => fetchUsers(query.trim(), nextCursor)}>
+                        Load more
+                    </Button>
+                )}
             </div>
         </div>
     );
@@ -3,6 +3,7 @@
 // For this demo, we use mock implementations with realistic behavior
 
 import { Language, LANGUAGE_NAMES } from '@/app/types';
+import { appendFile } from '@/app/utils/uploads';
 
 // Mock language detection
 export const detectLanguage = (text: string): Language => {
@@ -178,9 +179,9 @@ export const generateQuiz = async (text: string): Promise<any> => {
 // Extract text from file using backend
 export const extractText = async (file: File): Promise<{ text: string; originalFileUrl?: string; fileType?: string }> => {
   const formData = new FormData();
-  formData.append('file', file);
 
   try {
+    await appendFile(formData, file);
     const res = await fetch('/api/ai/extract_text', {
       method: 'POST',
       headers: {
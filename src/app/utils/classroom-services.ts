@@ -17,16 +17,31 @@ const getAuthHeader = () => ({
     'Authorization': `Bearer ${localStorage.getItem('token')}`
 });
 
+// List endpoints are keyset-paginated: follow nextCursor until the last page
+const fetchAllPages = async (url: string, key: string): Promise<any[]> => {
+    const items: any[] = [];
+    let cursor: string | null = null;
+    do {
+        const pageUrl: string = cursor
+            ? `${url}${url.includes('?') ? '&' : '?'}cursor=${encodeURIComponent(cursor)}`
+            : url;
+        const res = await fetch(pageUrl, { headers: getAuthHeader() });
+        if (!res.ok) {
+            if (items.length) break;
+            return [];
+        }
+        const data = await res.json();
+        items.push(...(data[key] || []));
+        cursor = data.nextCursor || null;
+    } while (cursor);
+    return items;
+};
+
 export const classroomService = {
     // Generic list (filters based on role in backend)
     getClassrooms: async (): Promise<Classroom[]> => {
         try {
-            const res = await fetch('/api/classrooms/', { headers: getAuthHeader() });
-            if (res.ok) {
-                const data = await res.json();
-                return data.classrooms || [];
-            }
-            return [];
+            return await fetchAllPages('/api/classrooms/', 'classrooms');
         } catch (e) {
             console.error("Error fetching classrooms:", e);
             return [];
@@ -36,12 +51,7 @@ export const classroomService = {
     // Role specific list
     getAssignedClassrooms: async (): Promise<Classroom[]> => {
         try {
-            const res = await fetch('/api/teacher/get_assigned_classrooms', { headers: getAuthHeader() });
-            if (res.ok) {
-                const data = await res.json();
-                return data.classrooms || [];
-            }
-            return [];
+            return await fetchAllPages('/api/teacher/get_assigned_classrooms', 'classrooms');
         } catch (e) {
             console.error("Error fetching teacher classrooms:", e);
             return [];
@@ -50,12 +60,7 @@ export const classroomService = {
 
     getMyClassrooms: async (): Promise<Classroom[]> => {
         try {
-            const res = await fetch('/api/student/get_my_classrooms', { headers: getAuthHeader() });
-            if (res.ok) {
-                const data = await res.json();
-                return data.classrooms || [];
-            }
-            return [];
+            return await fetchAllPages('/api/student/get_my_classrooms', 'classrooms');
         } catch (e) {
             console.error("Error fetching student classrooms:", e);
             return [];
@@ -106,14 +111,7 @@ export const classroomService = {
 
     getClassroomContent: async (classroomId: string): Promise<any[]> => {
         try {
-            const res = await fetch(`/api/student/get_classroom_content?classroomId=${classroomId}`, {
-                headers: getAuthHeader()
-            });
-            if (res.ok) {
-                const data = await res.json();
-                return data.contents || [];
-            }
-            return [];
+            return await fetchAllPages(`/api/student/get_classroom_content?classroomId=${classroomId}`, 'contents');
         } catch (e) {
             return [];
         }
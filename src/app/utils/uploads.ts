@@ -0,0 +1,72 @@
+// Files above this go through the resumable /api/uploads protocol instead of one multipart body
+const CHUNKED_THRESHOLD = 8 * 1024 * 1024;
+const MAX_RETRIES = 5;
+
+interface UploadSession {
+  uploadId: string;
+  size: number;
+  received: number;
+  status: string;
+  chunkSize?: number;
+}
+
+const authHeaders = (): Record<string, string> => ({
+  'Authorization': `Bearer ${localStorage.getItem('token')}`
+});
+
+const sleep = (ms: number) => new Promise(resolve => setTimeout(resolve, ms));
+
+const uploadStatus = async (uploadId: string): Promise<UploadSession> => {
+  const res = await fetch(`/api/uploads/${uploadId}`, { headers: authHeaders() });
+  if (!res.ok) throw new Error(`Upload status failed (${res.status})`);
+  return res.json();
+};
+
+// Upload a file in ranges, resuming from the server's 'received' offset after a failed chunk.
+// Resolves to the upload id once the server has verified the whole file.
+export const uploadInChunks = async (file: File, onProgress?: (sent: number, total: number) => void): Promise<string> => {
+  const created = await fetch('/api/uploads/', {
+    method: 'POST',
+    headers: { ...authHeaders(), 'Content-Type': 'application/json' },
+    body: JSON.stringify({ filename: file.name, size: file.size })
+  });
+  if (!created.ok) throw new Error(`Upload could not start (${created.status})`);
+  const session: UploadSession = await created.json();
+  const chunkSize = session.chunkSize || CHUNKED_THRESHOLD;
+
+  let offset = 0;
+  let failures = 0;
+  while (offset < file.size) {
+    const end = Math.min(offset + chunkSize, file.size);
+    try {
+      const res = await fetch(`/api/uploads/${session.uploadId}`, {
+        method: 'PUT',
+        headers: { ...authHeaders(), 'Content-Range': `bytes ${offset}-${end - 1}/${file.size}` },
+        body: file.slice(offset, end)
+      });
+      const body: UploadSession = await res.json();
+      if (!res.ok && res.status !== 409) throw new Error(`Chunk rejected (${res.status})`);
+      // 409 means the server holds a different offset; continue from there
+      offset = body.received;
+      failures = 0;
+    } catch (e) {
+      if (++failures > MAX_RETRIES) throw e;
+      await sleep(1000 * 2 ** failures);
+      offset = (await uploadStatus(session.uploadId)).received;
+    }
+    onProgress?.(offset, file.size);
+  }
+
+  const finalized = await fetch(`/api/uploads/${session.uploadId}/finalize`, { method: 'POST', headers: authHeaders() });
+  if (!finalized.ok) throw new Error(`Upload could not be finalized (${finalized.status})`);
+  return session.uploadId;
+};
+
+// Add a file to a multipart form: inline when small, as uploadId of a chunked upload when large
+export const appendFile = async (formData: FormData, file: File, onProgress?: (sent: number, total: number) => void) => {
+  if (file.size <= CHUNKED_THRESHOLD) {
+    formData.append('file', file);
+    return;
+  }
+  formData.append('uploadId', await uploadInChunks(file, onProgress));
+};